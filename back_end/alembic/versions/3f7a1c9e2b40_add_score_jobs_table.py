@@ -0,0 +1,43 @@
+"""add score jobs table
+
+Revision ID: 3f7a1c9e2b40
+Revises: 82b80cddc6e3
+Create Date: 2026-10-17 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7a1c9e2b40'
+down_revision: Union[str, Sequence[str], None] = '82b80cddc6e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'score_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reference_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['reference_id'], ['references.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_score_jobs_reference_id'), 'score_jobs', ['reference_id'], unique=False)
+    op.create_index(op.f('ix_score_jobs_status'), 'score_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_score_jobs_status'), table_name='score_jobs')
+    op.drop_index(op.f('ix_score_jobs_reference_id'), table_name='score_jobs')
+    op.drop_table('score_jobs')
@@ -0,0 +1,33 @@
+"""add score job next_attempt_at
+
+Revision ID: a7c2e9f4b813
+Revises: e6b3f9a0c427
+Create Date: 2026-10-18 14:03:21.517208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e9f4b813'
+down_revision: Union[str, Sequence[str], None] = 'e6b3f9a0c427'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'score_jobs',
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.create_index(op.f('ix_score_jobs_next_attempt_at'), 'score_jobs', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_score_jobs_next_attempt_at'), table_name='score_jobs')
+    op.drop_column('score_jobs', 'next_attempt_at')
@@ -0,0 +1,30 @@
+"""add reference keyset indexes
+
+Revision ID: a7d3e9f04c21
+Revises: f19a3c5d7b82
+Create Date: 2026-10-17 15:02:37.904118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f04c21'
+down_revision: Union[str, Sequence[str], None] = 'f19a3c5d7b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_references_cited_from_id_id', 'references', ['cited_from_id', 'id'], unique=False)
+    op.create_index('ix_references_cited_to_id_id', 'references', ['cited_to_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_references_cited_to_id_id', table_name='references')
+    op.drop_index('ix_references_cited_from_id_id', table_name='references')
@@ -0,0 +1,65 @@
+"""add article stats table
+
+Revision ID: b3e8d1f6a942
+Revises: a7d3e9f04c21
+Create Date: 2026-10-17 23:05:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8d1f6a942'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e9f04c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'article_stats',
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('cited_by_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('key_reference_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('references_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_sum', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('article_id'),
+    )
+    op.create_index('ix_article_stats_cited_by_count_article_id', 'article_stats', ['cited_by_count', 'article_id'], unique=False)
+
+    # backfill from the existing references
+    op.execute("""
+        INSERT INTO article_stats (article_id, cited_by_count, key_reference_count, references_count, score_sum, score_count)
+        SELECT a.id,
+               COALESCE(i.cited_by_count, 0),
+               COALESCE(i.key_reference_count, 0),
+               COALESCE(o.references_count, 0),
+               COALESCE(i.score_sum, 0),
+               COALESCE(i.score_count, 0)
+        FROM articles a
+        LEFT JOIN (
+            SELECT cited_to_id,
+                   COUNT(*) AS cited_by_count,
+                   SUM(CASE WHEN if_key_reference THEN 1 ELSE 0 END) AS key_reference_count,
+                   SUM(ai_rated_score) AS score_sum,
+                   COUNT(ai_rated_score) AS score_count
+            FROM "references" GROUP BY cited_to_id
+        ) i ON i.cited_to_id = a.id
+        LEFT JOIN (
+            SELECT cited_from_id, COUNT(*) AS references_count
+            FROM "references" GROUP BY cited_from_id
+        ) o ON o.cited_from_id = a.id
+        WHERE i.cited_to_id IS NOT NULL OR o.cited_from_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_article_stats_cited_by_count_article_id', table_name='article_stats')
+    op.drop_table('article_stats')
@@ -0,0 +1,39 @@
+"""add score cache table
+
+Revision ID: b81d4e06a7c3
+Revises: 3f7a1c9e2b40
+Create Date: 2026-10-17 11:40:05.731962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d4e06a7c3'
+down_revision: Union[str, Sequence[str], None] = '3f7a1c9e2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'score_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('reasoning', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_score_cache_last_used_at'), 'score_cache', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_score_cache_last_used_at'), table_name='score_cache')
+    op.drop_table('score_cache')
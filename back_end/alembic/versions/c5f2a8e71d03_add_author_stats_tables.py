@@ -0,0 +1,53 @@
+"""add author stats tables
+
+Revision ID: c5f2a8e71d03
+Revises: b3e8d1f6a942
+Create Date: 2026-10-17 23:48:36.201947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f2a8e71d03'
+down_revision: Union[str, Sequence[str], None] = 'b3e8d1f6a942'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'author_stats',
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('references_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('key_reference_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('scored_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_sum', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_distribution', sa.JSON(), nullable=False),
+        sa.Column('feedback_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['author_id'], ['authors.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('author_id'),
+    )
+    op.create_table(
+        'author_stats_dirty',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_author_stats_dirty_author_id'), 'author_stats_dirty', ['author_id'], unique=False)
+
+    # every existing author starts stale; the refresher fills author_stats
+    op.execute("INSERT INTO author_stats_dirty (author_id) SELECT id FROM authors")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_author_stats_dirty_author_id'), table_name='author_stats_dirty')
+    op.drop_table('author_stats_dirty')
+    op.drop_table('author_stats')
@@ -0,0 +1,33 @@
+"""add row versions
+
+Revision ID: d8a4c6e2f915
+Revises: c5f2a8e71d03
+Create Date: 2026-10-18 00:31:07.552861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a4c6e2f915'
+down_revision: Union[str, Sequence[str], None] = 'c5f2a8e71d03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a constant default: no table rewrite on Postgres
+    op.add_column('articles', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('authors', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('references', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('references', 'version')
+    op.drop_column('authors', 'version')
+    op.drop_column('articles', 'version')
@@ -0,0 +1,118 @@
+"""normalize article keywords
+
+Revision ID: e4c1b7d92a6f
+Revises: d2b6f8a13e57
+Create Date: 2026-10-17 15:48:33.417529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c1b7d92a6f'
+down_revision: Union[str, Sequence[str], None] = 'd2b6f8a13e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+articles = sa.table('articles', sa.column('id', sa.Integer), sa.column('keywords', sa.String))
+keywords = sa.table('keywords', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('normalized', sa.String))
+article_keyword = sa.table(
+    'article_keyword',
+    sa.column('article_id', sa.Integer), sa.column('keyword_id', sa.Integer), sa.column('position', sa.Integer),
+)
+
+
+def _normalize(name):
+    return " ".join(name.split()).lower()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'keywords',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('normalized', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_keywords_normalized'), 'keywords', ['normalized'], unique=True)
+    op.create_table(
+        'article_keyword',
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('keyword_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['keyword_id'], ['keywords.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('article_id', 'keyword_id'),
+    )
+    op.create_index(op.f('ix_article_keyword_keyword_id'), 'article_keyword', ['keyword_id'], unique=False)
+
+    # Backfill from the comma-joined column, one batch of articles at a time
+    bind = op.get_bind()
+    keyword_ids = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(articles.c.id, articles.c.keywords)
+            .where(articles.c.id > last_id)
+            .order_by(articles.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        links = []
+        for article_id, raw in rows:
+            names = {}  # normalized -> display name, in entry order
+            for name in (raw or "").split(","):
+                name = " ".join(name.split())
+                if name:
+                    names.setdefault(_normalize(name), name)
+            for position, (normalized, name) in enumerate(names.items()):
+                if normalized not in keyword_ids:
+                    keyword_ids[normalized] = bind.execute(
+                        sa.insert(keywords).values(name=name, normalized=normalized).returning(keywords.c.id)
+                    ).scalar_one()
+                links.append({"article_id": article_id, "keyword_id": keyword_ids[normalized], "position": position})
+        if links:
+            bind.execute(sa.insert(article_keyword), links)
+
+    op.drop_column('articles', 'keywords')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('articles', sa.Column('keywords', sa.VARCHAR(), autoincrement=False, nullable=True))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        article_ids = bind.execute(
+            sa.select(articles.c.id).where(articles.c.id > last_id).order_by(articles.c.id).limit(BATCH_SIZE)
+        ).scalars().all()
+        if not article_ids:
+            break
+        last_id = article_ids[-1]
+
+        rows = bind.execute(
+            sa.select(article_keyword.c.article_id, keywords.c.name)
+            .select_from(article_keyword.join(keywords, keywords.c.id == article_keyword.c.keyword_id))
+            .where(article_keyword.c.article_id.in_(article_ids))
+            .order_by(article_keyword.c.article_id, article_keyword.c.position)
+        ).all()
+        joined = {}
+        for article_id, name in rows:
+            joined.setdefault(article_id, []).append(name)
+        for article_id, names in joined.items():
+            bind.execute(sa.update(articles).where(articles.c.id == article_id).values(keywords=", ".join(names)))
+
+    op.drop_index(op.f('ix_article_keyword_keyword_id'), table_name='article_keyword')
+    op.drop_table('article_keyword')
+    op.drop_index(op.f('ix_keywords_normalized'), table_name='keywords')
+    op.drop_table('keywords')
@@ -0,0 +1,28 @@
+"""add email outbox claimed_at
+
+Revision ID: e6b3f9a0c427
+Revises: d8a4c6e2f915
+Create Date: 2026-10-18 09:12:44.830162
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3f9a0c427'
+down_revision: Union[str, Sequence[str], None] = 'd8a4c6e2f915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('email_outbox', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('email_outbox', 'claimed_at')
@@ -0,0 +1,39 @@
+"""add trigram indexes for fuzzy search
+
+Revision ID: f19a3c5d7b82
+Revises: e4c1b7d92a6f
+Create Date: 2026-10-17 17:03:51.260448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19a3c5d7b82'
+down_revision: Union[str, Sequence[str], None] = 'e4c1b7d92a6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Other databases fall back to app.trigram.TrigramIndex
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_articles_title_trgm', 'articles', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_articles_subject_trgm', 'articles', ['subject'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'subject': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_articles_subject_trgm', table_name='articles')
+    op.drop_index('ix_articles_title_trgm', table_name='articles')
+    # the extension is left installed; other objects may depend on it
@@ -1,16 +1,34 @@
-from google import genai
+import abc
+import asyncio
+import hashlib
 import os
 import json
+import threading
+import time
+from typing import List, NamedTuple, Optional
 
-def get_ai_reference_score(citing_article, cited_article, reference):
-    """
-    Score a reference citation from 0-10 using Gemini AI
-    Returns just the score (integer)
-    """
-    
-    client = genai.Client()
-    
-    prompt = f"""You are an expert academic reviewer evaluating citation quality.
+SCORER_BACKEND = os.getenv("SCORER_BACKEND", "gemini")  # "gemini" or "stub"
+SCORER_MODEL = os.getenv("SCORER_MODEL", "gemini-3-flash-preview")
+SCORER_STUB_LATENCY_MS = int(os.getenv("SCORER_STUB_LATENCY_MS", "0"))
+SCORE_BATCH_SIZE = int(os.getenv("SCORE_BATCH_SIZE", "20"))
+# Model calls in flight at once when scoring asynchronously
+SCORE_ASYNC_CONCURRENCY = int(os.getenv("SCORE_ASYNC_CONCURRENCY", "4"))
+
+RATING_SCALE = """Rate each citation on a scale of 0-10:
+    - 0-3: Poor (irrelevant, inaccurate, or misrepresented)
+    - 4-6: Fair (somewhat relevant but could be better)
+    - 7-8: Good (relevant and accurate)
+    - 9-10: Excellent (highly relevant, accurate, and necessary)"""
+
+
+class ScoreResult(NamedTuple):
+    score: int
+    reasoning: Optional[str] = None
+
+
+# -------------------- Prompts --------------------
+def build_score_prompt(citing_article, cited_article, reference):
+    return f"""You are an expert academic reviewer evaluating citation quality.
 
     CITING ARTICLE:
     Title: {citing_article.title}
@@ -28,11 +46,7 @@ def get_ai_reference_score(citing_article, cited_article, reference):
     REFERENCE CONTENT:
     {reference.content}
 
-    Rate this citation on a scale of 0-10:
-    - 0-3: Poor (irrelevant, inaccurate, or misrepresented)
-    - 4-6: Fair (somewhat relevant but could be better)
-    - 7-8: Good (relevant and accurate)
-    - 9-10: Excellent (highly relevant, accurate, and necessary)
+    {RATING_SCALE.replace("Rate each citation", "Rate this citation")}
 
     Respond ONLY with a JSON object:
     {{
@@ -40,29 +54,296 @@ def get_ai_reference_score(citing_article, cited_article, reference):
     "reasoning": "<brief 1-2 sentence explanation>"
     }}"""
 
-    try:
-            response = client.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=prompt
-            )
-            # Parse JSON response
-            result_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if result_text.startswith("```"):
-                result_text = result_text.split("```")[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-                result_text = result_text.strip()
-            
-            result = json.loads(result_text)
-            score = result.get("score")
-            
-            print(f"AI Score: {score}/10 - {result.get('reasoning', '')}")
-            
-            return score
-            
-    except Exception as e:
+
+def build_batch_prompt(citing_article, cited_pairs):
+    cited_blocks = "\n".join(
+        f"""
+    [{i}]
+    Title: {cited_article.title}
+    Authors: {cited_article.author_names}
+    Subject: {cited_article.subject}
+    Citation context: {reference.citation_content if reference.citation_content else "No context provided"}
+    Reference content: {reference.content}"""
+        for i, (cited_article, reference) in enumerate(cited_pairs)
+    )
+
+    return f"""You are an expert academic reviewer evaluating citation quality.
+
+    CITING ARTICLE:
+    Title: {citing_article.title}
+    Subject: {citing_article.subject}
+    Content excerpt: {citing_article.content[:500]}...
+
+    CITED WORKS ({len(cited_pairs)} citations, numbered from 0):
+    {cited_blocks}
+
+    {RATING_SCALE}
+
+    Respond ONLY with a JSON array containing one object per cited work:
+    [
+    {{"index": <number>, "score": <number 0-10>, "reasoning": "<brief 1-2 sentence explanation>"}}
+    ]"""
+
+
+def _parse_json_response(result_text):
+    """Parse a JSON model response, removing markdown code blocks if present."""
+    result_text = result_text.strip()
+    if result_text.startswith("```"):
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+        result_text = result_text.strip()
+    return json.loads(result_text)
+
+
+def _valid_score(score) -> Optional[int]:
+    """The score if it is an integer on the 0-10 scale, else None (bool is not an int here)."""
+    if type(score) is int and 0 <= score <= 10:
+        return score
+    return None
+
+
+def _parse_single(result_text) -> Optional[ScoreResult]:
+    result = _parse_json_response(result_text)
+    score = _valid_score(result.get("score"))
+    if score is None:
+        print(f"⚠️ Ignoring AI score {result.get('score')!r}: not an integer from 0 to 10")
+        return None
+    print(f"AI Score: {score}/10 - {result.get('reasoning', '')}")
+    return ScoreResult(score, result.get("reasoning"))
+
+
+def _parse_batch(result_text, size) -> List[Optional[ScoreResult]]:
+    scores = [None] * size
+    for position, result in enumerate(_parse_json_response(result_text)):
+        index = result.get("index", position)
+        score = _valid_score(result.get("score"))
+        if type(index) is int and 0 <= index < size and score is not None:
+            scores[index] = ScoreResult(score, result.get("reasoning"))
+            print(f"AI Score [{index}]: {score}/10 - {result.get('reasoning', '')}")
+    return scores
+
+
+# -------------------- Scorers --------------------
+class Scorer(abc.ABC):
+    """
+    A citation scoring backend. Implementations return None for a citation
+    they could not score rather than raising.
+    """
+    model_name: str
+
+    @abc.abstractmethod
+    def score(self, citing_article, cited_article, reference) -> Optional[ScoreResult]:
+        ...
+
+    @abc.abstractmethod
+    def score_batch(self, citing_article, cited_pairs) -> List[Optional[ScoreResult]]:
+        ...
+
+    async def ascore(self, citing_article, cited_article, reference) -> Optional[ScoreResult]:
+        return await asyncio.to_thread(self.score, citing_article, cited_article, reference)
+
+    async def ascore_batch(self, citing_article, cited_pairs) -> List[Optional[ScoreResult]]:
+        return await asyncio.to_thread(self.score_batch, citing_article, cited_pairs)
+
+    def close(self) -> None:
+        pass
+
+
+class GeminiScorer(Scorer):
+    """
+    Gemini backend. One client is created for the life of the process so
+    its HTTP connection pool (and TLS sessions) is reused across calls.
+    """
+
+    def __init__(self, model_name: str = SCORER_MODEL):
+        from google import genai
+
+        self.model_name = model_name
+        self.client = genai.Client()
+
+    def score(self, citing_article, cited_article, reference):
+        prompt = build_score_prompt(citing_article, cited_article, reference)
+        try:
+            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
+            return _parse_single(response.text)
+        except Exception as e:
             print(f"AI scoring failed: {e}")
             print(f"Response text: {response.text if 'response' in locals() else 'No response'}")
-            return None
\ No newline at end of file
+            return None
+
+    def score_batch(self, citing_article, cited_pairs):
+        if not cited_pairs:
+            return []
+        prompt = build_batch_prompt(citing_article, cited_pairs)
+        try:
+            response = self.client.models.generate_content(model=self.model_name, contents=prompt)
+            return _parse_batch(response.text, len(cited_pairs))
+        except Exception as e:
+            print(f"AI batch scoring failed: {e}")
+            print(f"Response text: {response.text if 'response' in locals() else 'No response'}")
+            return [None] * len(cited_pairs)
+
+    async def ascore(self, citing_article, cited_article, reference):
+        prompt = build_score_prompt(citing_article, cited_article, reference)
+        try:
+            response = await self.client.aio.models.generate_content(model=self.model_name, contents=prompt)
+            return _parse_single(response.text)
+        except Exception as e:
+            print(f"AI scoring failed: {e}")
+            return None
+
+    async def ascore_batch(self, citing_article, cited_pairs):
+        if not cited_pairs:
+            return []
+        prompt = build_batch_prompt(citing_article, cited_pairs)
+        try:
+            response = await self.client.aio.models.generate_content(model=self.model_name, contents=prompt)
+            return _parse_batch(response.text, len(cited_pairs))
+        except Exception as e:
+            print(f"AI batch scoring failed: {e}")
+            return [None] * len(cited_pairs)
+
+    def close(self):
+        self.client.close()
+
+
+class StubScorer(Scorer):
+    """
+    Offline backend for local runs and load tests: the score is derived from
+    a hash of the prompt, so the same citation always gets the same score,
+    after an optional artificial delay standing in for the model round trip.
+    """
+
+    def __init__(self, latency_ms: int = SCORER_STUB_LATENCY_MS, model_name: str = "stub"):
+        self.model_name = model_name
+        self.latency = latency_ms / 1000
+
+    def _result(self, prompt) -> ScoreResult:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return ScoreResult(digest[0] % 11, "Deterministic stub score")
+
+    def score(self, citing_article, cited_article, reference):
+        time.sleep(self.latency)
+        return self._result(build_score_prompt(citing_article, cited_article, reference))
+
+    def score_batch(self, citing_article, cited_pairs):
+        time.sleep(self.latency)
+        return [self._result(build_score_prompt(citing_article, cited, ref)) for cited, ref in cited_pairs]
+
+    async def ascore(self, citing_article, cited_article, reference):
+        await asyncio.sleep(self.latency)
+        return self._result(build_score_prompt(citing_article, cited_article, reference))
+
+    async def ascore_batch(self, citing_article, cited_pairs):
+        await asyncio.sleep(self.latency)
+        return [self._result(build_score_prompt(citing_article, cited, ref)) for cited, ref in cited_pairs]
+
+
+SCORER_BACKENDS = {
+    "gemini": GeminiScorer,
+    "stub": StubScorer,
+}
+
+_scorer: Optional[Scorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer() -> Scorer:
+    """Return the process-wide scorer selected by SCORER_BACKEND, creating it on first use."""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                if SCORER_BACKEND not in SCORER_BACKENDS:
+                    raise ValueError(f"Unknown SCORER_BACKEND '{SCORER_BACKEND}'")
+                _scorer = SCORER_BACKENDS[SCORER_BACKEND]()
+                print(f"🤖 Using {SCORER_BACKEND} scorer ({_scorer.model_name})")
+    return _scorer
+
+
+def close_scorer() -> None:
+    global _scorer
+    with _scorer_lock:
+        if _scorer is not None:
+            _scorer.close()
+            _scorer = None
+
+
+# -------------------- Module API --------------------
+def get_ai_reference_score(citing_article, cited_article, reference):
+    """
+    Score a reference citation from 0-10 using the configured scorer
+    Returns just the score (integer)
+    """
+    result = get_scorer().score(citing_article, cited_article, reference)
+    return result.score if result else None
+
+
+def get_ai_reference_scores_batch(citing_article, cited_pairs):
+    """
+    Score many citations made by the same citing article with one model call.
+    `cited_pairs` is a list of (cited_article, reference) tuples.
+    Returns a list of ScoreResult aligned with `cited_pairs` (None where the
+    model gave no usable score). The citing article is only sent once per call.
+    """
+    return get_scorer().score_batch(citing_article, cited_pairs)
+
+
+def score_references_batch(references, batch_size=SCORE_BATCH_SIZE):
+    """
+    Score a list of Reference rows, grouping them by citing article so each
+    model call carries the citing article once plus up to `batch_size`
+    cited works.
+    Returns ({reference_id: ScoreResult or None}, number_of_model_calls).
+    """
+    groups = {}
+    for reference in references:
+        groups.setdefault(reference.cited_from_id, []).append(reference)
+
+    scores = {}
+    calls = 0
+    for group in groups.values():
+        citing_article = group[0].cited_from
+        for start in range(0, len(group), batch_size):
+            chunk = group[start:start + batch_size]
+            chunk_scores = get_ai_reference_scores_batch(
+                citing_article, [(ref.cited_to, ref) for ref in chunk]
+            )
+            calls += 1
+            for ref, score in zip(chunk, chunk_scores):
+                scores[ref.id] = score
+
+    return scores, calls
+
+
+async def ascore_references_batch(references, batch_size=SCORE_BATCH_SIZE):
+    """
+    Async score_references_batch: the model calls are awaited, up to
+    SCORE_ASYNC_CONCURRENCY at a time. Each reference's cited_from and
+    cited_to must already be loaded (no lazy loads happen here).
+    Returns ({reference_id: ScoreResult or None}, number_of_model_calls).
+    """
+    groups = {}
+    for reference in references:
+        groups.setdefault(reference.cited_from_id, []).append(reference)
+
+    chunks = []
+    for group in groups.values():
+        for start in range(0, len(group), batch_size):
+            chunks.append((group[0].cited_from, group[start:start + batch_size]))
+
+    scorer = get_scorer()
+    limit = asyncio.Semaphore(SCORE_ASYNC_CONCURRENCY)
+
+    async def score_chunk(citing_article, chunk):
+        async with limit:
+            return await scorer.ascore_batch(citing_article, [(ref.cited_to, ref) for ref in chunk])
+
+    chunk_scores = await asyncio.gather(*(score_chunk(citing, chunk) for citing, chunk in chunks))
+
+    scores = {}
+    for (_, chunk), results in zip(chunks, chunk_scores):
+        for ref, score in zip(chunk, results):
+            scores[ref.id] = score
+    return scores, len(chunks)
@@ -0,0 +1,208 @@
+"""
+Denormalized per-article citation counters (`article_stats`).
+
+Session flush listeners turn every Reference the ORM inserts, updates or
+deletes (including the cascade when an article is deleted) into counter
+deltas and apply them with one upsert in the same transaction, so
+citation counts and average AI scores are single indexed reads instead
+of aggregating /references/to/{id} client-side. Writes that bypass the
+ORM (bulk loads, raw SQL, app.seeds.generate) are corrected by the
+reconciliation job:
+
+    python -m app.article_stats
+"""
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, delete, event, func, inspect, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.article import Article
+from app.models.article_stats import ArticleStats
+from app.models.reference import Reference
+from app.schema import ArticleStatsOut
+
+COUNTERS = ("cited_by_count", "key_reference_count", "references_count", "score_sum", "score_count")
+_DELTAS = "article_stats_deltas"
+_DELETED_ARTICLES = "article_stats_deleted_articles"
+
+
+# -------------------- Deltas --------------------
+def _value(reference: Reference, key: str, old: bool):
+    """The attribute as last flushed (old=True) or as it is now."""
+    history = inspect(reference).attrs[key].history
+    if old and history.deleted:
+        return history.deleted[0]
+    if not old and history.added:
+        return history.added[0]
+    return history.unchanged[0] if history.unchanged else getattr(reference, key)
+
+
+def _add_reference(deltas: Dict[int, Counter], reference: Reference, sign: int, old: bool = False) -> None:
+    cited_to_id = _value(reference, "cited_to_id", old)
+    cited_from_id = _value(reference, "cited_from_id", old)
+    if cited_to_id is not None:
+        counters = deltas[cited_to_id]
+        counters["cited_by_count"] += sign
+        if _value(reference, "if_key_reference", old):
+            counters["key_reference_count"] += sign
+        score = _value(reference, "ai_rated_score", old)
+        if score is not None:
+            counters["score_sum"] += sign * score
+            counters["score_count"] += sign
+    if cited_from_id is not None:
+        deltas[cited_from_id]["references_count"] += sign
+
+
+def _tracked_change(reference: Reference) -> bool:
+    state = inspect(reference)
+    return any(
+        state.attrs[key].history.has_changes()
+        for key in ("cited_to_id", "cited_from_id", "if_key_reference", "ai_rated_score")
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deletes(session: Session, flush_context, instances) -> None:
+    # deleted rows can still be loaded here, not after the flush
+    deltas = session.info.setdefault(_DELTAS, defaultdict(Counter))
+    deleted_articles = session.info.setdefault(_DELETED_ARTICLES, set())
+    for obj in session.deleted:
+        if isinstance(obj, Reference):
+            _add_reference(deltas, obj, -1, old=True)
+        elif isinstance(obj, Article):
+            deleted_articles.add(inspect(obj).identity[0])
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_deltas(session: Session, flush_context) -> None:
+    # new/dirty still list this flush's objects and their attribute history
+    deltas = session.info.pop(_DELTAS, None) or defaultdict(Counter)
+    deleted_articles = session.info.pop(_DELETED_ARTICLES, None) or set()
+    for obj in session.new:
+        if isinstance(obj, Reference):
+            _add_reference(deltas, obj, 1)
+    for obj in session.dirty:
+        if isinstance(obj, Reference) and obj not in session.deleted and _tracked_change(obj):
+            _add_reference(deltas, obj, -1, old=True)
+            _add_reference(deltas, obj, 1)
+
+    connection = session.connection()
+    if deleted_articles:
+        connection.execute(delete(ArticleStats).where(ArticleStats.article_id.in_(deleted_articles)))
+    rows = [
+        {"article_id": article_id, **{c: counters[c] for c in COUNTERS}}
+        for article_id, counters in sorted(deltas.items())  # fixed lock order across transactions
+        if article_id not in deleted_articles and any(counters.values())
+    ]
+    if rows:
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(ArticleStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ArticleStats.article_id],
+            set_={c: getattr(ArticleStats, c) + getattr(stmt.excluded, c) for c in COUNTERS},
+        )
+        connection.execute(stmt, rows)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_deltas(session: Session, previous_transaction) -> None:
+    session.info.pop(_DELTAS, None)
+    session.info.pop(_DELETED_ARTICLES, None)
+
+
+# -------------------- Reads --------------------
+def serialize_article_stats(article_id: int, stats: Optional[ArticleStats], title: Optional[str] = None) -> ArticleStatsOut:
+    """ArticleStatsOut from a counters row; no row means nothing cites or is cited yet."""
+    if stats is None:
+        return ArticleStatsOut(article_id=article_id, title=title)
+    return ArticleStatsOut(
+        article_id=article_id,
+        title=title,
+        cited_by_count=stats.cited_by_count,
+        key_reference_count=stats.key_reference_count,
+        references_count=stats.references_count,
+        scored_count=stats.score_count,
+        average_ai_score=stats.score_sum / stats.score_count if stats.score_count else None,
+    )
+
+
+# -------------------- Reconciliation --------------------
+def expected_stats():
+    """Counters recomputed from `references`, one row per article."""
+    incoming = (
+        select(
+            Reference.cited_to_id.label("article_id"),
+            func.count().label("cited_by_count"),
+            func.sum(case((Reference.if_key_reference, 1), else_=0)).label("key_reference_count"),
+            func.coalesce(func.sum(Reference.ai_rated_score), 0).label("score_sum"),
+            func.count(Reference.ai_rated_score).label("score_count"),
+        )
+        .group_by(Reference.cited_to_id)
+        .subquery()
+    )
+    outgoing = (
+        select(Reference.cited_from_id.label("article_id"), func.count().label("references_count"))
+        .group_by(Reference.cited_from_id)
+        .subquery()
+    )
+    return (
+        select(
+            Article.id.label("article_id"),
+            func.coalesce(incoming.c.cited_by_count, 0).label("cited_by_count"),
+            func.coalesce(incoming.c.key_reference_count, 0).label("key_reference_count"),
+            func.coalesce(outgoing.c.references_count, 0).label("references_count"),
+            func.coalesce(incoming.c.score_sum, 0).label("score_sum"),
+            func.coalesce(incoming.c.score_count, 0).label("score_count"),
+        )
+        .outerjoin(incoming, incoming.c.article_id == Article.id)
+        .outerjoin(outgoing, outgoing.c.article_id == Article.id)
+        .subquery()
+    )
+
+
+def reconcile_article_stats(db: Session, batch_size: int = 5000) -> int:
+    """
+    Recompute every article's counters in bulk and fix the rows that
+    drifted (or are missing). Returns the number of rows corrected.
+    """
+    expected = expected_stats()
+    drifted = (
+        select(*expected.c)
+        .outerjoin(ArticleStats, ArticleStats.article_id == expected.c.article_id)
+        .where(or_(
+            # articles nobody cites and that cite nothing need no row
+            and_(ArticleStats.article_id.is_(None), or_(*(expected.c[c] != 0 for c in COUNTERS))),
+            *(getattr(ArticleStats, c) != expected.c[c] for c in COUNTERS),
+        ))
+    )
+    rows: List[dict] = [dict(row) for row in db.execute(drifted).mappings()]
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    for start in range(0, len(rows), batch_size):
+        stmt = dialect.insert(ArticleStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ArticleStats.article_id],
+            set_={c: getattr(stmt.excluded, c) for c in COUNTERS},
+        )
+        db.execute(stmt, rows[start:start + batch_size])
+    # rows of articles that no longer exist (SQLite does not enforce ON DELETE CASCADE)
+    orphans = db.execute(
+        delete(ArticleStats).where(~ArticleStats.article_id.in_(select(Article.id)))
+    ).rowcount
+    db.commit()
+    return len(rows) + orphans
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        corrected = reconcile_article_stats(db)
+        print(f"✅ Reconciled article stats in {time.perf_counter() - start:.1f}s ({corrected} rows corrected)")
+    finally:
+        db.close()
@@ -0,0 +1,288 @@
+"""
+Materialized per-author reference quality (`author_stats`).
+
+Profile views would otherwise join references -> articles -> author_article
+for every request. Instead, session flush listeners queue the authors
+touched by a reference or authorship change in `author_stats_dirty`, in
+the same transaction as the change, and a refresher recomputes only
+those authors. It runs in the API process (AUTHOR_STATS_REFRESH_IN_APP)
+or on its own:
+
+    python -m app.author_stats             # keep draining the queue
+    python -m app.author_stats --rebuild   # queue every author once, e.g. after a bulk load
+
+Several refreshers can run at once: on Postgres each claims its authors
+with FOR NO KEY UPDATE SKIP LOCKED, so no author is computed twice
+concurrently.
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import case, delete, event, func, inspect, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.author import Author
+from app.models.author_article import AuthorArticle
+from app.models.author_stats import AuthorStats
+from app.models.author_stats_dirty import AuthorStatsDirty
+from app.models.reference import Reference
+from app.schema import AuthorStatsOut
+
+AUTHOR_STATS_REFRESH_IN_APP = os.getenv("AUTHOR_STATS_REFRESH_IN_APP", "true").lower() == "true"
+AUTHOR_STATS_REFRESH_SECONDS = float(os.getenv("AUTHOR_STATS_REFRESH_SECONDS", "5.0"))
+AUTHOR_STATS_BATCH_SIZE = int(os.getenv("AUTHOR_STATS_BATCH_SIZE", "500"))
+
+# reference attributes that feed author_stats
+TRACKED = ("cited_to_id", "if_key_reference", "ai_rated_score", "feedback")
+_ARTICLES = "author_stats_articles"
+_AUTHORS = "author_stats_authors"
+
+
+# -------------------- Dirty queue --------------------
+def _cited_to_ids(reference: Reference) -> Iterable[int]:
+    history = inspect(reference).attrs["cited_to_id"].history
+    ids = [i for i in (*history.deleted, *history.unchanged, *history.added) if i is not None]
+    return ids or [reference.cited_to_id]
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deletes(session: Session, flush_context, instances) -> None:
+    articles = session.info.setdefault(_ARTICLES, set())
+    authors = session.info.setdefault(_AUTHORS, set())
+    for obj in session.deleted:
+        if isinstance(obj, Reference):
+            articles.update(_cited_to_ids(obj))
+        elif isinstance(obj, AuthorArticle):
+            authors.add(inspect(obj).identity[0])
+
+
+@event.listens_for(Session, "after_flush")
+def _queue_authors(session: Session, flush_context) -> None:
+    articles = session.info.pop(_ARTICLES, None) or set()
+    authors = session.info.pop(_AUTHORS, None) or set()
+    for obj in session.new:
+        if isinstance(obj, Reference):
+            articles.update(_cited_to_ids(obj))
+        elif isinstance(obj, AuthorArticle):
+            authors.add(obj.author_id)
+    for obj in session.dirty:
+        if isinstance(obj, Reference) and obj not in session.deleted:
+            state = inspect(obj)
+            if any(state.attrs[key].history.has_changes() for key in TRACKED):
+                articles.update(_cited_to_ids(obj))
+
+    connection = session.connection()
+    if articles:
+        # links of deleted articles are gone by now; those authors come from the deleted AuthorArticle rows
+        connection.execute(
+            insert(AuthorStatsDirty).from_select(
+                ["author_id"],
+                select(AuthorArticle.author_id).where(AuthorArticle.article_id.in_(articles)).distinct(),
+            )
+        )
+    if authors:
+        connection.execute(insert(AuthorStatsDirty), [{"author_id": a} for a in sorted(authors)])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_queue(session: Session, previous_transaction) -> None:
+    session.info.pop(_ARTICLES, None)
+    session.info.pop(_AUTHORS, None)
+
+
+# -------------------- Computing --------------------
+def compute_author_stats(db: Session, author_ids: Iterable[int]) -> Dict[int, dict]:
+    """author_stats columns for each author, aggregated live: {author_id: {column: value}}."""
+    author_ids = list(author_ids)
+    result = {
+        a: {"references_count": 0, "key_reference_count": 0, "scored_count": 0, "score_sum": 0,
+            "score_distribution": {}, "feedback_count": 0}
+        for a in author_ids
+    }
+    if not author_ids:
+        return result
+
+    linked = (
+        select(AuthorArticle.author_id, Reference.ai_rated_score, Reference.if_key_reference, Reference.feedback)
+        .join(Reference, Reference.cited_to_id == AuthorArticle.article_id)
+        .where(AuthorArticle.author_id.in_(author_ids))
+        .subquery()
+    )
+    totals = db.execute(
+        select(
+            linked.c.author_id,
+            func.count(),
+            func.sum(case((linked.c.if_key_reference, 1), else_=0)),
+            func.count(linked.c.ai_rated_score),
+            func.coalesce(func.sum(linked.c.ai_rated_score), 0),
+            func.count(case((linked.c.feedback != "", 1))),
+        ).group_by(linked.c.author_id)
+    )
+    for author_id, references, key_references, scored, score_sum, feedback in totals:
+        result[author_id].update(
+            references_count=references, key_reference_count=key_references,
+            scored_count=scored, score_sum=score_sum, feedback_count=feedback,
+        )
+    distribution = db.execute(
+        select(linked.c.author_id, linked.c.ai_rated_score, func.count())
+        .where(linked.c.ai_rated_score.is_not(None))
+        .group_by(linked.c.author_id, linked.c.ai_rated_score)
+    )
+    for author_id, score, count in distribution:
+        result[author_id]["score_distribution"][str(score)] = count
+    return result
+
+
+def serialize_author_stats(author_id: int, stats, refreshed_at: Optional[datetime] = None) -> AuthorStatsOut:
+    """AuthorStatsOut from an AuthorStats row or a compute_author_stats() dict."""
+    values = stats if isinstance(stats, dict) else {c: getattr(stats, c) for c in (
+        "references_count", "key_reference_count", "scored_count", "score_sum", "score_distribution", "feedback_count")}
+    return AuthorStatsOut(
+        author_id=author_id,
+        references_count=values["references_count"],
+        key_reference_count=values["key_reference_count"],
+        scored_count=values["scored_count"],
+        average_ai_score=values["score_sum"] / values["scored_count"] if values["scored_count"] else None,
+        score_distribution=values["score_distribution"],
+        feedback_count=values["feedback_count"],
+        refreshed_at=refreshed_at if isinstance(stats, dict) else stats.refreshed_at,
+    )
+
+
+def load_author_stats(db: Session, author_ids: Iterable[int]) -> Dict[int, AuthorStatsOut]:
+    """Materialized stats for many authors in one query; authors not refreshed yet are left out."""
+    author_ids = list(author_ids)
+    if not author_ids:
+        return {}
+    rows = db.query(AuthorStats).filter(AuthorStats.author_id.in_(author_ids))
+    return {row.author_id: serialize_author_stats(row.author_id, row) for row in rows}
+
+
+# -------------------- Refreshing --------------------
+def _claim_authors(db: Session, limit: int) -> List[int]:
+    """
+    Authors to refresh now, locked against other refreshers on Postgres.
+    Authors another refresher holds are skipped and stay queued.
+    """
+    queued = db.execute(
+        select(AuthorStatsDirty.author_id).order_by(AuthorStatsDirty.id).limit(limit)
+    ).scalars().all()
+    candidates = sorted(set(queued))
+    if not candidates or db.bind.dialect.name != "postgresql":
+        return candidates
+    locked = db.execute(
+        select(Author.id).where(Author.id.in_(candidates)).order_by(Author.id)
+        .with_for_update(skip_locked=True, key_share=True)
+    ).scalars().all()
+    existing = db.execute(select(Author.id).where(Author.id.in_(candidates))).scalars().all()
+    return sorted(set(locked) | (set(candidates) - set(existing)))
+
+
+def refresh_author_stats(db: Session, limit: int = AUTHOR_STATS_BATCH_SIZE) -> int:
+    """
+    Recompute the stats of up to `limit` queued authors and commit.
+    Returns the number of authors refreshed.
+    """
+    author_ids = _claim_authors(db, limit)
+    if not author_ids:
+        db.rollback()
+        return 0
+
+    # dequeue before aggregating: a change committed after this point
+    # queues a new row and is picked up next round
+    db.execute(delete(AuthorStatsDirty).where(AuthorStatsDirty.author_id.in_(author_ids)))
+    existing: Set[int] = set(db.execute(select(Author.id).where(Author.id.in_(author_ids))).scalars())
+    deleted = [a for a in author_ids if a not in existing]
+    if deleted:
+        db.execute(delete(AuthorStats).where(AuthorStats.author_id.in_(deleted)))
+
+    stats = compute_author_stats(db, sorted(existing))
+    if stats:
+        now = datetime.now(timezone.utc)
+        rows = [{"author_id": a, **values, "refreshed_at": now} for a, values in stats.items()]
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(AuthorStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AuthorStats.author_id],
+            set_={c: getattr(stmt.excluded, c) for c in rows[0] if c != "author_id"},
+        )
+        db.execute(stmt, rows)
+    db.commit()
+    return len(author_ids)
+
+
+def drain_author_stats(db: Session, limit: int = AUTHOR_STATS_BATCH_SIZE) -> int:
+    """Refresh until the queue is empty (or only holds authors locked elsewhere)."""
+    total = 0
+    while True:
+        refreshed = refresh_author_stats(db, limit)
+        if not refreshed:
+            return total
+        total += refreshed
+
+
+def queue_all_authors(db: Session) -> None:
+    db.execute(insert(AuthorStatsDirty).from_select(["author_id"], select(Author.id)))
+    db.commit()
+
+
+class AuthorStatsRefresher:
+    """A background thread draining the author_stats_dirty queue."""
+
+    def __init__(self, poll_seconds: float = AUTHOR_STATS_REFRESH_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="author-stats-refresher", daemon=True)
+        self._thread.start()
+        print("📊 Started author stats refresher")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                drain_author_stats(db)
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Author stats refresher error: {e}")
+            finally:
+                db.close()
+            self._stop.wait(self.poll_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the materialized author stats")
+    parser.add_argument("--rebuild", action="store_true", help="queue every author, drain the queue once and exit")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            queue_all_authors(db)
+            refreshed = drain_author_stats(db)
+            print(f"✅ Rebuilt stats of {refreshed} authors in {time.perf_counter() - start:.1f}s")
+        finally:
+            db.close()
+    else:
+        refresher = AuthorStatsRefresher()
+        refresher.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            refresher.stop()
@@ -0,0 +1,67 @@
+"""
+Author read helpers.
+
+AuthorOut carries a summary (id, title) of every article an author is
+linked to. Walking `Author.articles` loads the links and then each
+article one at a time, so summaries for a page of authors are fetched
+here in one grouped query instead; their materialized stats take one
+more.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.article import Article
+from app.models.author import Author
+from app.models.author_article import AuthorArticle
+from app.schema import ArticleSummary, AuthorOut, AuthorStatsOut
+from app.author_stats import load_author_stats
+
+
+def load_article_summaries(db: Session, author_ids: Iterable[int]) -> Dict[int, List[ArticleSummary]]:
+    """Article summaries for many authors in one query: {author_id: [ArticleSummary, ...]}."""
+    author_ids = list(author_ids)
+    result: Dict[int, List[ArticleSummary]] = {author_id: [] for author_id in author_ids}
+    if not author_ids:
+        return result
+
+    rows = db.execute(
+        select(AuthorArticle.author_id, Article.id, Article.title)
+        .join(Article, Article.id == AuthorArticle.article_id)
+        .where(AuthorArticle.author_id.in_(author_ids))
+        .order_by(AuthorArticle.author_id, Article.id)
+    )
+    for author_id, article_id, title in rows:
+        result[author_id].append(ArticleSummary(id=article_id, title=title))
+    return result
+
+
+def resolve_author_emails(db: Session, emails: Iterable[Optional[str]]) -> Dict[str, int]:
+    """Author ids for many emails in one IN query: {email: author_id}; unknown emails are left out."""
+    emails = {email for email in emails if email}
+    if not emails:
+        return {}
+    return dict(db.execute(select(Author.email, Author.id).where(Author.email.in_(emails))).all())
+
+
+def serialize_author(
+    author: Author,
+    articles: Optional[List[ArticleSummary]] = None,
+    stats: Optional[AuthorStatsOut] = None,
+) -> AuthorOut:
+    return AuthorOut(
+        id=author.id,
+        name=author.name,
+        email=author.email,
+        institute=author.institute,
+        job=author.job,
+        articles=articles or [],
+        stats=stats
+    )
+
+
+def serialize_authors(db: Session, authors: List[Author]) -> List[AuthorOut]:
+    summaries = load_article_summaries(db, [a.id for a in authors])
+    stats = load_author_stats(db, [a.id for a in authors])
+    return [serialize_author(a, summaries[a.id], stats.get(a.id)) for a in authors]
@@ -0,0 +1,95 @@
+"""
+Compare SQL citation analytics with the in-memory citation graph.
+
+    python -m app.seeds.generate --authors 20000 --articles 100000 --references 1000000
+    python -m app.benchmarks.graph_benchmark --authors 50 --runs 5
+
+Runs against whatever is in DATABASE_URL. h-index in SQL is one count
+query per article of the author; top-cited is a GROUP BY over references.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func, select
+
+from app.citation_graph import CitationGraph
+from app.database import SessionLocal
+from app.models import Article, AuthorArticle, Reference
+
+
+def sql_h_index(db, author_id):
+    """Citation count per article of the author, one query each."""
+    article_ids = db.execute(select(AuthorArticle.article_id).where(AuthorArticle.author_id == author_id)).scalars().all()
+    counts = sorted(
+        (db.execute(select(func.count()).where(Reference.cited_to_id == article_id)).scalar() for article_id in article_ids),
+        reverse=True,
+    )
+    return sum(1 for i, count in enumerate(counts) if count >= i + 1)
+
+
+def sql_top_cited(db, subject, limit=10):
+    cited_by = func.count(Reference.id)
+    stmt = (
+        select(Article.id, cited_by)
+        .join(Reference, Reference.cited_to_id == Article.id)
+        .group_by(Article.id)
+        .order_by(cited_by.desc(), Article.id)
+        .limit(limit)
+    )
+    if subject:
+        stmt = stmt.where(Article.subject.ilike(f"%{subject}%"))
+    return db.execute(stmt).all()
+
+
+def time_it(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark citation analytics")
+    parser.add_argument("--authors", type=int, default=50, help="authors whose h-index is computed per run")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--subject", default="energy")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        references = db.execute(select(func.count(Reference.id))).scalar()
+        author_ids = db.execute(
+            select(AuthorArticle.author_id).group_by(AuthorArticle.author_id)
+            .order_by(func.count().desc()).limit(args.authors)
+        ).scalars().all()
+        print(f"{references} references, h-index of the {len(author_ids)} most prolific authors")
+
+        graph = CitationGraph()
+        start = time.perf_counter()
+        graph.load(db)
+        load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        graph.top_articles(10, by="pagerank")  # builds the CSR arrays and PageRank once
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"graph load {load_ms:.0f}ms, CSR + PageRank {build_ms:.0f}ms")
+
+        for a in author_ids[:3]:
+            assert sql_h_index(db, a) == graph.author_impact(a)["h_index"]
+
+        rows = [
+            ("h-index", lambda: [sql_h_index(db, a) for a in author_ids], lambda: [graph.author_impact(a) for a in author_ids]),
+            ("top-cited", lambda: sql_top_cited(db, None), lambda: graph.top_articles(10)),
+            (f"top-cited '{args.subject}'", lambda: sql_top_cited(db, args.subject), lambda: graph.top_articles(10, args.subject)),
+        ]
+        print(f"{'query':<24}{'sql p50':>12}{'graph p50':>12}")
+        for name, sql_fn, graph_fn in rows:
+            print(f"{name:<24}{time_it(sql_fn, args.runs):>10.1f}ms{time_it(graph_fn, args.runs):>10.2f}ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Closed-loop HTTP load test against a running API.
+
+    uvicorn app.main:app --port 8000                      # DB_ASYNC=false
+    python -m app.benchmarks.load_test --url http://localhost:8000 --concurrency 200 --duration 20
+
+Run it once against a server started with DB_ASYNC=false and once with
+DB_ASYNC=true (same --workers) to compare throughput per worker. Each
+virtual user requests the given paths round-robin as fast as responses
+come back.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/articles/search?q=quantum&limit=20",
+    "/articles/lucky",
+    "/authors/?limit=20",
+    "/references/to/1?limit=50",
+]
+
+
+async def virtual_user(client, paths, deadline, latencies, statuses, offset):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(url, paths, concurrency, duration):
+    latencies = []
+    statuses = Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        await client.get("/")  # warm up the connection pool and the app
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            virtual_user(client, paths, deadline, latencies, statuses, n) for n in range(concurrency)
+        ))
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test for the API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds")
+    parser.add_argument("--path", action="append", dest="paths", help="path to request (repeatable)")
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    latencies, statuses = asyncio.run(run(args.url, paths, args.concurrency, args.duration))
+    if not latencies:
+        print(f"❌ No successful requests: {dict(statuses)}")
+        return
+
+    latencies.sort()
+    print(f"{args.concurrency} users, {args.duration:.0f}s, {len(paths)} paths against {args.url}")
+    print(f"requests: {len(latencies)}  throughput: {len(latencies) / args.duration:.1f} req/s")
+    print(
+        f"latency p50 {statistics.median(latencies):.1f}ms  "
+        f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.1f}ms  "
+        f"p99 {latencies[int(0.99 * (len(latencies) - 1))]:.1f}ms"
+    )
+    print(f"status codes: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
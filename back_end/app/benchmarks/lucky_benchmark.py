@@ -0,0 +1,93 @@
+"""
+Compare COUNT + OFFSET random selection with the in-memory lucky sampler
+as the articles table grows.
+
+    python -m app.benchmarks.lucky_benchmark --sizes 1000,10000,100000,1000000 --runs 50
+
+The table is grown to each size in turn with small synthetic articles
+(bulk inserted); existing rows count towards the size.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy import func, insert
+
+from app.database import SessionLocal
+from app.lucky import LuckySampler, pick_lucky_article, lucky_sampler
+from app.models import Article, Author
+from app.security import hash_password
+
+SUBJECTS = ["Quantum Computing", "Energy Systems", "Optimization", "Deep Learning", "Biology", "Climate"]
+
+
+def grow_articles(db, target: int, batch_size: int = 10000) -> None:
+    author = db.query(Author).first()
+    if author is None:
+        author = Author(name="Benchmark Author", email="bench@example.com", password=hash_password("password123"))
+        db.add(author)
+        db.commit()
+
+    count = db.query(func.count(Article.id)).scalar()
+    rng = random.Random(count)
+    while count < target:
+        n = min(batch_size, target - count)
+        db.execute(insert(Article), [{
+            "title": f"Benchmark article {count + i}",
+            "content": "benchmark",
+            "published_date": date(2024, 1, 1),
+            "author_names": author.name,
+            "corresponding_author_id": author.id,
+            "subject": rng.choice(SUBJECTS),
+        } for i in range(n)])
+        db.commit()
+        count += n
+
+
+def offset_pick(db, subject):
+    """The previous implementation: COUNT, then OFFSET to a random row."""
+    query = db.query(Article.id)
+    if subject:
+        query = query.filter(Article.subject.ilike(f"%{subject}%"))
+    count = query.count()
+    return query.offset(random.randint(0, count - 1)).first()[0]
+
+
+def time_it(fn, db, subject, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(db, subject)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), sorted(timings)[int(0.95 * (runs - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark random article selection")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated table sizes")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--subject", default=None, help="optional subject filter, e.g. 'energy'")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"{'articles':>10}{'offset p50':>12}{'offset p95':>12}{'sampler p50':>13}{'sampler p95':>13}{'load':>11}")
+        for size in sorted(int(s) for s in args.sizes.split(",")):
+            grow_articles(db, size)
+
+            start = time.perf_counter()
+            LuckySampler().load(db)
+            load_ms = (time.perf_counter() - start) * 1000
+            lucky_sampler.load(db)
+
+            o50, o95 = time_it(offset_pick, db, args.subject, args.runs)
+            s50, s95 = time_it(pick_lucky_article, db, args.subject, args.runs)
+            print(f"{size:>10}{o50:>10.2f}ms{o95:>10.2f}ms{s50:>11.3f}ms{s95:>11.3f}ms{load_ms:>9.0f}ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare the ILIKE search path with the full-text index.
+
+    python -m app.benchmarks.search_benchmark --seed 200000 --runs 20
+
+--seed adds synthetic articles first (bulk inserted); without it the
+benchmark runs against whatever is already in DATABASE_URL.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy import insert, or_
+
+from app.database import SessionLocal, engine
+from app.models import Article, Author
+from app.search import ensure_fulltext_index, fulltext_matches
+from app.security import hash_password
+
+VOCABULARY = [
+    "quantum", "neural", "energy", "forecasting", "optimization", "reinforcement", "learning",
+    "graph", "network", "transformer", "simulation", "control", "grid", "protein", "climate",
+    "battery", "catalyst", "genome", "sensor", "robotics", "language", "vision", "privacy",
+    "inference", "bayesian", "stochastic", "materials", "polymer", "fluid", "turbulence",
+]
+# filler words so that topic terms stay selective in article content
+FILLER = [f"{a}{b}{c}" for a in "bcdfgklmnprstvz" for b in "aeiou" for c in ["n", "r", "s", "l", "x", "th"]]
+SUBJECTS = ["Quantum Computing", "Energy Systems", "Optimization", "Deep Learning", "Biology", "Climate"]
+QUERIES = ["quantum", "neural network", "energy forecasting", "optim", "reinforcement learning control"]
+
+
+def seed_articles(count: int, batch_size: int = 5000) -> None:
+    db = SessionLocal()
+    try:
+        author = db.query(Author).first()
+        if author is None:
+            author = Author(name="Benchmark Author", email="bench@example.com", password=hash_password("password123"))
+            db.add(author)
+            db.commit()
+
+        rng = random.Random(42)
+        for start in range(0, count, batch_size):
+            rows = []
+            for _ in range(min(batch_size, count - start)):
+                words = rng.sample(VOCABULARY, 12)
+                rows.append({
+                    "title": " ".join(words[:4]).title(),
+                    "content": " ".join(rng.choices(FILLER, k=150) + words[7:10]),
+                    "published_journal": "Benchmark Journal",
+                    "published_date": date(2024, 1, 1),
+                    "author_names": author.name,
+                    "corresponding_author_id": author.id,
+                    "subject": rng.choice(SUBJECTS),
+                })
+            db.execute(insert(Article), rows)
+            db.commit()
+        print(f"🔹 Seeded {count} articles")
+    finally:
+        db.close()
+
+
+def ilike_search(db, q):
+    term = f"%{q}%"
+    return db.query(Article.id).filter(
+        or_(Article.title.ilike(term), Article.subject.ilike(term), Article.content.ilike(term))
+    ).all()
+
+
+def fulltext_search(db, q):
+    matches = fulltext_matches(db, q)
+    return (
+        db.query(Article.id)
+        .join(matches, matches.c.id == Article.id)
+        .order_by(matches.c.rank.desc())
+        .all()
+    )
+
+
+def time_it(fn, db, q, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        rows = fn(db, q)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), sorted(timings)[int(0.95 * (runs - 1))], len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ILIKE vs full-text article search")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic articles to insert first")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    ensure_fulltext_index(engine)
+    if args.seed:
+        seed_articles(args.seed)
+
+    db = SessionLocal()
+    try:
+        total = db.query(Article).count()
+        print(f"{total} articles, {args.runs} runs per query ({engine.dialect.name})\n")
+        print(f"{'query':<34}{'ilike p50':>11}{'ilike p95':>11}{'fts p50':>11}{'fts p95':>11}{'rows':>14}")
+        for q in QUERIES:
+            i50, i95, irows = time_it(ilike_search, db, q, args.runs)
+            f50, f95, frows = time_it(fulltext_search, db, q, args.runs)
+            print(f"{q:<34}{i50:>9.2f}ms{i95:>9.2f}ms{f50:>9.2f}ms{f95:>9.2f}ms{irows:>7}/{frows:<6}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
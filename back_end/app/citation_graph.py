@@ -0,0 +1,377 @@
+"""
+In-memory citation graph for citation analytics.
+
+References live in the database as rows, so per-article citation counts
+or an author's h-index would otherwise mean one query per article.
+CitationGraph holds references(cited_from_id, cited_to_id) as a CSR
+adjacency over article positions (int32 arrays, ~4 bytes per reference)
+and answers citation counts, PageRank, h-index and top-k lists with a few
+vectorized NumPy passes. Writes in this process update the graph in
+place (new rows are buffered and merged on the next read); it is rebuilt
+from the database after CITATION_GRAPH_TTL_SECONDS to pick up other
+processes' writes. Writes made while a rebuild's queries run are
+journaled and replayed onto the rebuilt graph.
+"""
+import os
+import threading
+import time
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.article import Article
+from app.models.author_article import AuthorArticle
+from app.models.reference import Reference
+
+CITATION_GRAPH_TTL_SECONDS = int(os.getenv("CITATION_GRAPH_TTL_SECONDS", "300"))
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-9  # L1 change per iteration
+PAGERANK_MAX_ITERATIONS = 100
+
+
+def _subject_key(subject: Optional[str]) -> str:
+    return (subject or "").lower()
+
+
+def _int_array(rows: List[tuple], width: int) -> np.ndarray:
+    return np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=width * len(rows)).reshape(-1, width)
+
+
+def _fetch_int_rows(db: Session, stmt) -> List[tuple]:
+    """
+    Rows of an all-integer select as plain DBAPI tuples. Building a Row
+    object per reference costs more than the query itself at this size.
+    """
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(str(stmt.compile(dialect=db.get_bind().dialect)))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def pagerank(indptr: np.ndarray, indices: np.ndarray, alive: np.ndarray, start: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Power-iteration PageRank over a CSR graph (edge citing -> cited).
+    Dangling articles spread their rank evenly; `start` warm-starts the
+    iteration from a previous result.
+    """
+    n = len(indptr) - 1
+    if n == 0 or not alive.any():
+        return np.zeros(n)
+    teleport = alive / alive.sum()
+    out_degree = np.diff(indptr)
+    dangling = out_degree == 0
+    share = np.zeros(n)
+    share[~dangling] = 1.0 / out_degree[~dangling]
+    rank = start if start is not None and len(start) == n else teleport.copy()
+    for _ in range(PAGERANK_MAX_ITERATIONS):
+        spread = np.bincount(indices, weights=np.repeat(rank * share, out_degree), minlength=n)
+        new_rank = PAGERANK_DAMPING * (spread + rank[dangling].sum() * teleport) + (1 - PAGERANK_DAMPING) * teleport
+        converged = np.abs(new_rank - rank).sum() < PAGERANK_TOLERANCE
+        rank = new_rank
+        if converged:
+            break
+    return rank
+
+
+class CitationGraph:
+    """CSR citation graph over article positions, with per-author article lists."""
+
+    def __init__(self, ttl_seconds: int = CITATION_GRAPH_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        # one per running load(): the writes since it began, replayed onto what it loads
+        self._journals: List[List[tuple]] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        # articles, sorted by id; positions index every per-article array
+        self._article_ids = np.zeros(0, dtype=np.int64)
+        self._article_alive = np.zeros(0, dtype=bool)
+        self._subject_codes = np.zeros(0, dtype=np.int32)
+        self._subjects: Dict[str, int] = {}
+        # one entry per reference, as article positions
+        self._src = np.zeros(0, dtype=np.int32)
+        self._dst = np.zeros(0, dtype=np.int32)
+        # authorship (author id, article position)
+        self._author_ids = np.zeros(0, dtype=np.int64)
+        self._author_positions = np.zeros(0, dtype=np.int32)
+        # writes since the last merge: (id, subject, author ids) and (citing id, cited id)
+        self._pending_articles: List[Tuple[int, Optional[str], List[int]]] = []
+        self._pending_references: List[Tuple[int, int]] = []
+        # derived from the above, rebuilt when _version moves
+        self._version = 0
+        self._built_version = -1
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._cited_by = np.zeros(0, dtype=np.int64)
+        self._pagerank: Optional[np.ndarray] = None
+        self._previous_pagerank: Optional[np.ndarray] = None
+
+    # ----- Loading -----
+    def load(self, db: Session) -> None:
+        journal: List[tuple] = []
+        with self._lock:
+            self._journals.append(journal)
+        try:
+            articles = db.execute(select(Article.id, Article.subject).order_by(Article.id)).all()
+            references = _int_array(
+                _fetch_int_rows(db, select(Reference.id, Reference.cited_from_id, Reference.cited_to_id)), 3
+            )
+            authorship = _int_array(_fetch_int_rows(db, select(AuthorArticle.author_id, AuthorArticle.article_id)), 2)
+        except Exception:
+            with self._lock:
+                self._journals.remove(journal)
+            raise
+
+        subjects: Dict[str, int] = {}
+        article_ids = np.fromiter((a[0] for a in articles), dtype=np.int64, count=len(articles))
+        subject_codes = np.fromiter(
+            (subjects.setdefault(_subject_key(a[1]), len(subjects)) for a in articles),
+            dtype=np.int32, count=len(articles),
+        )
+        # rows written between the queries may name articles we did not load
+        src, src_found = self._positions(article_ids, references[:, 1])
+        dst, dst_found = self._positions(article_ids, references[:, 2])
+        keep = src_found & dst_found
+        positions, found = self._positions(article_ids, authorship[:, 1])
+        loaded_reference_ids = np.sort(references[keep, 0])
+
+        with self._lock:
+            self._journals.remove(journal)
+            self._reset()
+            self._article_ids = article_ids
+            self._article_alive = np.ones(len(article_ids), dtype=bool)
+            self._subject_codes = subject_codes
+            self._subjects = subjects
+            self._src, self._dst = src[keep], dst[keep]
+            self._author_ids, self._author_positions = authorship[found, 0], positions[found]
+            self._loaded_at = time.monotonic()
+            self._replay(journal, loaded_reference_ids)
+
+    def _replay(self, journal: List[tuple], loaded_reference_ids: np.ndarray) -> None:
+        """
+        Re-apply writes journaled during load(), skipping those its queries
+        already saw. Caller holds the lock.
+        """
+        for entry in journal:
+            kind, args = entry[0], entry[1:]
+            if kind == "article":
+                _, found = self._positions(self._article_ids, np.array([args[0]]))
+                if not found[0]:
+                    self._pending_articles.append(args)
+            elif kind == "reference":
+                _, found = self._positions(loaded_reference_ids, np.array([args[0]]))
+                if not found[0]:
+                    self._pending_references.append(args[1:])
+            else:
+                self._remove_article(args[0])
+        self._version += 1
+
+    @staticmethod
+    def _positions(article_ids: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.searchsorted(article_ids, ids)
+        found = positions < len(article_ids)
+        found[found] = article_ids[positions[found]] == ids[found]
+        return positions.astype(np.int32), found
+
+    def _refresh(self) -> None:
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception as e:
+            print(f"❌ Citation graph refresh failed: {e}")
+        finally:
+            db.close()
+            self._refreshing = False
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Load on first use. Once stale, keep serving the current graph and
+        rebuild it in a background thread.
+        """
+        if self._loaded_at is None:
+            self.load(db)
+        elif time.monotonic() - self._loaded_at > self.ttl_seconds and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, name="citation-graph-refresh", daemon=True).start()
+
+    # ----- Writes (no-ops until the graph is first loaded, unless a load is running) -----
+    def add_article(self, article_id: int, subject: Optional[str], author_ids: Iterable[int]) -> None:
+        article = (article_id, subject, list(dict.fromkeys(a for a in author_ids if a)))
+        with self._lock:
+            for journal in self._journals:
+                journal.append(("article", *article))
+            if self._loaded_at is not None:
+                self._pending_articles.append(article)
+                self._version += 1
+
+    def add_reference(self, reference_id: int, cited_from_id: int, cited_to_id: int) -> None:
+        with self._lock:
+            for journal in self._journals:
+                journal.append(("reference", reference_id, cited_from_id, cited_to_id))
+            if self._loaded_at is not None:
+                self._pending_references.append((cited_from_id, cited_to_id))
+                self._version += 1
+
+    def remove_article(self, article_id: int) -> None:
+        """Drop an article with its references (they are deleted with it)."""
+        with self._lock:
+            for journal in self._journals:
+                journal.append(("remove", article_id))
+            if self._loaded_at is not None:
+                self._remove_article(article_id)
+
+    def _remove_article(self, article_id: int) -> None:
+        # caller holds the lock
+        self._merge_pending()
+        position, found = self._positions(self._article_ids, np.array([article_id]))
+        if not found[0]:
+            return
+        position = position[0]
+        self._article_alive[position] = False
+        keep = (self._src != position) & (self._dst != position)
+        self._src, self._dst = self._src[keep], self._dst[keep]
+        keep = self._author_positions != position
+        self._author_ids, self._author_positions = self._author_ids[keep], self._author_positions[keep]
+        self._version += 1
+
+    def _merge_pending(self) -> None:
+        """Fold buffered writes into the arrays. Caller holds the lock."""
+        if self._pending_articles:
+            new = self._pending_articles
+            self._pending_articles = []
+            ids = np.concatenate([self._article_ids, [a[0] for a in new]]).astype(np.int64)
+            codes = [self._subjects.setdefault(_subject_key(a[1]), len(self._subjects)) for a in new]
+            self._subject_codes = np.concatenate([self._subject_codes, codes]).astype(np.int32)
+            self._article_alive = np.concatenate([self._article_alive, np.ones(len(new), dtype=bool)])
+            self._article_ids = ids
+            if len(ids) > 1 and (np.diff(ids) <= 0).any():
+                # ids arrived out of order: re-sort and remap every position
+                order = np.argsort(ids, kind="stable")
+                new_position = np.empty_like(order)
+                new_position[order] = np.arange(len(order))
+                self._article_ids = ids[order]
+                self._subject_codes = self._subject_codes[order]
+                self._article_alive = self._article_alive[order]
+                self._src = new_position[self._src].astype(np.int32)
+                self._dst = new_position[self._dst].astype(np.int32)
+                self._author_positions = new_position[self._author_positions].astype(np.int32)
+            links = [(author_id, article_id) for article_id, _, authors in new for author_id in authors]
+            if links:
+                links = _int_array(links, 2)
+                positions, _ = self._positions(self._article_ids, links[:, 1])
+                self._author_ids = np.concatenate([self._author_ids, links[:, 0]])
+                self._author_positions = np.concatenate([self._author_positions, positions])
+
+        if self._pending_references:
+            references = _int_array(self._pending_references, 2)
+            self._pending_references = []
+            src, src_found = self._positions(self._article_ids, references[:, 0])
+            dst, dst_found = self._positions(self._article_ids, references[:, 1])
+            keep = src_found & dst_found
+            self._src = np.concatenate([self._src, src[keep]])
+            self._dst = np.concatenate([self._dst, dst[keep]])
+
+    def _build(self) -> None:
+        """Merge pending writes and rebuild the CSR arrays if anything changed. Caller holds the lock."""
+        if self._built_version == self._version:
+            return
+        self._merge_pending()
+        n = len(self._article_ids)
+        order = np.argsort(self._src, kind="stable")
+        self._indices = self._dst[order]
+        self._indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._src, minlength=n), out=self._indptr[1:])
+        self._cited_by = np.bincount(self._indices, minlength=n)
+        if self._pagerank is not None:
+            self._previous_pagerank = self._pagerank
+        self._pagerank = None
+        self._built_version = self._version
+
+    def _pagerank_scores(self) -> np.ndarray:
+        if self._pagerank is None:
+            self._pagerank = pagerank(self._indptr, self._indices, self._article_alive, self._previous_pagerank)
+        return self._pagerank
+
+    def _subject_mask(self, subject: Optional[str]) -> np.ndarray:
+        """Alive articles whose subject contains `subject` (case-insensitive), like /articles/lucky."""
+        if not subject:
+            return self._article_alive
+        needle = subject.lower()
+        codes = [code for key, code in self._subjects.items() if needle in key]
+        return self._article_alive & np.isin(self._subject_codes, codes)
+
+    # ----- Queries -----
+    def article_stats(self, article_id: int) -> Optional[dict]:
+        with self._lock:
+            self._build()
+            position, found = self._positions(self._article_ids, np.array([article_id]))
+            if not found[0] or not self._article_alive[position[0]]:
+                return None
+            position = position[0]
+            return {
+                "article_id": article_id,
+                "cited_by": int(self._cited_by[position]),
+                "references": int(self._indptr[position + 1] - self._indptr[position]),
+                "pagerank": float(self._pagerank_scores()[position]),
+            }
+
+    def citation_counts(self, article_ids: Iterable[int]) -> Dict[int, int]:
+        """Times each article is cited; articles not in the graph are left out."""
+        ids = np.fromiter(article_ids, dtype=np.int64)
+        with self._lock:
+            self._build()
+            positions, found = self._positions(self._article_ids, ids)
+            found[found] = self._article_alive[positions[found]]
+            return dict(zip(ids[found].tolist(), self._cited_by[positions[found]].tolist()))
+
+    def top_articles(self, limit: int, subject: Optional[str] = None, by: str = "cited_by") -> List[dict]:
+        """The `limit` most cited (or highest PageRank) articles, optionally within a subject."""
+        with self._lock:
+            self._build()
+            mask = self._subject_mask(subject)
+            candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return []
+            scores = self._pagerank_scores() if by == "pagerank" else self._cited_by
+            candidate_scores = scores[candidates]
+            if len(candidates) > limit:
+                top = np.argpartition(-candidate_scores, limit - 1)[:limit]
+            else:
+                top = np.arange(len(candidates))
+            # highest first, ties by id
+            top = top[np.lexsort((candidates[top], -candidate_scores[top]))]
+            pagerank_scores = self._pagerank_scores()
+            return [
+                {
+                    "article_id": int(self._article_ids[p]),
+                    "cited_by": int(self._cited_by[p]),
+                    "pagerank": float(pagerank_scores[p]),
+                }
+                for p in candidates[top]
+            ]
+
+    def author_impact(self, author_id: int) -> dict:
+        """h-index, total citations and article count over the author's articles (author_article)."""
+        with self._lock:
+            self._build()
+            positions = self._author_positions[self._author_ids == author_id]
+            counts = np.sort(self._cited_by[positions])[::-1]
+            h_index = int(np.count_nonzero(counts >= np.arange(1, len(counts) + 1)))
+            return {
+                "author_id": author_id,
+                "h_index": h_index,
+                "citations": int(counts.sum()),
+                "articles": len(counts),
+            }
+
+
+citation_graph = CitationGraph()
@@ -1,20 +1,101 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi.concurrency import run_in_threadpool
+from app.pool_stats import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool_events
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Serve requests through an asyncio engine (asyncpg) instead of the threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# ----- Connection pool (per engine, per process) -----
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # seconds before a connection is replaced; -1 = never
+# true: test every connection on checkout (one extra round trip); false: rely on
+# DB_POOL_RECYCLE and SQLAlchemy's reconnect after a disconnect error
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_POOL_USE_LIFO = os.getenv("DB_POOL_USE_LIFO", "false").lower() == "true"
+
+ASYNC_DRIVERS = {
+    "postgres://": "postgresql+asyncpg://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",  # local only; needs aiosqlite
+}
+
+
+def async_database_url(url: str) -> str:
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def pool_options(url: str, poolclass) -> dict:
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        # in-memory SQLite needs its single shared connection
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": DB_POOL_USE_LIFO,
+    }
+
+
+# The sync engine is always available: background workers, seeds and CLIs use it
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, InstrumentedQueuePool))
+instrument_pool_events(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool))
+    instrument_pool_events(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
 Base = declarative_base()
 
-def get_db():
+
+class Database:
+    """
+    Request-scoped database handle for async route handlers.
+
+    `await db.run(fn, *args)` calls `fn(session, *args)` with a regular ORM
+    Session. In async mode the session is the sync facade of an AsyncSession
+    and fn runs on the event loop (SQLAlchemy's run_sync), awaiting the
+    driver at every query; otherwise fn runs in the threadpool as sync
+    routes always have. Either way route code stays ordinary ORM code.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_db():
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield Database(session)
+        return
+
     db = SessionLocal()
     try:
-        yield db
+        yield Database(db)
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
@@ -0,0 +1,90 @@
+"""
+HTTP caching for read endpoints.
+
+Articles, authors and references carry a `version` column that every
+UPDATE bumps. Each cached route derives a strong ETag from the versions
+of everything its payload is built from, read with one small query, and
+answers a matching If-None-Match with 304 before loading or serializing
+the rest. Writes need no explicit invalidation: they bump a version (or
+delete the row), which changes the ETag.
+"""
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.article import Article
+from app.models.author import Author
+from app.models.author_article import AuthorArticle
+from app.models.author_stats import AuthorStats
+
+# articles practically never change after creation; references are rescored
+# and patched, and author payloads carry an email address
+ARTICLE_CACHE_CONTROL = os.getenv("ARTICLE_CACHE_CONTROL", "public, max-age=300")
+REFERENCE_CACHE_CONTROL = os.getenv("REFERENCE_CACHE_CONTROL", "public, no-cache")
+AUTHOR_CACHE_CONTROL = os.getenv("AUTHOR_CACHE_CONTROL", "private, no-cache")
+
+
+# -------------------- ETags --------------------
+def make_etag(*parts) -> str:
+    """A strong ETag over the given values."""
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def check_etag(response: Response, if_none_match: Optional[str], etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Set ETag and Cache-Control on the response. Returns a 304 response
+    for the handler to return when the client already has this version.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+# -------------------- Versions --------------------
+def article_etag(db: Session, id: int) -> Optional[str]:
+    """ETag of ArticleOut: the article and the names of its linked authors. None if missing."""
+    rows = db.execute(
+        select(Article.version, AuthorArticle.author_id, Author.version)
+        .outerjoin(AuthorArticle, AuthorArticle.article_id == Article.id)
+        .outerjoin(Author, Author.id == AuthorArticle.author_id)
+        .where(Article.id == id)
+        .order_by(AuthorArticle.author_id)
+    ).all()
+    if not rows:
+        return None
+    return make_etag("article", id, *(tuple(row) for row in rows))
+
+
+def author_etag(db: Session, id: int) -> Optional[str]:
+    """ETag of AuthorOut: the author, their article links and their stats refresh. None if missing."""
+    rows = db.execute(
+        select(Author.version, AuthorStats.refreshed_at, AuthorArticle.article_id)
+        .outerjoin(AuthorStats, AuthorStats.author_id == Author.id)
+        .outerjoin(AuthorArticle, AuthorArticle.author_id == Author.id)
+        .where(Author.id == id)
+        .order_by(AuthorArticle.article_id)
+    ).all()
+    if not rows:
+        return None
+    version, refreshed_at, _ = rows[0]
+    return make_etag("author", id, version, str(refreshed_at), *(row.article_id for row in rows))
+
+
+def reference_etag(id: int, version: int) -> str:
+    # cited article titles never change, so the reference's own version covers ReferenceOut
+    return make_etag("reference", id, version)
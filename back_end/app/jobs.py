@@ -0,0 +1,228 @@
+"""
+Background AI scoring queue.
+
+References are committed together with a pending ScoreJob row; worker
+threads claim jobs from the `score_jobs` table (batched per citing
+article), ask Gemini for the scores, write them to
+`Reference.ai_rated_score`. Failed jobs are retried with exponential
+backoff. Workers run inside the API process (SCORE_WORKERS_IN_APP) or as a separate
+process:
+
+    python -m app.jobs --workers 4
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.reference import Reference
+from app.models.score_job import ScoreJob
+from app.ai_score import SCORE_BATCH_SIZE
+from app.score_cache import score_references_cached, score_cache
+
+SCORE_WORKERS = int(os.getenv("SCORE_WORKERS", "2"))
+SCORE_WORKERS_IN_APP = os.getenv("SCORE_WORKERS_IN_APP", "true").lower() == "true"
+SCORE_JOB_POLL_SECONDS = float(os.getenv("SCORE_JOB_POLL_SECONDS", "1.0"))
+SCORE_JOB_MAX_ATTEMPTS = int(os.getenv("SCORE_JOB_MAX_ATTEMPTS", "3"))
+SCORE_JOB_STALE_SECONDS = int(os.getenv("SCORE_JOB_STALE_SECONDS", "600"))
+SCORE_JOB_RETRY_BASE_SECONDS = float(os.getenv("SCORE_JOB_RETRY_BASE_SECONDS", "30"))
+SCORE_JOB_RETRY_MAX_SECONDS = float(os.getenv("SCORE_JOB_RETRY_MAX_SECONDS", "1800"))
+# How often a worker looks for jobs left 'running' by a worker that died
+SCORE_JOB_REQUEUE_SECONDS = float(os.getenv("SCORE_JOB_REQUEUE_SECONDS", "60"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# -------------------- Queue --------------------
+def enqueue_score_job(db: Session, reference: Reference) -> ScoreJob:
+    """
+    Add a pending job for a reference. Not committed here so the job is
+    written in the same transaction as the reference itself.
+    """
+    job = ScoreJob(reference=reference, status="pending", attempts=0)
+    db.add(job)
+    return job
+
+
+def get_latest_job(db: Session, reference_id: int) -> Optional[ScoreJob]:
+    return (
+        db.query(ScoreJob)
+        .filter(ScoreJob.reference_id == reference_id)
+        .order_by(ScoreJob.id.desc())
+        .first()
+    )
+
+
+def claim_next_jobs(db: Session, limit: int = SCORE_BATCH_SIZE) -> List[ScoreJob]:
+    """
+    Atomically move up to `limit` due pending jobs to 'running'.
+    Jobs are claimed together when their references share the citing
+    article of the oldest pending job, so one Gemini call can score them
+    all. The conditional UPDATE makes the claim safe across threads and
+    processes; on Postgres SKIP LOCKED also keeps workers from queueing
+    behind each other.
+    """
+    skip_locked = db.bind.dialect.name == "postgresql"
+    while True:
+        query = (
+            db.query(ScoreJob.id, Reference.cited_from_id)
+            .join(Reference, Reference.id == ScoreJob.reference_id)
+            .filter(ScoreJob.status == "pending", ScoreJob.next_attempt_at <= _now())
+            .order_by(ScoreJob.id)
+        )
+        if skip_locked:
+            query = query.with_for_update(skip_locked=True, of=ScoreJob)
+
+        oldest = query.first()
+        if oldest is None:
+            db.rollback()
+            return []
+
+        candidate_ids = [
+            row.id
+            for row in query.filter(Reference.cited_from_id == oldest.cited_from_id).limit(limit)
+        ]
+        claimed_ids = db.execute(
+            update(ScoreJob)
+            .where(ScoreJob.id.in_(candidate_ids), ScoreJob.status == "pending")
+            .values(status="running", attempts=ScoreJob.attempts + 1)
+            .returning(ScoreJob.id)
+        ).scalars().all()
+        db.commit()
+        if claimed_ids:
+            return db.query(ScoreJob).filter(ScoreJob.id.in_(claimed_ids)).order_by(ScoreJob.id).all()
+        # another worker got there first, try again
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Put jobs left 'running' by a crashed worker back in the queue."""
+    cutoff = _now() - timedelta(seconds=SCORE_JOB_STALE_SECONDS)
+    result = db.execute(
+        update(ScoreJob)
+        .where(ScoreJob.status == "running", ScoreJob.updated_at < cutoff)
+        .values(status="pending")
+    )
+    db.commit()
+    return result.rowcount
+
+
+def run_score_jobs(db: Session, jobs: List[ScoreJob]) -> None:
+    """
+    Score a batch of claimed jobs and record the outcomes.
+    References that already carry a score (e.g. scored through
+    POST /references/score-batch) are not sent to Gemini again.
+    """
+    to_score = [job.reference for job in jobs if job.reference.ai_rated_score is None]
+    try:
+        results, _ = score_references_cached(db, to_score)
+        error = "AI score returned None"
+    except Exception as e:
+        db.rollback()
+        results, error = {}, str(e)
+
+    for job in jobs:
+        reference = job.reference
+        if reference.ai_rated_score is None:
+            result = results.get(reference.id)
+            if result is not None:
+                reference.ai_rated_score = result.score
+                print(f"✅ AI score saved for reference {reference.id}: {result.score}/10")
+
+        if reference.ai_rated_score is not None:
+            job.status = "done"
+            job.last_error = None
+        elif job.attempts < SCORE_JOB_MAX_ATTEMPTS:
+            # back off so an outage or rate limit does not use up every attempt at once
+            backoff = min(SCORE_JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1), SCORE_JOB_RETRY_MAX_SECONDS)
+            job.status = "pending"
+            job.next_attempt_at = _now() + timedelta(seconds=backoff)
+            job.last_error = error
+            print(f"⚠️ Scoring reference {reference.id} failed, will retry in {backoff:.0f}s: {error}")
+        else:
+            job.status = "failed"
+            job.last_error = error
+            print(f"❌ Scoring reference {reference.id} failed permanently: {error}")
+    db.commit()
+
+
+# -------------------- Workers --------------------
+class ScoreWorkerPool:
+    """A fixed number of threads draining the score_jobs table."""
+
+    def __init__(self, workers: int = SCORE_WORKERS, poll_seconds: float = SCORE_JOB_POLL_SECONDS):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._requeue_lock = threading.Lock()
+        self._requeued_at = 0.0
+
+    def _requeue_stale(self, db: Session) -> None:
+        """Requeue jobs of dead workers, at most every SCORE_JOB_REQUEUE_SECONDS across the pool."""
+        with self._requeue_lock:
+            if time.monotonic() - self._requeued_at < SCORE_JOB_REQUEUE_SECONDS:
+                return
+            self._requeued_at = time.monotonic()
+        requeued = requeue_stale_jobs(db)
+        if requeued:
+            print(f"🔁 Requeued {requeued} stale score jobs")
+
+    def start(self) -> None:
+        db = SessionLocal()
+        try:
+            self._requeue_stale(db)
+            pruned = score_cache.prune(db)
+            if pruned:
+                print(f"🧹 Pruned {pruned} score cache rows")
+        finally:
+            db.close()
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"score-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"🤖 Started {self.workers} score workers")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                self._requeue_stale(db)
+                jobs = claim_next_jobs(db)
+                if jobs:
+                    run_score_jobs(db, jobs)
+                    continue
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Score worker error: {e}")
+            finally:
+                db.close()
+            self._stop.wait(self.poll_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run AI scoring workers")
+    parser.add_argument("--workers", type=int, default=SCORE_WORKERS)
+    args = parser.parse_args()
+
+    pool = ScoreWorkerPool(workers=args.workers)
+    pool.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
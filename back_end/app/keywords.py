@@ -0,0 +1,95 @@
+"""
+Normalized article keywords.
+
+Each distinct keyword is stored once in `keywords` (unique on its
+normalized form) and linked to articles through `article_keyword`, so
+keyword search is an indexed join and keyword lists for a page of
+articles come back in a single query.
+"""
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.article_keyword import ArticleKeyword
+from app.models.keyword import Keyword
+
+
+def normalize_keyword(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def get_or_create_keywords(db: Session, names: Iterable[str]) -> Dict[str, Keyword]:
+    """
+    Resolve keyword names to Keyword rows, creating missing ones.
+    Returns {normalized: Keyword}. One SELECT, plus one INSERT when needed.
+    """
+    wanted = {}
+    for name in names:
+        if name and name.strip():
+            wanted.setdefault(normalize_keyword(name), " ".join(name.split()))
+    if not wanted:
+        return {}
+
+    missing = set(wanted) - set(
+        db.execute(select(Keyword.normalized).where(Keyword.normalized.in_(wanted))).scalars()
+    )
+    if missing:
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        db.execute(
+            dialect.insert(Keyword)
+            .values([{"name": wanted[n], "normalized": n} for n in missing])
+            .on_conflict_do_nothing(index_elements=[Keyword.normalized])
+        )
+
+    keywords = db.execute(select(Keyword).where(Keyword.normalized.in_(wanted))).scalars().all()
+    return {k.normalized: k for k in keywords}
+
+
+def keyword_ids_in_order(names: Iterable[str], by_normalized: Dict[str, Keyword]) -> List[int]:
+    """Keyword ids for the given names in order, skipping blanks and duplicates."""
+    ids = []
+    seen = set()
+    for name in names:
+        normalized = normalize_keyword(name) if name else ""
+        if normalized in by_normalized and normalized not in seen:
+            seen.add(normalized)
+            ids.append(by_normalized[normalized].id)
+    return ids
+
+
+def set_article_keywords(db: Session, article, names: List[str]) -> None:
+    """Replace an article's keywords, keeping the given order and dropping duplicates."""
+    by_normalized = get_or_create_keywords(db, names)
+    article.keyword_links.clear()
+    for position, keyword_id in enumerate(keyword_ids_in_order(names, by_normalized)):
+        article.keyword_links.append(ArticleKeyword(keyword_id=keyword_id, position=position))
+
+
+def load_keywords(db: Session, article_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Keyword names for many articles in one query: {article_id: [name, ...]}."""
+    article_ids = list(article_ids)
+    result: Dict[int, List[str]] = {article_id: [] for article_id in article_ids}
+    if not article_ids:
+        return result
+
+    rows = db.execute(
+        select(ArticleKeyword.article_id, Keyword.name)
+        .join(Keyword, Keyword.id == ArticleKeyword.keyword_id)
+        .where(ArticleKeyword.article_id.in_(article_ids))
+        .order_by(ArticleKeyword.article_id, ArticleKeyword.position)
+    )
+    for article_id, name in rows:
+        result[article_id].append(name)
+    return result
+
+
+def articles_with_keywords(names: Iterable[str]):
+    """Subquery of article ids carrying any of the given keywords."""
+    normalized = [normalize_keyword(n) for n in names if n and n.strip()]
+    return (
+        select(ArticleKeyword.article_id)
+        .join(Keyword, Keyword.id == ArticleKeyword.keyword_id)
+        .where(Keyword.normalized.in_(normalized))
+    )
@@ -0,0 +1,178 @@
+"""
+Random article selection for /articles/lucky.
+
+COUNT + OFFSET walks and discards up to N rows per pick. LuckySampler
+instead keeps the article ids in memory, grouped by subject, so a pick
+is a random index into an array whose cost depends on the number of
+distinct subjects, not articles. The arrays are updated on article
+writes in this process and rebuilt after LUCKY_INDEX_TTL_SECONDS to pick
+up other processes' writes; writes made while a rebuild runs are replayed
+onto it.
+"""
+import os
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.article import Article
+
+LUCKY_INDEX_TTL_SECONDS = int(os.getenv("LUCKY_INDEX_TTL_SECONDS", "300"))
+LUCKY_MAX_TRIES = 5
+
+
+def _subject_key(subject: Optional[str]) -> str:
+    return (subject or "").lower()
+
+
+def _sorted_contains(ids: Optional[array], article_id: int) -> bool:
+    if ids is None:
+        return False
+    i = bisect_left(ids, article_id)
+    return i < len(ids) and ids[i] == article_id
+
+
+class LuckySampler:
+    """
+    Per-subject in-memory id arrays: O(1) add and remove, and a pick that
+    is linear in the number of distinct subjects, not articles.
+    """
+
+    def __init__(self, ttl_seconds: int = LUCKY_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        # compact int64 arrays: ~8 bytes per article
+        self._ids: Dict[str, array] = {}
+        # deleted ids are skipped at pick time and dropped on the next rebuild
+        self._removed: Set[int] = set()
+        # one per running load(): the writes since it began, replayed onto what it loads
+        self._journals: List[List[tuple]] = []
+
+    def load(self, db: Session) -> None:
+        journal: List[tuple] = []
+        with self._lock:
+            self._journals.append(journal)
+        try:
+            ids: Dict[str, array] = {}
+            # in id order, so each group is sorted for the replay below
+            for article_id, subject in db.execute(select(Article.id, Article.subject).order_by(Article.id)):
+                key = _subject_key(subject)
+                group = ids.get(key)
+                if group is None:
+                    group = ids[key] = array("q")
+                group.append(article_id)
+        except Exception:
+            with self._lock:
+                self._journals.remove(journal)
+            raise
+
+        with self._lock:
+            self._journals.remove(journal)
+            removed = {article_id for kind, article_id, _ in journal if kind == "remove"}
+            # writes made after the query started; skip articles it already saw
+            added = [
+                (article_id, key) for kind, article_id, key in journal
+                if kind == "add" and not _sorted_contains(ids.get(key), article_id)
+            ]
+            for article_id, key in added:
+                ids.setdefault(key, array("q")).append(article_id)
+            self._ids = ids
+            self._removed = removed
+            self._loaded_at = time.monotonic()
+
+    def _refresh(self) -> None:
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception as e:
+            print(f"❌ Lucky sampler refresh failed: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._refreshing = False
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Load on first use. Once stale, keep serving the current arrays and
+        rebuild them in a background thread, one at a time.
+        """
+        if self._loaded_at is None:
+            self.load(db)
+            return
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._loaded_at <= self.ttl_seconds:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="lucky-refresh", daemon=True).start()
+
+    def add(self, article: Article) -> None:
+        """Track a new article (no-op until the sampler is first loaded, unless a load is running)."""
+        key = _subject_key(article.subject)
+        with self._lock:
+            for journal in self._journals:
+                journal.append(("add", article.id, key))
+            if self._loaded_at is None:
+                return
+            self._ids.setdefault(key, array("q")).append(article.id)
+            self._removed.discard(article.id)
+
+    def remove(self, article_id: int) -> None:
+        with self._lock:
+            for journal in self._journals:
+                journal.append(("remove", article_id, None))
+            if self._loaded_at is not None:
+                self._removed.add(article_id)
+
+    def pick(self, subject: Optional[str] = None) -> Optional[int]:
+        """
+        A uniformly random article id, optionally among articles whose
+        subject contains `subject` (case-insensitive). None if there are none.
+        """
+        with self._lock:
+            if subject:
+                needle = subject.lower()
+                groups = [ids for key, ids in self._ids.items() if needle in key]
+            else:
+                groups = list(self._ids.values())
+            total = sum(len(ids) for ids in groups)
+            if total == 0:
+                return None
+            for _ in range(LUCKY_MAX_TRIES):
+                index = random.randrange(total)
+                for ids in groups:
+                    if index < len(ids):
+                        break
+                    index -= len(ids)
+                if ids[index] not in self._removed:
+                    break
+            # may still be a removed id if most of the group is gone; the caller checks
+            return ids[index]
+
+
+lucky_sampler = LuckySampler()
+
+
+def pick_lucky_article(db: Session, subject: Optional[str] = None) -> Optional[int]:
+    """
+    Pick a random article id, confirming it still exists (another process
+    may have deleted it since the sampler was loaded).
+    """
+    lucky_sampler.ensure_loaded(db)
+    for _ in range(LUCKY_MAX_TRIES):
+        article_id = lucky_sampler.pick(subject)
+        if article_id is None:
+            return None
+        if db.execute(select(Article.id).where(Article.id == article_id)).first():
+            return article_id
+        lucky_sampler.remove(article_id)
+    # the sampler is badly out of date; rebuild it once
+    lucky_sampler.load(db)
+    return lucky_sampler.pick(subject)
@@ -1,19 +1,73 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from app.models.author import Author
 from app.models.article import Article
 from app.models.author_article import AuthorArticle
 from app.models.reference import Reference
+from app.models.keyword import Keyword
+from app.models.article_keyword import ArticleKeyword
+from app.models.score_job import ScoreJob
+from app.models.score_cache import ScoreCacheEntry
+from app.models.email_outbox import EmailOutbox
 
 from app.routes.author_routes import router as authors_router
 from app.routes.article_routes import router as articles_router
 from app.routes.reference_routes import router as references_router
 from app.routes.client_routes import router as client_router
+from app.routes.export_routes import router as export_router
+from app.routes.graph_routes import router as graph_router
+
+from app.jobs import ScoreWorkerPool, SCORE_WORKERS_IN_APP
+from app.outbox import OutboxDispatcher, OUTBOX_DISPATCH_IN_APP
+from app.author_stats import AuthorStatsRefresher, AUTHOR_STATS_REFRESH_IN_APP
+from app.ai_score import get_scorer, close_scorer
+from app.database import engine, async_engine
+from app.pool_stats import pool_stats
+from app.security import PASSWORD_HASH_RETRY_AFTER, PasswordHasherBusy, password_hasher
+from app.search import ensure_fulltext_index
+from app.pagination import NEXT_CURSOR_HEADER
+from app.response_cache import response_cache
 
 from fastapi.middleware.cors import CORSMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # SQLite needs its FTS5 table; Postgres gets search_vector from Alembic
+    ensure_fulltext_index(engine)
+
+    # one long-lived scorer (and its HTTP client) per process
+    get_scorer()
+
+    # AI scoring workers run alongside the API unless deployed separately (python -m app.jobs)
+    score_workers = ScoreWorkerPool() if SCORE_WORKERS_IN_APP else None
+    if score_workers:
+        score_workers.start()
+
+    # Validation emails are sent from the outbox (or python -m app.outbox)
+    outbox_dispatcher = OutboxDispatcher() if OUTBOX_DISPATCH_IN_APP else None
+    if outbox_dispatcher:
+        outbox_dispatcher.start()
 
-app = FastAPI()
+    # author_stats is recomputed for queued authors (or python -m app.author_stats)
+    author_stats_refresher = AuthorStatsRefresher() if AUTHOR_STATS_REFRESH_IN_APP else None
+    if author_stats_refresher:
+        author_stats_refresher.start()
+    yield
+    if author_stats_refresher:
+        author_stats_refresher.stop(timeout=5)
+    if outbox_dispatcher:
+        outbox_dispatcher.stop(timeout=5)
+    if score_workers:
+        score_workers.stop(timeout=5)
+    close_scorer()
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,8 +80,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    # shed load instead of queueing bcrypt work behind a full pool
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
+
 @app.get("/")
 def root():
     return {"message": "Welcome to reference checking system."}
@@ -37,8 +101,34 @@ app.include_router(authors_router)
 app.include_router(articles_router)
 app.include_router(references_router)
 app.include_router(client_router)
+app.include_router(export_router)
+app.include_router(graph_router)
 
 
 @app.get("/debug", tags=["Debug"])
 def debug():
-    return {"debug": "visible"}
\ No newline at end of file
+    return {"debug": "visible"}
+
+
+@app.get("/debug/pool", tags=["Debug"])
+def debug_pool():
+    """
+    Connection pool state for this process: checked-out, idle and overflow
+    connections plus a histogram of checkout wait times.
+    """
+    stats = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.sync_engine)
+    return stats
+
+
+@app.get("/debug/password-hasher", tags=["Debug"])
+def debug_password_hasher():
+    """Password hashing pool: queued, completed and rejected (503) operations."""
+    return password_hasher.stats()
+
+
+@app.get("/debug/response-cache", tags=["Debug"])
+def debug_response_cache():
+    """Serialized response cache: hit ratio, memory use and invalidations."""
+    return response_cache.stats()
@@ -2,6 +2,20 @@ from .article import Article
 from .author import Author
 from .author_article import AuthorArticle
 from .reference import Reference
+from .keyword import Keyword
+from .article_keyword import ArticleKeyword
+from .score_job import ScoreJob
+from .score_cache import ScoreCacheEntry
+from .email_outbox import EmailOutbox
+from .article_stats import ArticleStats
+from .author_stats import AuthorStats
+from .author_stats_dirty import AuthorStatsDirty
 
-__all__ = ["Article", "Author", "AuthorArticle","Reference"]
+__all__ = ["Article", "Author", "AuthorArticle","Reference", "Keyword", "ArticleKeyword", "ScoreJob", "ScoreCacheEntry", "EmailOutbox", "ArticleStats", "AuthorStats", "AuthorStatsDirty"]
+
+# keep article_stats in step with every ORM write to references, queue
+# the authors whose author_stats go stale, and drop cached responses
+import app.article_stats  # noqa: E402,F401
+import app.author_stats  # noqa: E402,F401
+import app.response_cache  # noqa: E402,F401
 print("models loaded")
\ No newline at end of file
@@ -14,7 +14,10 @@ class Article(Base):
     author_names = Column(String, nullable=False)  # optional human-readable
     corresponding_author_id = Column(Integer, ForeignKey("authors.id"), nullable=False)
     subject = Column(String, nullable=True)
-    keywords = Column(String, nullable=True) 
+    # bumped by every UPDATE; HTTP ETags are derived from it (see app/http_cache.py)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
+    # keywords live in the keywords / article_keyword tables (see app/keywords.py)
+    # search_vector (tsvector, Postgres only) is generated by the database; see app/search.py
 
     # relationship to corresponding author
     corresponding_author = relationship("Author", foreign_keys=[corresponding_author_id])
@@ -25,6 +28,9 @@ class Article(Base):
     # convenience: directly get Author objects
     authors = association_proxy("author_links", "author")
 
+    # keyword links, in the order the keywords were entered
+    keyword_links = relationship("ArticleKeyword", back_populates="article", cascade="all, delete-orphan", order_by="ArticleKeyword.position")
+
     # references this article makes
     outgoing_references = relationship("Reference", foreign_keys="Reference.cited_from_id", back_populates="cited_from", cascade="all, delete-orphan")
 
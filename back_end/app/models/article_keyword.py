@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class ArticleKeyword(Base):
+    __tablename__ = "article_keyword"
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    keyword_id = Column(Integer, ForeignKey("keywords.id", ondelete="CASCADE"), primary_key=True, index=True)
+    position = Column(Integer, nullable=False, default=0)  # keeps the author's keyword order
+
+    article = relationship("Article", back_populates="keyword_links")
+    keyword = relationship("Keyword", back_populates="article_links")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.database import Base
+
+class ArticleStats(Base):
+    """Per-article citation counters, kept in step with `references` by app/article_stats.py."""
+    __tablename__ = "article_stats"
+    __table_args__ = (
+        # "most cited" lists seek on (cited_by_count desc, article_id)
+        Index("ix_article_stats_cited_by_count_article_id", "cited_by_count", "article_id"),
+    )
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+
+    # references pointing to the article, and how many of them are key references
+    cited_by_count = Column(Integer, nullable=False, default=0, server_default="0")
+    key_reference_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # references the article makes
+    references_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # AI scores of the references pointing to the article (average = sum / count)
+    score_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    score_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.associationproxy import association_proxy
 from app.database import Base
@@ -12,6 +12,8 @@ class Author(Base):
     institute = Column(String, nullable=True)
     job = Column(String, nullable=True)
     password = Column(String, nullable=False)  # store hashed password
+    # bumped by every UPDATE; HTTP ETags are derived from it (see app/http_cache.py)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
     
     # link to AuthorArticle junction table
     article_links = relationship("AuthorArticle",back_populates="author",cascade="all, delete-orphan")
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON, func
+from app.database import Base
+
+class AuthorStats(Base):
+    """
+    Quality of the references pointing at an author's articles, recomputed
+    by app/author_stats.py for the authors queued in `author_stats_dirty`.
+    """
+    __tablename__ = "author_stats"
+
+    author_id = Column(Integer, ForeignKey("authors.id", ondelete="CASCADE"), primary_key=True)
+
+    # references to any article linked to the author through author_article
+    references_count = Column(Integer, nullable=False, default=0, server_default="0")
+    key_reference_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # ... with an AI score (average = sum / count), and per-score counts {"7": 12, ...}
+    scored_count = Column(Integer, nullable=False, default=0, server_default="0")
+    score_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    score_distribution = Column(JSON, nullable=False, default=dict)
+    # ... with feedback from the cited author
+    feedback_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    refreshed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
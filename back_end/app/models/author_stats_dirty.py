@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, DateTime, func
+from app.database import Base
+
+class AuthorStatsDirty(Base):
+    """
+    Authors whose stats are stale. Written in the same transaction as the
+    reference or authorship change; drained by the author stats refresher.
+    """
+    __tablename__ = "author_stats_dirty"
+
+    id = Column(Integer, primary_key=True)
+    # no foreign key: a deleted author is queued so its stats row is removed
+    author_id = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
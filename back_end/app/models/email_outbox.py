@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    reference_id = Column(Integer, ForeignKey("references.id", ondelete="SET NULL"), nullable=True, index=True)
+    recipient = Column(String, nullable=False, index=True)
+    recipient_name = Column(String, nullable=True)
+
+    # pending -> sending -> sent | failed | cancelled
+    status = Column(String, nullable=False, default="pending", server_default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    last_error = Column(String, nullable=True)
+    # when a dispatcher moved it to 'sending'; rows stuck there longer than
+    # OUTBOX_STALE_SECONDS belong to a dispatcher that died
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    reference = relationship("Reference")
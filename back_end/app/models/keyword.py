@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class Keyword(Base):
+    __tablename__ = "keywords"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)  # display form, as first entered
+    normalized = Column(String, nullable=False, unique=True, index=True)  # lower-cased, single-spaced
+
+    article_links = relationship("ArticleKeyword", back_populates="keyword", cascade="all, delete-orphan")
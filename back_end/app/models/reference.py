@@ -1,22 +1,33 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, text
+from sqlalchemy.orm import column_property, relationship
 from app.database import Base
 
 class Reference(Base):
     __tablename__ = "references"
+    __table_args__ = (
+        # keyset pagination of /references/from and /references/to seeks on (article, id)
+        Index("ix_references_cited_from_id_id", "cited_from_id", "id"),
+        Index("ix_references_cited_to_id_id", "cited_to_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     content = Column(String, nullable=False)
 
-    cited_from_id = Column(Integer, ForeignKey("articles.id"), nullable=False)
-    cited_to_id = Column(Integer, ForeignKey("articles.id"), nullable=False)
+    # active_history: the old value is loaded on change so article_stats can apply the difference
+    cited_from_id = column_property(Column(Integer, ForeignKey("articles.id"), nullable=False), active_history=True)
+    cited_to_id = column_property(Column(Integer, ForeignKey("articles.id"), nullable=False), active_history=True)
     
-    if_key_reference = Column(Boolean, nullable=False)
+    if_key_reference = column_property(Column(Boolean, nullable=False), active_history=True)
     if_secondary_reference = Column(Boolean, nullable=False)
     citation_content = Column(String, nullable=True)
-    ai_rated_score = Column(Integer, nullable=True)
+    ai_rated_score = column_property(Column(Integer, nullable=True), active_history=True)
     feedback = Column(String, nullable=True)
     author_comment = Column(String, nullable=True)
+    # bumped by every UPDATE; HTTP ETags are derived from it (see app/http_cache.py)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
 
     cited_from = relationship("Article", foreign_keys=[cited_from_id], back_populates="outgoing_references")
-    cited_to = relationship("Article", foreign_keys=[cited_to_id], back_populates="incoming_references")
\ No newline at end of file
+    cited_to = relationship("Article", foreign_keys=[cited_to_id], back_populates="incoming_references")
+
+    # background AI scoring jobs for this reference
+    score_jobs = relationship("ScoreJob", back_populates="reference", cascade="all, delete-orphan")
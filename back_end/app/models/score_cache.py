@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from app.database import Base
+
+class ScoreCacheEntry(Base):
+    __tablename__ = "score_cache"
+
+    # sha256 of the normalized prompt inputs + model name
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    score = Column(Integer, nullable=False)
+    reasoning = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
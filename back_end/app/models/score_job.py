@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class ScoreJob(Base):
+    __tablename__ = "score_jobs"
+
+    id = Column(Integer, primary_key=True)
+    reference_id = Column(Integer, ForeignKey("references.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # pending -> running -> done | failed
+    status = Column(String, nullable=False, default="pending", server_default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(String, nullable=True)
+    # a failed attempt is retried after an exponential backoff
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    reference = relationship("Reference", back_populates="score_jobs")
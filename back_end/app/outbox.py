@@ -0,0 +1,299 @@
+"""
+Transactional email outbox.
+
+Validation emails are written to the `email_outbox` table in the same
+transaction as the reference they are about, and a dispatcher thread
+sends them in the background with retries and exponential backoff.
+With OUTBOX_DIGEST_SECONDS set, all pending requests for one recipient
+are merged into a single email per window. The dispatcher runs inside
+the API process (OUTBOX_DISPATCH_IN_APP) or as a separate process:
+
+    python -m app.outbox
+"""
+import abc
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, not_, or_, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.email_outbox import EmailOutbox
+from app.models.reference import Reference
+from app.models.score_job import ScoreJob
+from app.validation_email import build_digest_email, build_validation_email
+
+ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
+MAIL_BACKEND = os.getenv("MAIL_BACKEND", "resend")  # "resend" or "memory"
+OUTBOX_DISPATCH_IN_APP = os.getenv("OUTBOX_DISPATCH_IN_APP", "true").lower() == "true"
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "2.0"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "30"))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "3600"))
+OUTBOX_DIGEST_SECONDS = int(os.getenv("OUTBOX_DIGEST_SECONDS", "0"))  # 0 = one email per reference
+# How long an email waits for its reference's AI score before going out without it
+OUTBOX_SCORE_WAIT_SECONDS = int(os.getenv("OUTBOX_SCORE_WAIT_SECONDS", "120"))
+# How long a message may stay 'sending' before another dispatcher takes it over
+OUTBOX_STALE_SECONDS = int(os.getenv("OUTBOX_STALE_SECONDS", "600"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# -------------------- Mailers --------------------
+class Mailer(abc.ABC):
+    @abc.abstractmethod
+    def send(self, params: dict) -> None:
+        ...
+
+
+class ResendMailer(Mailer):
+    def __init__(self):
+        import resend
+
+        resend.api_key = os.getenv("RESEND_API_KEY")
+        self._resend = resend
+
+    def send(self, params):
+        self._resend.Emails.send(params)
+
+
+class MemoryMailer(Mailer):
+    """Local mail sink: keeps sent messages in memory instead of delivering them."""
+
+    def __init__(self, fail_times: int = 0):
+        self.sent: List[dict] = []
+        self.fail_times = fail_times
+
+    def send(self, params):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("simulated mail failure")
+        self.sent.append(params)
+
+
+MAIL_BACKENDS = {
+    "resend": ResendMailer,
+    "memory": MemoryMailer,
+}
+
+
+def get_mailer() -> Mailer:
+    if MAIL_BACKEND not in MAIL_BACKENDS:
+        raise ValueError(f"Unknown MAIL_BACKEND '{MAIL_BACKEND}'")
+    return MAIL_BACKENDS[MAIL_BACKEND]()
+
+
+# -------------------- Outbox --------------------
+def enqueue_validation_email(db: Session, reference: Reference, referenced_article) -> Optional[EmailOutbox]:
+    """
+    Queue the validation email for a new reference. Not committed here so
+    the message is written in the same transaction as the reference.
+    """
+    validator = referenced_article.corresponding_author
+
+    # Only send email if it's the admin email (testing mode)
+    if validator.email != ADMIN_EMAIL:
+        print(f"⚠️ Skipping email to {validator.email} (not admin email, testing mode)")
+        return None
+
+    message = EmailOutbox(
+        reference=reference,
+        recipient=validator.email,
+        recipient_name=validator.name,
+        status="pending",
+        attempts=0,
+        next_attempt_at=_now() + timedelta(seconds=OUTBOX_DIGEST_SECONDS),
+    )
+    db.add(message)
+    return message
+
+
+def claim_due_messages(db: Session, limit: int = OUTBOX_BATCH_SIZE) -> List[EmailOutbox]:
+    """
+    Move due messages to 'sending'. In digest mode the other pending
+    messages for the same recipients that fall in the current window are
+    swept into the claim as well; messages waiting out a retry backoff are not.
+    """
+    now = _now()
+    query = (
+        db.query(EmailOutbox.id, EmailOutbox.recipient)
+        .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+    )
+    if db.bind.dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+    due = query.all()
+    if not due:
+        db.rollback()
+        return []
+
+    condition = EmailOutbox.id.in_([row.id for row in due])
+    if OUTBOX_DIGEST_SECONDS > 0:
+        condition = or_(condition, and_(
+            EmailOutbox.recipient.in_({row.recipient for row in due}),
+            EmailOutbox.next_attempt_at <= now + timedelta(seconds=OUTBOX_DIGEST_SECONDS),
+            not_(and_(EmailOutbox.attempts > 0, EmailOutbox.next_attempt_at > now)),
+        ))
+
+    claimed_ids = db.execute(
+        update(EmailOutbox)
+        .where(condition, EmailOutbox.status == "pending")
+        .values(status="sending", claimed_at=now)
+        .returning(EmailOutbox.id)
+    ).scalars().all()
+    db.commit()
+    if not claimed_ids:
+        return []
+    return db.query(EmailOutbox).filter(EmailOutbox.id.in_(claimed_ids)).order_by(EmailOutbox.id).all()
+
+
+def _awaiting_score(db: Session, message: EmailOutbox, now: datetime) -> bool:
+    """True while the reference is still queued for scoring and the message is young."""
+    if message.reference.ai_rated_score is not None:
+        return False
+    if _as_utc(message.created_at) < now - timedelta(seconds=OUTBOX_SCORE_WAIT_SECONDS):
+        return False
+    return db.query(ScoreJob.id).filter(
+        ScoreJob.reference_id == message.reference_id,
+        ScoreJob.status.in_(["pending", "running"]),
+    ).first() is not None
+
+
+def _send_group(mailer: Mailer, messages: List[EmailOutbox]) -> None:
+    first = messages[0]
+    references = [m.reference for m in messages]
+    if len(messages) == 1:
+        params = build_validation_email(references[0], first.recipient, first.recipient_name)
+    else:
+        params = build_digest_email(references, first.recipient, first.recipient_name)
+    mailer.send(params)
+
+
+def dispatch_once(db: Session, mailer: Mailer) -> int:
+    """
+    Send one round of due messages. Returns the number of emails sent.
+    """
+    messages = claim_due_messages(db)
+    now = _now()
+
+    groups: Dict[str, List[EmailOutbox]] = {}
+    for message in messages:
+        if message.reference is None:
+            message.status = "cancelled"
+            message.last_error = "Reference was deleted"
+        elif _awaiting_score(db, message, now):
+            message.status = "pending"
+            message.next_attempt_at = now + timedelta(seconds=OUTBOX_POLL_SECONDS)
+        else:
+            key = message.recipient if OUTBOX_DIGEST_SECONDS > 0 else str(message.id)
+            groups.setdefault(key, []).append(message)
+    db.commit()
+
+    sent = 0
+    for group in groups.values():
+        try:
+            _send_group(mailer, group)
+        except Exception as e:
+            for message in group:
+                message.attempts += 1
+                message.last_error = str(e)
+                if message.attempts >= OUTBOX_MAX_ATTEMPTS:
+                    message.status = "failed"
+                else:
+                    backoff = min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (message.attempts - 1), OUTBOX_RETRY_MAX_SECONDS)
+                    message.status = "pending"
+                    message.next_attempt_at = _now() + timedelta(seconds=backoff)
+            print(f"❌ Failed to send email to {group[0].recipient}: {e}")
+        else:
+            for message in group:
+                message.status = "sent"
+                message.sent_at = _now()
+                message.last_error = None
+            sent += 1
+            print(f"✅ Email sent to {group[0].recipient} ({len(group)} references)")
+        db.commit()
+
+    return sent
+
+
+def requeue_stuck_messages(db: Session) -> int:
+    """
+    Put messages left 'sending' by a crashed dispatcher back in the queue.
+    Only messages claimed more than OUTBOX_STALE_SECONDS ago: a younger claim
+    may belong to a dispatcher in another process that is still sending.
+    """
+    cutoff = _now() - timedelta(seconds=OUTBOX_STALE_SECONDS)
+    result = db.execute(
+        update(EmailOutbox)
+        .where(
+            EmailOutbox.status == "sending",
+            or_(EmailOutbox.claimed_at.is_(None), EmailOutbox.claimed_at < cutoff),
+        )
+        .values(status="pending")
+    )
+    db.commit()
+    return result.rowcount
+
+
+# -------------------- Dispatcher --------------------
+class OutboxDispatcher:
+    """A background thread draining the email_outbox table."""
+
+    def __init__(self, mailer: Optional[Mailer] = None, poll_seconds: float = OUTBOX_POLL_SECONDS):
+        self.mailer = mailer or get_mailer()
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        db = SessionLocal()
+        try:
+            requeued = requeue_stuck_messages(db)
+            if requeued:
+                print(f"🔁 Requeued {requeued} unsent emails")
+        finally:
+            db.close()
+
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+        print("📧 Started email outbox dispatcher")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                dispatch_once(db, self.mailer)
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Outbox dispatcher error: {e}")
+            finally:
+                db.close()
+            self._stop.wait(self.poll_seconds)
+
+
+if __name__ == "__main__":
+    dispatcher = OutboxDispatcher()
+    dispatcher.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        dispatcher.stop()
@@ -0,0 +1,128 @@
+"""
+Keyset (seek) pagination for list endpoints.
+
+Pages are ordered on indexed columns ending with a unique id, and the
+cursor carries the sort values of the last row returned, so each page is
+an index seek no matter how deep the client pages. The body of a list
+response stays a plain JSON array; the cursor for the next page is sent
+in the X-Next-Cursor header and is absent on the last page.
+
+Per-article reference lists use `optional_page_params`: they are bounded
+by one article's bibliography, so a request without `limit` or `cursor`
+still gets the whole list in one response, as existing clients expect.
+"""
+import base64
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query as OrmQuery
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str]
+    limit: Optional[int]  # None = no limit
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, description=f"Page size (capped at {PAGE_SIZE_MAX})"),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=min(limit, PAGE_SIZE_MAX))
+
+
+def optional_page_params(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (capped at {PAGE_SIZE_MAX}); all rows when neither limit nor cursor is given"),
+) -> PageParams:
+    if cursor is None and limit is None:
+        return PageParams(cursor=None, limit=None)
+    return PageParams(cursor=cursor, limit=min(limit or PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX))
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _cursor_type(expr) -> Optional[type]:
+    try:
+        return expr.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None  # untyped expression, e.g. a literal rank
+
+
+def _valid_value(value: Any, expected: Optional[type]) -> bool:
+    if isinstance(value, (bool, list, dict)):
+        return False
+    if expected is None or value is None:
+        return True
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, order: Sequence[Tuple[Any, bool]]) -> List[Any]:
+    """The sort values in the cursor, checked against the types of the order columns."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(order):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # a mistyped value would reach the database and fail there with a 500
+    if not all(_valid_value(value, _cursor_type(expr)) for value, (expr, _) in zip(values, order)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _after(order: Sequence[Tuple[Any, bool]], values: Sequence[Any]):
+    """Rows strictly after `values` in the given (expression, descending) order."""
+    clauses = []
+    for i, (expr, descending) in enumerate(order):
+        beyond = expr < values[i] if descending else expr > values[i]
+        ties = [order[j][0] == values[j] for j in range(i)]
+        clauses.append(and_(*ties, beyond))
+    return or_(*clauses)
+
+
+def paginate(query: OrmQuery, page: PageParams, order: Sequence[Tuple[Any, bool]]) -> Tuple[list, Optional[str]]:
+    """
+    Apply keyset pagination to an ORM query.
+    `order` is a list of (expression, descending) pairs whose last entry
+    must be unique (normally the primary key). Returns (rows, next_cursor).
+    """
+    single = len(query.column_descriptions) == 1
+    width = len(order)
+
+    if page.cursor:
+        query = query.filter(_after(order, decode_cursor(page.cursor, order)))
+
+    query = query.add_columns(*[expr for expr, _ in order]).order_by(
+        *[expr.desc() if descending else expr.asc() for expr, descending in order]
+    )
+    if page.limit is not None:
+        query = query.limit(page.limit + 1)
+    rows = query.all()
+
+    next_cursor = None
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(rows[-1][-width:])
+
+    items = [row[0] if single else tuple(row[:-width]) for row in rows]
+    return items, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
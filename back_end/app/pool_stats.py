@@ -0,0 +1,115 @@
+"""
+Connection pool instrumentation.
+
+Engines are created with an instrumented QueuePool that times every
+checkout (waiting for a free connection, opening a new one, and the
+pre-ping when enabled) into a histogram, and pool events count
+connects, checkouts, checkins and invalidations. `pool_stats(engine)`
+reports these with the pool's live checked-out, idle and overflow
+counts; the API serves it at GET /debug/pool.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (ms) of the checkout time buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class WaitHistogram:
+    def __init__(self, buckets_ms: List[float] = WAIT_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * (len(self.buckets_ms) + 1)
+            self.total = 0
+            self.sum_ms = 0.0
+            self.max_ms = 0.0
+            self.timeouts = 0
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets_ms, ms)] += 1
+            self.total += 1
+            self.sum_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{b}ms" for b in self.buckets_ms] + ["inf"]
+            return {
+                "count": self.total,
+                "timeouts": self.timeouts,
+                "mean_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class _TimedCheckout:
+    """Mixin timing Pool.connect(), i.e. everything a caller waits for on checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = WaitHistogram()
+        self.events: Dict[str, int] = {"connect": 0, "checkout": 0, "checkin": 0, "invalidate": 0}
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.wait_histogram.timed_out()
+            raise
+        self.wait_histogram.observe((time.perf_counter() - start) * 1000)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool_events(engine: Engine) -> None:
+    """Count pool lifecycle events on the engine's (instrumented) pool."""
+    for name in ("connect", "checkout", "checkin", "invalidate"):
+        def listener(*args, _name=name):
+            pool = engine.pool
+            if hasattr(pool, "events"):
+                pool.events[_name] += 1
+        event.listen(engine, name, listener)
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+            "recycle_seconds": pool._recycle,
+            "pre_ping": pool._pre_ping,
+        })
+    if hasattr(pool, "wait_histogram"):
+        stats["checkout_wait"] = pool.wait_histogram.snapshot()
+        stats["events"] = dict(pool.events)
+    return stats
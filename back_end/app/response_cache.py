@@ -0,0 +1,357 @@
+"""
+Serialized response cache.
+
+Hot articles and their reference lists are served from pre-encoded JSON
+bytes (with their ETag and paging headers) instead of being loaded and
+serialized on every page view. Entries live in a bounded in-process LRU
+and, with RESPONSE_CACHE_BACKEND set, in a shared store behind it.
+
+Every entry is tagged with what it was built from ("article:7",
+"author:3", "refs:to:7"). Session listeners collect the tags touched by
+each ORM write and invalidate them when the transaction commits, so the
+write routes and the scoring workers need no cache code. Other API
+processes only see invalidations through the shared store; their own
+LRU entries expire after RESPONSE_CACHE_TTL_SECONDS. Reference lists,
+which the scoring jobs rewrite from other processes, are also checked
+against their rows' versions on every request before a cached body is
+served (see reference_routes).
+"""
+import abc
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+from fastapi import Response
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.http_cache import etag_matches
+from app.models.article import Article
+from app.models.article_keyword import ArticleKeyword
+from app.models.author import Author
+from app.models.author_article import AuthorArticle
+from app.models.reference import Reference
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 0 = no in-process LRU
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))  # 0 = until evicted
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "none")  # "none", "memory" or "redis"
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+
+    def encode(self) -> bytes:
+        return json.dumps(self.headers).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, value: bytes) -> "CachedResponse":
+        headers, body = value.split(b"\n", 1)
+        return cls(body, json.loads(headers))
+
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+
+# -------------------- Shared backends --------------------
+class SharedBackend(abc.ABC):
+    """A store shared by all API processes."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl_seconds: int) -> None:
+        ...
+
+    @abc.abstractmethod
+    def invalidate(self, tags: Iterable[str]) -> None:
+        ...
+
+
+class MemoryBackend(SharedBackend):
+    """Local stand-in for a shared store: a plain dict, never evicted."""
+
+    def __init__(self):
+        self.values: Dict[str, bytes] = {}
+        self.tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self.values.get(key)
+
+    def set(self, key, value, tags, ttl_seconds):
+        with self._lock:
+            self.values[key] = value
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in self.tags.pop(tag, ()):
+                    self.values.pop(key, None)
+
+
+class RedisBackend(SharedBackend):
+    """Redis: each tag is a set of the keys to delete with it."""
+
+    def __init__(self, url: str = RESPONSE_CACHE_URL):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._redis.get(f"response:{key}")
+
+    def set(self, key, value, tags, ttl_seconds):
+        pipe = self._redis.pipeline()
+        pipe.set(f"response:{key}", value, ex=ttl_seconds or None)
+        for tag in tags:
+            pipe.sadd(f"response-tag:{tag}", f"response:{key}")
+            if ttl_seconds:
+                pipe.expire(f"response-tag:{tag}", ttl_seconds)
+        pipe.execute()
+
+    def invalidate(self, tags):
+        for tag in tags:
+            keys = self._redis.smembers(f"response-tag:{tag}")
+            self._redis.delete(f"response-tag:{tag}", *keys)
+
+
+SHARED_BACKENDS = {
+    "memory": MemoryBackend,
+    "redis": RedisBackend,
+}
+
+
+def get_shared_backend() -> Optional[SharedBackend]:
+    if RESPONSE_CACHE_BACKEND == "none":
+        return None
+    if RESPONSE_CACHE_BACKEND not in SHARED_BACKENDS:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND '{RESPONSE_CACHE_BACKEND}'")
+    return SHARED_BACKENDS[RESPONSE_CACHE_BACKEND]()
+
+
+# -------------------- Cache --------------------
+class ResponseCache:
+    """Bounded LRU of CachedResponse by key, in front of an optional shared backend."""
+
+    # forget per-tag invalidation times beyond this many tags (see put)
+    MAX_TRACKED_TAGS = 100_000
+
+    def __init__(
+        self,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+        backend: Optional[SharedBackend] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self._entries: "OrderedDict[str, Tuple[CachedResponse, Tuple[str, ...], float, int]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # invalidation sequence numbers, so a response built from data read
+        # before an invalidation is not stored after it
+        self._seq = 0
+        self._invalidated: Dict[str, int] = {}
+        self._floor = 0
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.backend_errors = 0
+
+    def _drop(self, key: str) -> None:
+        # caller holds the lock
+        response, tags, _, size = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _remember(self, key: str, response: CachedResponse, tags: Tuple[str, ...]) -> None:
+        size = len(key) + response.size()
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (response, tags, time.monotonic(), size)
+            self._bytes += size
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (self.ttl_seconds <= 0 or time.monotonic() - entry[2] < self.ttl_seconds):
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if entry:
+                self._drop(key)
+
+        if self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception as e:
+                value = None
+                self.backend_errors += 1
+                print(f"⚠️ Response cache backend error: {e}")
+            if value is not None:
+                response = CachedResponse.decode(value)
+                # the tags stay with the shared entry; locally it just expires
+                self._remember(key, response, ())
+                with self._lock:
+                    self.shared_hits += 1
+                return response
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def begin(self) -> int:
+        """Call before reading the data for a response; pass the result to put()."""
+        with self._lock:
+            return self._seq
+
+    def put(self, key: str, response: CachedResponse, tags: Iterable[str], started: int) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            if started < self._floor or any(self._invalidated.get(tag, 0) > started for tag in tags):
+                return  # written to while this response was being built
+            self.stores += 1
+        if self.max_bytes > 0:
+            self._remember(key, response, tags)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, response.encode(), tags, self.ttl_seconds)
+            except Exception as e:
+                self.backend_errors += 1
+                print(f"⚠️ Response cache backend error: {e}")
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        with self._lock:
+            self._seq += 1
+            if len(self._invalidated) > self.MAX_TRACKED_TAGS:
+                self._invalidated.clear()
+                self._floor = self._seq
+            for tag in tags:
+                self._invalidated[tag] = self._seq
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._drop(key)
+            self.invalidations += len(tags)
+        if self.backend is not None:
+            try:
+                self.backend.invalidate(tags)
+            except Exception as e:
+                self.backend_errors += 1
+                print(f"⚠️ Response cache backend error: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.shared_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.memory_hits + self.shared_hits) / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "invalidated_tags": self.invalidations,
+                "entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "memory_max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "shared_backend": RESPONSE_CACHE_BACKEND if self.backend is not None else None,
+                "backend_errors": self.backend_errors,
+            }
+
+
+response_cache = ResponseCache(backend=get_shared_backend())
+
+
+def cached_json_response(cached: CachedResponse, if_none_match: Optional[str]) -> Response:
+    """The cached body, or 304 when the client already holds its ETag."""
+    if etag_matches(if_none_match, cached.headers.get("ETag", "")):
+        return Response(status_code=304, headers=cached.headers)
+    return Response(content=cached.body, media_type="application/json", headers=cached.headers)
+
+
+# -------------------- Invalidation --------------------
+_TAGS = "response_cache_tags"
+
+
+def _reference_tags(reference: Reference) -> Set[str]:
+    state = inspect(reference)
+    tags = set()
+    for key, direction in (("cited_from_id", "from"), ("cited_to_id", "to")):
+        history = state.attrs[key].history
+        ids = [i for i in (*history.deleted, *history.unchanged, *history.added) if i is not None]
+        tags.update(f"refs:{direction}:{i}" for i in ids or [getattr(reference, key)])
+    return tags
+
+
+def _tags_for(obj, state) -> Set[str]:
+    if isinstance(obj, Reference):
+        return _reference_tags(obj)
+    if isinstance(obj, (AuthorArticle, ArticleKeyword)):
+        return {f"article:{obj.article_id}"}
+    if isinstance(obj, (Article, Author)) and state.identity:
+        return {f"{'article' if isinstance(obj, Article) else 'author'}:{state.identity[0]}"}
+    return set()
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deleted(session: Session, flush_context, instances) -> None:
+    # deleted rows can still be loaded here, not after the flush
+    tags = session.info.setdefault(_TAGS, set())
+    for obj in session.deleted:
+        tags.update(_tags_for(obj, inspect(obj)))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written(session: Session, flush_context) -> None:
+    tags = session.info.setdefault(_TAGS, set())
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tags.update(_tags_for(obj, inspect(obj)))
+    for obj in session.new:
+        if isinstance(obj, (Reference, AuthorArticle, ArticleKeyword)):
+            tags.update(_tags_for(obj, inspect(obj)))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate(session: Session) -> None:
+    tags = session.info.pop(_TAGS, None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_tags(session: Session, previous_transaction) -> None:
+    session.info.pop(_TAGS, None)
@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List
 from app.models.article import Article
 from app.models.author import Author
 from app.models.author_article import AuthorArticle
-from app.database import get_db
+from app.models.article_keyword import ArticleKeyword
+from app.models.article_stats import ArticleStats
+from app.database import Database, get_db
 from datetime import date
-from app.schema import ArticleIn, ArticleOut
-from sqlalchemy import or_
+from app.schema import ArticleIn, ArticleOut, ArticleStatsOut, ArticleBulkOut, ArticleBulkResult
+from app.authors import resolve_author_emails
+from app.article_stats import serialize_article_stats
+from app.search import fulltext_matches, search_terms
+from app.keywords import (
+    articles_with_keywords, get_or_create_keywords, keyword_ids_in_order, load_keywords, set_article_keywords
+)
+from app.trigram import fuzzy_filter, trigram_index
+from app.lucky import lucky_sampler, pick_lucky_article
+from app.citation_graph import citation_graph
+from app.pagination import PageParams, page_params, paginate, set_next_cursor
+from app.tokens import ensure_author, get_token_author_id
+from app.http_cache import ARTICLE_CACHE_CONTROL, article_etag, etag_matches
+from app.response_cache import CachedResponse, cached_json_response, response_cache
 
 router = APIRouter(
     prefix="/articles",
@@ -15,11 +31,17 @@ router = APIRouter(
 )
 
 # -------------------- Helper --------------------
-def serialize_article(article: Article, input_order_authors: Optional[List[Author]] = None) -> ArticleOut:
+def serialize_article(
+    article: Article,
+    input_order_authors: Optional[List[Author]] = None,
+    keywords: Optional[List[str]] = None
+) -> ArticleOut:
     """
     Convert Article + links to ArticleOut.
     If input_order_authors is provided, use it to preserve input order
     including None for authors not in system.
+    Pass keywords (see app.keywords.load_keywords) when serializing many
+    articles so they are not loaded one article at a time.
     """
     if input_order_authors:
         author_names = [a.name for a in input_order_authors]
@@ -37,141 +59,277 @@ def serialize_article(article: Article, input_order_authors: Optional[List[Autho
         published_date=article.published_date,
         corresponding_author_id=article.corresponding_author_id,
         subject=article.subject,
-        keywords=article.keywords.split(", ") if article.keywords else [],
+        keywords=keywords if keywords is not None else [link.keyword.name for link in article.keyword_links],
         author_names=author_names,
         author_ids=author_ids
     )
 
 # -------------------- Unified Search --------------------
 @router.get("/search", response_model=List[ArticleOut])
-def search_articles(
+async def search_articles(
+    response: Response,
     title: Optional[str] = Query(None, description="Search in article title (partial, case-insensitive)"),
     subject: Optional[str] = Query(None, description="Search in article subject (partial, case-insensitive)"),
-    keyword: Optional[str] = Query(None, description="Comma-separated keywords (partial, case-insensitive)"),
-    db: Session = Depends(get_db)
+    keyword: Optional[str] = Query(None, description="Comma-separated keywords (case-insensitive, any of)"),
+    q: Optional[str] = Query(None, description="Full-text search over title, subject and content (ranked, prefix matching)"),
+    fuzzy: bool = Query(False, description="Match title and subject by trigram similarity instead of substring"),
+    threshold: float = Query(0.3, ge=0.0, le=1.0, description="Minimum similarity for fuzzy matches"),
+    page: PageParams = Depends(page_params),
+    db: Database = Depends(get_db)
 ):
     """
     Unified search for articles by title, subject, and/or keywords.
-    Partial, case-insensitive match. Keywords can be comma-separated.
+    Partial, case-insensitive match on title and subject; keywords are
+    comma-separated and matched whole, case-insensitively.
+    With `q`, articles are matched through the full-text index and
+    returned best match first. With `fuzzy`, title and subject tolerate
+    typos and results are ordered by similarity.
+    Results are paged; the next page's cursor is in the X-Next-Cursor header.
     """
+    return await db.run(_search_articles, response, page, title, subject, keyword, q, fuzzy, threshold)
+
+def _search_articles(
+    db: Session,
+    response: Response,
+    page: PageParams,
+    title: Optional[str],
+    subject: Optional[str],
+    keyword: Optional[str],
+    q: Optional[str],
+    fuzzy: bool,
+    threshold: float
+) -> List[ArticleOut]:
     query = db.query(Article)
+    rank = None
 
-    # Title filter
-    if title:
-        query = query.filter(Article.title.ilike(f"%{title}%"))
+    # Full-text filter
+    if q is not None:
+        if not search_terms(q):
+            raise HTTPException(status_code=400, detail="Search query has no searchable terms")
+        matches = fulltext_matches(db, q)
+        query = query.join(matches, matches.c.id == Article.id)
+        rank = matches.c.rank
 
-    # Subject filter
-    if subject:
-        query = query.filter(Article.subject.ilike(f"%{subject}%"))
+    # Title / subject filters
+    similarities = []
+    for field, value in (("title", title), ("subject", subject)):
+        if not value:
+            continue
+        if fuzzy:
+            condition, similarity = fuzzy_filter(db, field, value, threshold)
+            query = query.filter(condition)
+            similarities.append(similarity)
+        else:
+            query = query.filter(getattr(Article, field).ilike(f"%{value}%"))
+
+    if rank is None and similarities:
+        rank = sum(similarities[1:], similarities[0])
 
     # Keyword filter
     if keyword:
         keywords_list = [k.strip() for k in keyword.split(",") if k.strip()]
-        conditions = [Article.keywords.ilike(f"%{k}%") for k in keywords_list]
-        query = query.filter(or_(*conditions))
+        query = query.filter(Article.id.in_(articles_with_keywords(keywords_list)))
 
-    articles = query.all()
+    order = [(rank, True), (Article.id, False)] if rank is not None else [(Article.id, False)]
+    articles, next_cursor = paginate(query, page, order)
 
-    if not articles:
+    if not articles and not page.cursor:
         raise HTTPException(status_code=404, detail="No articles found matching search criteria")
+    set_next_cursor(response, next_cursor)
 
-    return [serialize_article(a) for a in articles]
+    keywords = load_keywords(db, [a.id for a in articles])
+    return [serialize_article(a, keywords=keywords[a.id]) for a in articles]
 
 # -------------------- lucky --------------------
 @router.get("/lucky")
-def get_lucky_article(subject: Optional[str] = None, db: Session = Depends(get_db)):
+async def get_lucky_article(subject: Optional[str] = None, db: Database = Depends(get_db)):
+    """
+    A random article id, optionally within a subject (partial, case-insensitive).
+    Picked from the in-memory sampler, so the cost does not grow with the table.
+    """
+    article_id = await db.run(pick_lucky_article, subject)
+    if article_id is None:
+        raise HTTPException(status_code=404, detail="No articles found for this subject")
 
-    import random
-    
-    query = db.query(Article.id)
-    
+    return {"id": article_id}
+
+# -------------------- Citation stats --------------------
+@router.get("/most-cited", response_model=List[ArticleStatsOut])
+async def get_most_cited_articles(
+    response: Response,
+    subject: Optional[str] = Query(None, description="Only articles whose subject contains this (case-insensitive)"),
+    page: PageParams = Depends(page_params),
+    db: Database = Depends(get_db)
+):
+    """
+    Cited articles, most cited first, read from the article_stats counters.
+    Paged; the next page's cursor is in the X-Next-Cursor header.
+    """
+    return await db.run(_get_most_cited_articles, response, page, subject)
+
+def _get_most_cited_articles(db: Session, response: Response, page: PageParams, subject: Optional[str]) -> List[ArticleStatsOut]:
+    query = db.query(ArticleStats, Article.title).join(Article, Article.id == ArticleStats.article_id)
     if subject:
         query = query.filter(Article.subject.ilike(f"%{subject}%"))
-    
-    count = query.count()
-    
-    if count == 0:
-        raise HTTPException(status_code=404, detail="No articles found for this subject")
-    
-    # Get random article ID
-    random_offset = random.randint(0, count - 1)
-    article_id = query.offset(random_offset).first()[0]
-    
-    return {"id": article_id}
+    rows, next_cursor = paginate(query, page, [(ArticleStats.cited_by_count, True), (ArticleStats.article_id, True)])
+    set_next_cursor(response, next_cursor)
+    return [serialize_article_stats(stats.article_id, stats, title) for stats, title in rows]
+
+@router.get("/{id}/stats", response_model=ArticleStatsOut)
+async def get_article_stats(id: int, db: Database = Depends(get_db)):
+    """
+    Citation counts and average AI score of the references to an article.
+    """
+    return await db.run(_get_article_stats, id)
+
+def _get_article_stats(db: Session, id: int) -> ArticleStatsOut:
+    stats = db.get(ArticleStats, id)
+    if stats is None and db.get(Article, id) is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return serialize_article_stats(id, stats)
 
 # -------------------- Routes --------------------
 @router.get("/authors/{author_id}/articles", response_model=List[ArticleOut])
-def get_articles_by_author(author_id: int, db: Session = Depends(get_db)):
+async def get_articles_by_author(
+    author_id: int,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Database = Depends(get_db)
+):
+    return await db.run(_get_articles_by_author, author_id, page, response)
+
+def _get_articles_by_author(db: Session, author_id: int, page: PageParams, response: Response) -> List[ArticleOut]:
     author = db.get(Author, author_id)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
-    
-    return [serialize_article(article) for article in author.articles]
+
+    query = db.query(Article).join(AuthorArticle, AuthorArticle.article_id == Article.id).filter(
+        AuthorArticle.author_id == author_id
+    )
+    articles, next_cursor = paginate(query, page, [(AuthorArticle.article_id, False)])
+    set_next_cursor(response, next_cursor)
+    keywords = load_keywords(db, [a.id for a in articles])
+    return [serialize_article(article, keywords=keywords[article.id]) for article in articles]
 
 @router.get("/{id}", response_model=ArticleOut)
-def get_article(id: int, db: Session = Depends(get_db)):
-    article = db.get(Article, id)
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    
-    return serialize_article(article)
+async def get_article(
+    id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Database = Depends(get_db)
+):
+    """
+    Served from the response cache when possible; 304 when If-None-Match
+    holds the current ETag.
+    """
+    return await db.run(_get_article, id, if_none_match)
+
+def _get_article(db: Session, id: int, if_none_match: Optional[str]) -> Response:
+    key = f"article:{id}"
+    cached = response_cache.get(key)
+    if cached is None:
+        started = response_cache.begin()
+        etag = article_etag(db, id)
+        if etag is None:
+            raise HTTPException(status_code=404, detail="Article not found")
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ARTICLE_CACHE_CONTROL})
+        article = db.get(Article, id)
+        body = serialize_article(article).model_dump_json().encode("utf-8")
+        cached = CachedResponse(body, {"ETag": etag, "Cache-Control": ARTICLE_CACHE_CONTROL})
+        # ArticleOut also shows the names of the linked authors
+        tags = [key, *(f"author:{link.author_id}" for link in article.author_links)]
+        response_cache.put(key, cached, tags, started)
+    return cached_json_response(cached, if_none_match)
 
 @router.delete("/{id}")
-def delete_article_by_id(id: int, db: Session = Depends(get_db)):
+async def delete_article_by_id(
+    id: int,
+    token_author_id: Optional[int] = Depends(get_token_author_id),
+    db: Database = Depends(get_db)
+):
+    return await db.run(_delete_article, id, token_author_id)
+
+def _delete_article(db: Session, id: int, token_author_id: Optional[int]) -> dict:
     article = db.get(Article, id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
+    ensure_author(token_author_id, article.corresponding_author_id)
     
     db.delete(article)
     db.commit()
+    trigram_index.remove(id)
+    lucky_sampler.remove(id)
+    citation_graph.remove_article(id)
     return {"message": f"Article '{article.title}'-{id} deleted successfully"}
 
 # -------------------- Create Article --------------------
-@router.post("/", response_model=ArticleOut)
-def create_article(article_in: ArticleIn, db: Session = Depends(get_db)):
-    if len(article_in.author_names) != len(article_in.author_emails):
-        raise HTTPException(status_code=400, detail="author_names and author_emails length mismatch")
+ARTICLE_BULK_MAX_ITEMS = int(os.getenv("ARTICLE_BULK_MAX_ITEMS", "1000"))
+
+
+def article_emails(article_in: ArticleIn) -> List[Optional[str]]:
+    return [article_in.corresponding_author_email, *article_in.author_emails]
+
 
-    corresponding_author = db.query(Author).filter(
-        Author.email == article_in.corresponding_author_email
-    ).first()
-    if not corresponding_author:
-        raise HTTPException(
+def article_in_error(article_in: ArticleIn, authors_by_email: Dict[str, int]) -> Optional[HTTPException]:
+    """Why an article cannot be created, given its resolved author emails; None if it can."""
+    if len(article_in.author_names) != len(article_in.author_emails):
+        return HTTPException(status_code=400, detail="author_names and author_emails length mismatch")
+    if article_in.corresponding_author_email not in authors_by_email:
+        return HTTPException(
             status_code=404,
             detail=f"Corresponding author '{article_in.corresponding_author_email}' not found"
         )
+    return None
 
-    # Map emails to DB author IDs (None if not found)
-    author_ids = []
-    for email in article_in.author_emails:
-        if email:
-            author = db.query(Author).filter(Author.email == email).first()
-            author_ids.append(author.id if author else None)
-        else:
-            author_ids.append(None)
 
-    # Create article
-    article = Article(
+def article_row(article_in: ArticleIn, authors_by_email: Dict[str, int]) -> dict:
+    """Column values of the new Article row."""
+    return dict(
         title=article_in.title,
         content=article_in.content,
         published_journal=article_in.published_journal,
         published_date=article_in.published_date,
         subject=article_in.subject,
-        keywords=", ".join(article_in.keywords),
-        corresponding_author_id=corresponding_author.id,
+        corresponding_author_id=authors_by_email[article_in.corresponding_author_email],
         author_names=", ".join(article_in.author_names)
     )
 
+
+def linked_author_ids(author_ids: List[Optional[int]]) -> List[int]:
+    """Known authors in input order, once each (an author may be listed twice)."""
+    return [author_id for author_id in dict.fromkeys(author_ids) if author_id]
+
+@router.post("/", response_model=ArticleOut)
+async def create_article(article_in: ArticleIn, response: Response, db: Database = Depends(get_db)):
+    return await db.run(_create_article, article_in, response)
+
+def _create_article(db: Session, article_in: ArticleIn, response: Response) -> ArticleOut:
+    authors_by_email = resolve_author_emails(db, article_emails(article_in))
+    error = article_in_error(article_in, authors_by_email)
+    if error:
+        raise error
+
+    # Map emails to DB author IDs (None if not found)
+    author_ids = [authors_by_email.get(email) if email else None for email in article_in.author_emails]
+
+    # Create article
+    article = Article(**article_row(article_in, authors_by_email))
+
     db.add(article)
     db.flush()  # assigns article.id without committing yet
 
-    # Link real authors only
-    for author_id in author_ids:
-        if author_id:
-            db.add(AuthorArticle(article_id=article.id, author_id=author_id))
+    set_article_keywords(db, article, article_in.keywords)
+
+    # Link real authors only, once each
+    for author_id in linked_author_ids(author_ids):
+        db.add(AuthorArticle(article_id=article.id, author_id=author_id))
 
     db.commit()
     db.refresh(article)
+    trigram_index.add(article)
+    lucky_sampler.add(article)
+    citation_graph.add_article(article.id, article.subject, author_ids)
+    response.headers["ETag"] = article_etag(db, article.id)
 
     return ArticleOut(
         id=article.id,
@@ -181,8 +339,71 @@ def create_article(article_in: ArticleIn, db: Session = Depends(get_db)):
         published_date=article.published_date,
         corresponding_author_id=article.corresponding_author_id,
         subject=article.subject,
-        keywords=article.keywords.split(", ") if article.keywords else [],
+        keywords=[link.keyword.name for link in article.keyword_links],
         author_names=article_in.author_names,
         author_ids=author_ids
     )
 
+
+@router.post("/bulk", response_model=ArticleBulkOut)
+async def create_articles_bulk(articles_in: List[ArticleIn], db: Database = Depends(get_db)):
+    """
+    Create many articles in one transaction, e.g. a journal issue. All
+    author emails are resolved with one query and articles, author links
+    and keywords are written with one bulk insert each. Articles that
+    cannot be created are reported by their index and the rest are
+    still created.
+    """
+    if len(articles_in) > ARTICLE_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {ARTICLE_BULK_MAX_ITEMS} articles per request")
+    return await db.run(_create_articles_bulk, articles_in)
+
+def _create_articles_bulk(db: Session, articles_in: List[ArticleIn]) -> ArticleBulkOut:
+    authors_by_email = resolve_author_emails(db, [e for a in articles_in for e in article_emails(a)])
+
+    results = []
+    valid = []
+    for index, article_in in enumerate(articles_in):
+        error = article_in_error(article_in, authors_by_email)
+        if error:
+            results.append(ArticleBulkResult(index=index, error=error.detail))
+        else:
+            valid.append((index, article_in))
+    if not valid:
+        return ArticleBulkOut(created=0, failed=len(results), results=results)
+
+    rows = [article_row(article_in, authors_by_email) for _, article_in in valid]
+    article_ids = db.execute(
+        insert(Article).returning(Article.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+
+    by_normalized = get_or_create_keywords(db, [name for _, article_in in valid for name in article_in.keywords])
+    link_rows = []
+    keyword_rows = []
+    author_ids_by_article = {}
+    for article_id, (_, article_in) in zip(article_ids, valid):
+        author_ids = [authors_by_email.get(email) if email else None for email in article_in.author_emails]
+        author_ids_by_article[article_id] = author_ids
+        link_rows.extend(
+            {"article_id": article_id, "author_id": author_id} for author_id in linked_author_ids(author_ids)
+        )
+        keyword_rows.extend(
+            {"article_id": article_id, "keyword_id": keyword_id, "position": position}
+            for position, keyword_id in enumerate(keyword_ids_in_order(article_in.keywords, by_normalized))
+        )
+    if link_rows:
+        db.execute(insert(AuthorArticle), link_rows)
+    if keyword_rows:
+        db.execute(insert(ArticleKeyword), keyword_rows)
+    db.commit()
+
+    for article_id, row in zip(article_ids, rows):
+        # the in-memory indexes only read id, title and subject
+        article = Article(id=article_id, title=row["title"], subject=row["subject"])
+        trigram_index.add(article)
+        lucky_sampler.add(article)
+        citation_graph.add_article(article_id, row["subject"], author_ids_by_article[article_id])
+
+    results.extend(ArticleBulkResult(index=index, id=article_id) for article_id, (index, _) in zip(article_ids, valid))
+    results.sort(key=lambda result: result.index)
+    return ArticleBulkOut(created=len(valid), failed=len(results) - len(valid), results=results)
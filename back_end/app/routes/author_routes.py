@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Union
 from app.models.author import Author
-from app.database import get_db
-from app.security import hash_password
+from app.database import Database, get_db
+from app.security import password_hasher
+from app.pagination import PageParams, page_params, paginate, set_next_cursor
+from app.authors import serialize_author, serialize_authors
+from app.author_stats import compute_author_stats, serialize_author_stats
+from app.models.author_stats import AuthorStats
+from app.http_cache import AUTHOR_CACHE_CONTROL, author_etag, check_etag
+from app.tokens import ensure_author, require_token_author_id
 
-from app.schema import AuthorIn, AuthorOut, AuthorEmailIn
+from app.schema import AuthorIn, AuthorOut, AuthorEmailIn, AuthorStatsOut
 
 router = APIRouter(
     prefix="/authors",
@@ -14,7 +20,7 @@ router = APIRouter(
 
 # -------------------- Routes --------------------
 @router.post("/", response_model=AuthorOut)
-def create_author(author_in: AuthorIn, db: Session = Depends(get_db)):
+async def create_author(author_in: AuthorIn, db: Database = Depends(get_db)):
     # Debug password before hashing
     print("Raw password repr:", repr(author_in.password))
     print("Length of password (chars):", len(author_in.password))
@@ -23,8 +29,11 @@ def create_author(author_in: AuthorIn, db: Session = Depends(get_db)):
     # Strip whitespace to avoid bcrypt issues
     clean_password = author_in.password.strip()
 
-    hashed_password = hash_password(clean_password)
+    # bcrypt runs in the hashing process pool (503 when its queue is full)
+    hashed_password = await password_hasher.hash(clean_password)
+    return await db.run(_create_author, author_in, hashed_password)
 
+def _create_author(db: Session, author_in: AuthorIn, hashed_password: str) -> AuthorOut:
     db_author = Author(
         name=author_in.name,
         email=author_in.email,
@@ -35,40 +44,74 @@ def create_author(author_in: AuthorIn, db: Session = Depends(get_db)):
     db.add(db_author)
     db.commit()
     db.refresh(db_author)
-    return db_author
+    return serialize_author(db_author)
 
 
 @router.get("/", response_model=List[AuthorOut])
-def get_authors(db: Session = Depends(get_db)):
-    return db.query(Author).all()
+async def get_authors(response: Response, page: PageParams = Depends(page_params), db: Database = Depends(get_db)):
+    return await db.run(_get_authors, page, response)
+
+def _get_authors(db: Session, page: PageParams, response: Response) -> List[AuthorOut]:
+    authors, next_cursor = paginate(db.query(Author), page, [(Author.id, False)])
+    set_next_cursor(response, next_cursor)
+    return serialize_authors(db, authors)
 
 @router.get("/{id}", response_model=AuthorOut)
-def get_author(id: int, db: Session = Depends(get_db)):
-    author = db.get(Author, id)
-    if not author:
+async def get_author(
+    id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Database = Depends(get_db)
+):
+    return await db.run(_get_author, id, response, if_none_match)
+
+def _get_author(db: Session, id: int, response: Response, if_none_match: Optional[str]) -> Union[AuthorOut, Response]:
+    etag = author_etag(db, id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    not_modified = check_etag(response, if_none_match, etag, AUTHOR_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return serialize_authors(db, [db.get(Author, id)])[0]
+
+@router.get("/{id}/stats", response_model=AuthorStatsOut)
+async def get_author_stats(id: int, db: Database = Depends(get_db)):
+    """
+    AI score distribution and feedback across the references to the
+    author's articles, as of the last refresh (refreshed_at). Authors not
+    refreshed yet are computed live.
+    """
+    return await db.run(_get_author_stats, id)
+
+def _get_author_stats(db: Session, id: int) -> AuthorStatsOut:
+    stats = db.get(AuthorStats, id)
+    if stats is not None:
+        return serialize_author_stats(id, stats)
+    if db.get(Author, id) is None:
         raise HTTPException(status_code=404, detail="Author not found")
-    return author
+    return serialize_author_stats(id, compute_author_stats(db, [id])[id])
 
 @router.post("/by-email", response_model=AuthorOut)
-def get_author_by_email(author_email: AuthorEmailIn, db: Session = Depends(get_db)):
+async def get_author_by_email(author_email: AuthorEmailIn, db: Database = Depends(get_db)):
+    return await db.run(_get_author_by_email, author_email)
+
+def _get_author_by_email(db: Session, author_email: AuthorEmailIn) -> AuthorOut:
     author = db.query(Author).filter(Author.email == author_email.email).first()
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
 
-    # build articles summary
-    articles = [{"id": a.id, "title": a.title} for a in author.articles]
-
-    return AuthorOut(
-        id=author.id,
-        name=author.name,
-        email=author.email,
-        institute=author.institute,
-        job=author.job,
-        articles=articles
-    )
+    return serialize_authors(db, [author])[0]
 
 @router.delete("/{id}")
-def delete_author_by_id(id: int, db: Session = Depends(get_db)):
+async def delete_author_by_id(
+    id: int,
+    token_author_id: int = Depends(require_token_author_id),
+    db: Database = Depends(get_db)
+):
+    ensure_author(token_author_id, id)
+    return await db.run(_delete_author, id)
+
+def _delete_author(db: Session, id: int) -> dict:
     author = db.get(Author, id)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
@@ -79,15 +122,36 @@ def delete_author_by_id(id: int, db: Session = Depends(get_db)):
     return {"message": f"Author '{name}'-{id} deleted successfully"}
 
 @router.patch("/{id}", response_model=AuthorOut)
-def patch_author_by_id(id: int, author_in: AuthorIn, db: Session = Depends(get_db)):
+async def patch_author_by_id(
+    id: int,
+    author_in: AuthorIn,
+    response: Response,
+    token_author_id: int = Depends(require_token_author_id),
+    db: Database = Depends(get_db)
+):
+    ensure_author(token_author_id, id)
+    hashed_password = None
+    if author_in.password.strip():
+        hashed_password = await password_hasher.hash(author_in.password.strip())
+    return await db.run(_patch_author, id, author_in, hashed_password, response)
+
+def _patch_author(
+    db: Session, id: int, author_in: AuthorIn, hashed_password: Optional[str], response: Response
+) -> AuthorOut:
     author = db.get(Author, id)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
     
     update_data = author_in.dict(exclude_unset=True)
+    # never store the raw password
+    update_data.pop("password", None)
+    if hashed_password:
+        update_data["password"] = hashed_password
     for key, value in update_data.items():
         setattr(author, key, value)
     
     db.commit()
     db.refresh(author)
-    return author
\ No newline at end of file
+    # the update bumped the version; hand the client the new ETag
+    response.headers["ETag"] = author_etag(db, id)
+    return serialize_authors(db, [author])[0]
\ No newline at end of file
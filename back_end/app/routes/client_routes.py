@@ -1,35 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.models.author import Author
-from app.database import get_db
-from app.schema import AuthorLogin, AuthorOut
-from app.security import verify_password  # from step 4
+from app.database import Database, get_db
+from app.schema import AuthorLogin, LoginOut
+from app.authors import serialize_authors
+from app.security import password_hasher
+from app.tokens import ACCESS_TOKEN_TTL_SECONDS, create_access_token
 
 router = APIRouter(
     prefix="/client",
     tags=["client"]
 )
 
-@router.post("/login", response_model=AuthorOut)
-def login_author(login_data: AuthorLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=LoginOut)
+async def login_author(login_data: AuthorLogin, db: Database = Depends(get_db)):
     # 1️⃣ Find author by email
-    author = db.query(Author).filter(Author.email == login_data.email).first()
+    author = await db.run(_find_author, login_data.email)
     if not author:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    # 2️⃣ Verify password
-    if not verify_password(login_data.password, author.password):
+    # 2️⃣ Verify password in the hashing process pool (503 when its queue is full)
+    valid, new_hash = await password_hasher.verify_and_update(login_data.password, author.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    # 3️⃣ Build article summaries
-    articles = [{"id": a.id, "title": a.title} for a in author.articles]
+    # Stored with another bcrypt cost than BCRYPT_ROUNDS: keep the re-hash
+    if new_hash:
+        await db.run(_store_password_hash, author, new_hash)
 
-    # 4️⃣ Return AuthorOut
-    return AuthorOut(
-        id=author.id,
-        name=author.name,
-        email=author.email,
-        institute=author.institute,
-        job=author.job,
-        articles=articles
-    )
\ No newline at end of file
+    # 3️⃣ Return AuthorOut with article summaries (one grouped query) and an
+    # access token, so later authenticated calls skip bcrypt
+    author_out = (await db.run(serialize_authors, [author]))[0]
+    return LoginOut(
+        **author_out.model_dump(),
+        access_token=create_access_token(author_out.id, author_out.email),
+        expires_in=ACCESS_TOKEN_TTL_SECONDS
+    )
+
+def _find_author(db: Session, email: str):
+    return db.query(Author).filter(Author.email == email).first()
+
+def _store_password_hash(db: Session, author: Author, new_hash: str) -> None:
+    author.password = new_hash
+    db.commit()
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.database import SessionLocal
+from app.keywords import load_keywords
+from app.models.article import Article
+from app.models.reference import Reference
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"]
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CitedTo = aliased(Article, name="cited_to")
+CitedFrom = aliased(Article, name="cited_from")
+
+REFERENCE_EXPORT_COLUMNS = (
+    Reference.id,
+    Reference.cited_from_id,
+    CitedFrom.title.label("cited_from_title"),
+    Reference.cited_to_id,
+    CitedTo.title.label("cited_to_title"),
+    Reference.content,
+    Reference.citation_content,
+    Reference.if_key_reference,
+    Reference.if_secondary_reference,
+    Reference.ai_rated_score,
+    Reference.feedback,
+    Reference.author_comment,
+)
+
+ARTICLE_EXPORT_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.subject,
+    Article.published_journal,
+    Article.published_date,
+    Article.author_names,
+    Article.corresponding_author_id,
+    Article.content,
+)
+
+# -------------------- Helper --------------------
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _encode_chunk(rows: List[Dict], fields: Sequence[str], fmt: str) -> str:
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        for row in rows:
+            writer.writerow({k: "; ".join(v) if isinstance(v, list) else v for k, v in row.items()})
+    else:
+        for row in rows:
+            buffer.write(json.dumps(row, default=_json_default))
+            buffer.write("\n")
+    return buffer.getvalue()
+
+
+def stream_export(
+    stmt,
+    fields: Sequence[str],
+    fmt: str,
+    enrich: Optional[Callable] = None,
+) -> Iterator[str]:
+    """
+    Yield `stmt`'s rows encoded as NDJSON or CSV, EXPORT_CHUNK_SIZE rows at
+    a time. Rows come from a server-side cursor, so memory stays flat no
+    matter how large the export is. The generator owns its session because
+    it runs after the request handler has returned.
+    `enrich(db, rows)` may add fields to each chunk of row dicts.
+    """
+    db = SessionLocal()
+    try:
+        if fmt == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(fields)
+            yield buffer.getvalue()
+
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE))
+        for partition in result.mappings().partitions():
+            rows = [dict(row) for row in partition]
+            if enrich:
+                enrich(db, rows)
+            yield _encode_chunk(rows, fields, fmt)
+    finally:
+        db.close()
+
+
+def _add_keywords(db, rows: List[Dict]) -> None:
+    keywords = load_keywords(db, [row["id"] for row in rows])
+    for row in rows:
+        row["keywords"] = keywords[row["id"]]
+
+
+def _export_response(name: str, body: Iterator[str], fmt: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+# -------------------- Routes --------------------
+@router.get("/references")
+async def export_references(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv")
+):
+    """
+    Stream every reference with its citing/cited article titles and AI score.
+    """
+    stmt = (
+        select(*REFERENCE_EXPORT_COLUMNS)
+        .outerjoin(CitedFrom, CitedFrom.id == Reference.cited_from_id)
+        .outerjoin(CitedTo, CitedTo.id == Reference.cited_to_id)
+        .order_by(Reference.id)
+    )
+    fields = [column.key for column in REFERENCE_EXPORT_COLUMNS]
+    return _export_response("references", stream_export(stmt, fields, format), format)
+
+
+@router.get("/articles")
+async def export_articles(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    include_content: bool = Query(True, description="Include the article content column")
+):
+    """
+    Stream every article with its keywords.
+    """
+    columns = [c for c in ARTICLE_EXPORT_COLUMNS if include_content or c is not Article.content]
+    stmt = select(*columns).order_by(Article.id)
+    fields = [column.key for column in columns] + ["keywords"]
+    return _export_response("articles", stream_export(stmt, fields, format, enrich=_add_keywords), format)
@@ -0,0 +1,104 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.citation_graph import citation_graph
+from app.database import Database, get_db
+from app.models.article import Article
+from app.models.author import Author
+from app.schema import ArticleGraphStats, AuthorImpactOut, CitationCount, RankedArticleOut
+
+TOP_LIMIT_MAX = 100
+
+router = APIRouter(
+    prefix="/graph",
+    tags=["graph"]
+)
+
+# -------------------- Routes --------------------
+# Computed from the in-memory citation graph (app/citation_graph.py)
+@router.get("/articles/{id}", response_model=ArticleGraphStats)
+async def get_article_graph_stats(id: int, db: Database = Depends(get_db)):
+    """
+    Citation count, reference count and PageRank of one article.
+    """
+    return await db.run(_get_article_graph_stats, id)
+
+def _get_article_graph_stats(db: Session, id: int) -> ArticleGraphStats:
+    citation_graph.ensure_loaded(db)
+    stats = citation_graph.article_stats(id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return ArticleGraphStats(**stats)
+
+
+@router.get("/citation-counts", response_model=List[CitationCount])
+async def get_citation_counts(
+    ids: List[int] = Query(..., max_length=1000, description="article ids, e.g. ?ids=1&ids=2"),
+    db: Database = Depends(get_db)
+):
+    """
+    How often each article is cited. Unknown ids are left out.
+    """
+    return await db.run(_get_citation_counts, ids)
+
+def _get_citation_counts(db: Session, ids: List[int]) -> List[CitationCount]:
+    citation_graph.ensure_loaded(db)
+    counts = citation_graph.citation_counts(ids)
+    return [CitationCount(article_id=i, cited_by=counts[i]) for i in dict.fromkeys(ids) if i in counts]
+
+
+@router.get("/top-cited", response_model=List[RankedArticleOut])
+async def get_top_cited(
+    subject: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=TOP_LIMIT_MAX),
+    db: Database = Depends(get_db)
+):
+    """
+    The most cited articles, optionally within a subject (partial, case-insensitive).
+    """
+    return await db.run(_get_top_articles, subject, limit, "cited_by")
+
+
+@router.get("/top-pagerank", response_model=List[RankedArticleOut])
+async def get_top_pagerank(
+    subject: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=TOP_LIMIT_MAX),
+    db: Database = Depends(get_db)
+):
+    """
+    The articles with the highest PageRank, optionally within a subject.
+    """
+    return await db.run(_get_top_articles, subject, limit, "pagerank")
+
+def _get_top_articles(db: Session, subject: Optional[str], limit: int, by: str) -> List[RankedArticleOut]:
+    citation_graph.ensure_loaded(db)
+    top = citation_graph.top_articles(limit, subject=subject, by=by)
+    # titles for the whole list in one query
+    articles = {
+        row.id: row
+        for row in db.execute(
+            select(Article.id, Article.title, Article.subject).where(Article.id.in_([t["article_id"] for t in top]))
+        )
+    }
+    return [
+        RankedArticleOut(title=articles[t["article_id"]].title, subject=articles[t["article_id"]].subject, **t)
+        for t in top
+        if t["article_id"] in articles
+    ]
+
+
+@router.get("/authors/{id}", response_model=AuthorImpactOut)
+async def get_author_impact(id: int, db: Database = Depends(get_db)):
+    """
+    h-index and total citations over the author's articles.
+    """
+    return await db.run(_get_author_impact, id)
+
+def _get_author_impact(db: Session, id: int) -> AuthorImpactOut:
+    if db.get(Author, id) is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    citation_graph.ensure_loaded(db)
+    return AuthorImpactOut(**citation_graph.author_impact(id))
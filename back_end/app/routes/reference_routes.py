@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, aliased
+from typing import Optional, List, Union
 from app.models.reference import Reference
 from app.models.article import Article
-from app.database import get_db
-from app.schema import ReferenceIn, ReferenceOut, ReferencePatch
-import resend
-import os
-from app.ai_score import get_ai_reference_score
-
-
-resend.api_key = os.getenv("RESEND_API_KEY")
-ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
+from app.database import Database, get_db
+from app.schema import ReferenceIn, ReferenceOut, ReferencePatch, ScoreJobOut, ScoreBatchIn, ScoreBatchOut
+from app.score_cache import lookup_cached_scores, score_cache, store_scores
+from app.ai_score import ascore_references_batch
+from app.jobs import enqueue_score_job, get_latest_job
+from app.outbox import enqueue_validation_email
+from app.pagination import NEXT_CURSOR_HEADER, PageParams, optional_page_params, paginate
+from app.tokens import ensure_author, require_token_author_id
+from app.citation_graph import citation_graph
+from app.http_cache import REFERENCE_CACHE_CONTROL, check_etag, etag_matches, make_etag, reference_etag
+from app.response_cache import CachedResponse, cached_json_response, response_cache
 
 router = APIRouter(
     prefix="/references",
@@ -19,181 +22,281 @@ router = APIRouter(
 )
 
 # -------------------- Helper --------------------
-def serialize_reference(ref: Reference) -> ReferenceOut:
-    """
-    Serialize a Reference object to ReferenceOut, including
-    cited article titles for frontend display.
-    """
-    return ReferenceOut(
-        id=ref.id,
-        cited_to_id=ref.cited_to_id,
-        cited_from_id=ref.cited_from_id,
-        cited_to_title=ref.cited_to.title if ref.cited_to else None,
-        cited_from_title=ref.cited_from.title if ref.cited_from else None,
-        if_key_reference=ref.if_key_reference,
-        if_secondary_reference=ref.if_secondary_reference,
-        citation_content=ref.citation_content,
-        ai_rated_score=ref.ai_rated_score,
-        feedback=ref.feedback,
-        author_comment=ref.author_comment
+# The two articles a reference points at; only their titles are read
+CitedTo = aliased(Article, name="cited_to")
+CitedFrom = aliased(Article, name="cited_from")
+
+REFERENCE_OUT_COLUMNS = (
+    Reference.id,
+    Reference.cited_to_id,
+    Reference.cited_from_id,
+    CitedTo.title.label("cited_to_title"),
+    CitedFrom.title.label("cited_from_title"),
+    Reference.if_key_reference,
+    Reference.if_secondary_reference,
+    Reference.citation_content,
+    Reference.ai_rated_score,
+    Reference.feedback,
+    Reference.author_comment,
+)
+REFERENCE_OUT_FIELDS = tuple(column.key for column in REFERENCE_OUT_COLUMNS)
+REFERENCE_LIST = TypeAdapter(List[ReferenceOut])
+
+
+def reference_rows(db: Session):
+    """
+    Query the columns ReferenceOut needs, with both article titles joined
+    in, so a list of references costs one SELECT and loads no Article rows.
+    """
+    return (
+        db.query(*REFERENCE_OUT_COLUMNS)
+        .outerjoin(CitedTo, CitedTo.id == Reference.cited_to_id)
+        .outerjoin(CitedFrom, CitedFrom.id == Reference.cited_from_id)
     )
 
-# -------------------- Routes --------------------
-import os
 
-# At the top of your file with other imports
-ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
+def serialize_reference_row(row) -> ReferenceOut:
+    """
+    Build ReferenceOut from a reference_rows() row (a tuple in column
+    order). Extra columns added after them, like the version, are ignored.
+    """
+    return ReferenceOut(**dict(zip(REFERENCE_OUT_FIELDS, row)))
+
 
+def get_reference_out(db: Session, id: int) -> ReferenceOut:
+    row = reference_rows(db).filter(Reference.id == id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Reference not found")
+    return serialize_reference_row(row)
+
+# -------------------- Routes --------------------
+# Handlers are async and hand their ORM work to db.run (see app.database.Database)
 @router.post("/", response_model=ReferenceOut)
-def create_reference(ref_in: ReferenceIn, db: Session = Depends(get_db)):
+async def create_reference(ref_in: ReferenceIn, db: Database = Depends(get_db)):
     """
-    Create a new reference, get AI score, and send validation email.
+    Create a new reference and queue it for AI scoring and the
+    validation email. Both are handled by background workers.
     """
-    # Fetch the articles to get their details
-    citing_article = db.query(Article).filter(Article.id == ref_in.cited_from_id).first()
-    referenced_article = db.query(Article).filter(Article.id == ref_in.cited_to_id).first()
+    return await db.run(_create_reference, ref_in)
+
+def _create_reference(db: Session, ref_in: ReferenceIn) -> ReferenceOut:
+    # Make sure both articles exist
+    citing_article = db.get(Article, ref_in.cited_from_id)
+    referenced_article = db.get(Article, ref_in.cited_to_id)
     
     if not citing_article or not referenced_article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    # Create the reference
+    # Create the reference, its scoring job and its email in one transaction
     reference = Reference(**ref_in.dict())
     db.add(reference)
+    enqueue_score_job(db, reference)
+    enqueue_validation_email(db, reference, referenced_article)
     db.commit()
-    db.refresh(reference)
-    
-    # Get AI score
-    try:
-        print("🤖 Getting AI score...")
-        ai_score = get_ai_reference_score(citing_article, referenced_article, reference)
-        if ai_score is not None:
-            reference.ai_rated_score = ai_score
-            db.commit()
-            db.refresh(reference)
-            print(f"✅ AI score saved: {ai_score}/10")
-        else:
-            print("⚠️ AI score returned None")
-    except Exception as e:
-        print(f"❌ Failed to get AI score: {e}")
-
-        # Continue without score - don't fail the request
-    
-    # Send validation email to the referenced article's corresponding author
-    try:
-        validator_email = referenced_article.corresponding_author.email
-        
-        # Only send email if it's the admin email (testing mode)
-        if validator_email != ADMIN_EMAIL:
-            print(f"⚠️ Skipping email to {validator_email} (not admin email, testing mode)")
-            return serialize_reference(reference)
-        
-        # Include AI score in email if available
-        ai_score_html = f"""
-            <p><strong>AI Quality Score:</strong> {reference.ai_rated_score}/10</p>
-        """ if reference.ai_rated_score is not None else ""
-        
-        params: resend.Emails.SendParams = {
-            "from": "onboarding@resend.dev",
-            "to": [validator_email],
-            "subject": f"Reference Validation Request - {citing_article.title}",
-            "html": f"""
-                <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                    <h2 style="color: #333;">Reference Validation Request</h2>
-                    
-                    <p>Hello {referenced_article.corresponding_author.name},</p>
-                    
-                    <p>Your work has been cited and needs validation.</p>
-                    
-                    <div style="background-color: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                        <h3 style="margin-top: 0;">Citation Details:</h3>
-                        
-                        <p><strong>Citing Article:</strong><br/>
-                        "{citing_article.title}"<br/>
-                        <em>by {citing_article.author_names}</em></p>
-                        
-                        <p><strong>Your Work Being Cited:</strong><br/>
-                        "{referenced_article.title}"<br/>
-                        <em>by {referenced_article.author_names}</em></p>
-                        
-                        {f'<p><strong>Citation Context:</strong><br/>{ref_in.citation_content}</p>' if ref_in.citation_content else ''}
-                        
-                        <p><strong>Reference Content:</strong><br/>
-                        {ref_in.content}</p>
-                        
-                        {ai_score_html}
-                        
-                        <p><strong>Key Reference:</strong> {'Yes' if ref_in.if_key_reference else 'No'}</p>
-                        <p><strong>Secondary Reference:</strong> {'Yes' if ref_in.if_secondary_reference else 'No'}</p>
-                    </div>
-                    
-                    <p>Please review whether this reference is:</p>
-                    <ul>
-                        <li>Relevant to the claim being made</li>
-                        <li>Accurately represents your work</li>
-                        <li>Properly contextualized</li>
-                    </ul>
-                    
-                    <div style="margin: 30px 0;">
-                        <a href="https://capstone-reference-check-67ra.vercel.app/articles/{citing_article.id}/reference/{reference.id}/feedback" 
-                            style="background-color: #4CAF50; color: white; padding: 12px 24px; 
-                                text-decoration: none; border-radius: 5px; display: inline-block;">
-                            Validate Reference
-                        </a>
-                    </div>
-                    
-                    <p style="color: #666; font-size: 12px;">
-                        This is an automated message from the REFEX Reference Validation System.
-                    </p>
-                </div>
-            """
-        }
-        
-        resend.Emails.send(params)
-        print(f"✅ Email sent to {validator_email}")
-        
-    except Exception as e:
-        print(f"❌ Failed to send email: {e}")
-    return serialize_reference(reference)
+    citation_graph.add_reference(reference.id, reference.cited_from_id, reference.cited_to_id)
+
+    return get_reference_out(db, reference.id)
+
+@router.post("/score-batch", response_model=ScoreBatchOut)
+async def score_references(batch_in: ScoreBatchIn, db: Database = Depends(get_db)):
+    """
+    Score pending references in bulk. References are grouped by citing
+    article and each Gemini call carries the citing article once plus a
+    batch of cited works. Model calls are awaited without holding a
+    database connection busy.
+    """
+    if batch_in.cited_from_id is None and not batch_in.reference_ids:
+        raise HTTPException(status_code=400, detail="Provide cited_from_id or reference_ids")
+
+    references, results, to_score, keys = await db.run(_load_score_batch, batch_in)
+    scored, calls = await ascore_references_batch(to_score)
+    results.update({ref.id: scored.get(ref.id) for ref in to_score})
+    return await db.run(_save_score_batch, references, results, keys, scored, calls)
+
+def _load_score_batch(db: Session, batch_in: ScoreBatchIn):
+    query = db.query(Reference)
+    if batch_in.cited_from_id is not None:
+        query = query.filter(Reference.cited_from_id == batch_in.cited_from_id)
+    if batch_in.reference_ids:
+        query = query.filter(Reference.id.in_(batch_in.reference_ids))
+    if not batch_in.rescore:
+        query = query.filter(Reference.ai_rated_score.is_(None))
+
+    references = query.order_by(Reference.cited_from_id, Reference.id).all()
+    results, to_score, keys = lookup_cached_scores(db, references)
+    # keep the loaded rows (and their articles) for prompting, but end the
+    # transaction so no connection is held while the model calls run
+    db.expunge_all()
+    db.rollback()
+    return references, results, to_score, keys
+
+def _save_score_batch(db: Session, references, results, keys, scored, calls) -> ScoreBatchOut:
+    store_scores(db, keys, scored)
+    scored_count = 0
+    for reference in db.query(Reference).filter(Reference.id.in_([r.id for r in references])):
+        result = results.get(reference.id)
+        if result is not None:
+            reference.ai_rated_score = result.score
+            scored_count += 1
+    db.commit()
+
+    return ScoreBatchOut(
+        scored=scored_count,
+        failed=len(references) - scored_count,
+        model_calls=calls,
+        references=[
+            serialize_reference_row(row)
+            for row in reference_rows(db)
+            .filter(Reference.id.in_([r.id for r in references]))
+            .order_by(Reference.cited_from_id, Reference.id)
+        ]
+    )
+
+@router.get("/score-cache/stats")
+async def get_score_cache_stats():
+    """
+    Hit/miss counters for the AI score cache (this process only).
+    """
+    return score_cache.stats()
+
+@router.get("/{id}/score-job", response_model=ScoreJobOut)
+async def get_reference_score_job(id: int, db: Database = Depends(get_db)):
+    """
+    Get the status of the latest AI scoring job for a reference.
+    """
+    return await db.run(_get_reference_score_job, id)
+
+def _get_reference_score_job(db: Session, id: int) -> ScoreJobOut:
+    job = get_latest_job(db, id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No scoring job for this reference")
+    return ScoreJobOut.model_validate(job)
 
 @router.get("/{id}", response_model=ReferenceOut)
-def get_reference(id: int, db: Session = Depends(get_db)):
+async def get_reference(
+    id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Database = Depends(get_db)
+):
     """
-    Get a single reference by ID.
+    Get a single reference by ID. Answers 304 when If-None-Match holds its current ETag.
     """
-    reference = db.get(Reference, id)
-    if not reference:
+    return await db.run(_get_reference, id, response, if_none_match)
+
+def _get_reference(db: Session, id: int, response: Response, if_none_match: Optional[str]) -> Union[ReferenceOut, Response]:
+    version = db.query(Reference.version).filter(Reference.id == id).scalar()
+    if version is None:
         raise HTTPException(status_code=404, detail="Reference not found")
-    return serialize_reference(reference)
+    not_modified = check_etag(response, if_none_match, reference_etag(id, version), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    row = reference_rows(db).add_columns(Reference.version).filter(Reference.id == id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Reference not found")
+    # the ETag of the row actually sent, in case it changed since the version was read
+    response.headers["ETag"] = reference_etag(id, row[-1])
+    return serialize_reference_row(row)
 
 @router.get("/from/{article_id}", response_model=List[ReferenceOut])
-def get_references_from_article(article_id: int, db: Session = Depends(get_db)):
+async def get_references_from_article(
+    article_id: int,
+    page: PageParams = Depends(optional_page_params),
+    if_none_match: Optional[str] = Header(None),
+    db: Database = Depends(get_db)
+):
     """
-    Get all references **from** a given article.
+    Get the references **from** a given article: all of them, or one page
+    at a time with `limit` (the next page's cursor is in X-Next-Cursor).
     """
-    refs = db.query(Reference).filter(Reference.cited_from_id == article_id).all()
-    return [serialize_reference(r) for r in refs]
+    return await db.run(_list_references, "from", article_id, page, if_none_match)
 
 @router.get("/to/{article_id}", response_model=List[ReferenceOut])
-def get_references_to_article(article_id: int, db: Session = Depends(get_db)):
+async def get_references_to_article(
+    article_id: int,
+    page: PageParams = Depends(optional_page_params),
+    if_none_match: Optional[str] = Header(None),
+    db: Database = Depends(get_db)
+):
+    """
+    Get the references **to** a given article: all of them, or one page
+    at a time with `limit` (the next page's cursor is in X-Next-Cursor).
+    """
+    return await db.run(_list_references, "to", article_id, page, if_none_match)
+
+def _list_references(
+    db: Session, direction: str, article_id: int, page: PageParams, if_none_match: Optional[str]
+) -> Response:
     """
-    Get all references **to** a given article.
+    One page of references from/to an article. The ETag comes from the
+    page's (id, version) pairs, read on every request, so a score written
+    by a worker in another process is never answered with 304 or served
+    from this process's cache; the titles join and serialization are only
+    paid when that page changed.
     """
-    refs = db.query(Reference).filter(Reference.cited_to_id == article_id).all()
-    return [serialize_reference(r) for r in refs]
+    tag = f"refs:{direction}:{article_id}"
+    column = Reference.cited_from_id if direction == "from" else Reference.cited_to_id
+    versions, next_cursor = paginate(
+        db.query(Reference.id, Reference.version).filter(column == article_id), page, [(Reference.id, False)]
+    )
+    etag = make_etag("references", next_cursor, *versions)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REFERENCE_CACHE_CONTROL})
+
+    key = f"{tag}:{page.cursor or ''}:{page.limit}"
+    cached = response_cache.get(key)
+    if cached is None or cached.headers.get("ETag") != etag:
+        started = response_cache.begin()
+        rows = []
+        if versions:
+            rows = (
+                reference_rows(db).add_columns(Reference.version)
+                .filter(Reference.id.in_([id for id, _ in versions]))
+                .order_by(Reference.id)
+                .all()
+            )
+        # from the rows actually serialized, in case one changed since the versions were read
+        headers = {
+            "ETag": make_etag("references", next_cursor, *((row[0], row[-1]) for row in rows)),
+            "Cache-Control": REFERENCE_CACHE_CONTROL,
+        }
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        cached = CachedResponse(REFERENCE_LIST.dump_json([serialize_reference_row(row) for row in rows]), headers)
+        response_cache.put(key, cached, [tag], started)
+    return cached_json_response(cached, if_none_match)
 
 @router.patch("/{id}", response_model=ReferenceOut)
-def patch_reference(id: int, ref_in: ReferencePatch, db: Session = Depends(get_db)):
+async def patch_reference(
+    id: int,
+    ref_in: ReferencePatch,
+    response: Response,
+    token_author_id: int = Depends(require_token_author_id),
+    db: Database = Depends(get_db)
+):
     """
-    Partially update a reference by ID.
+    Partially update a reference by ID. Needs an access token of the
+    corresponding author of the citing or cited article.
     """
+    return await db.run(_patch_reference, id, ref_in, token_author_id, response)
+
+def _patch_reference(
+    db: Session, id: int, ref_in: ReferencePatch, token_author_id: int, response: Response
+) -> ReferenceOut:
     reference = db.get(Reference, id)
     if not reference:
         raise HTTPException(status_code=404, detail="Reference not found")
+    ensure_author(
+        token_author_id,
+        reference.cited_from.corresponding_author_id,
+        reference.cited_to.corresponding_author_id
+    )
     
     update_data = ref_in.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(reference, key, value)
     
     db.commit()
-    db.refresh(reference)
-    return serialize_reference(reference)
\ No newline at end of file
+    # the update bumped the version; hand the client the new ETag
+    response.headers["ETag"] = reference_etag(id, reference.version)
+    return get_reference_out(db, id)
@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr
-from datetime import date
+from datetime import date, datetime
 from pydantic import Field
 
 # -------------------- article models --------------------
@@ -32,6 +32,27 @@ class ArticleOut(BaseModel):
     }
 
 
+class ArticleBulkResult(BaseModel):
+    index: int                   # position in the request
+    id: Optional[int] = None     # set when the article was created
+    error: Optional[str] = None  # set when it was rejected
+
+class ArticleBulkOut(BaseModel):
+    created: int
+    failed: int
+    results: List[ArticleBulkResult]
+
+
+class ArticleStatsOut(BaseModel):
+    article_id: int
+    title: Optional[str] = None
+    cited_by_count: int = 0          # references pointing to the article
+    key_reference_count: int = 0     # ... marked as key references
+    references_count: int = 0        # references the article makes
+    scored_count: int = 0            # incoming references with an AI score
+    average_ai_score: Optional[float] = None
+
+
 # -------------------- author models --------------------
 class AuthorEmailIn(BaseModel):
     email: EmailStr
@@ -47,6 +68,16 @@ class AuthorIn(BaseModel):
     institute: Optional[str] = None
     job: Optional[str] = None
 
+class AuthorStatsOut(BaseModel):
+    author_id: int
+    references_count: int = 0        # references to any of the author's articles
+    key_reference_count: int = 0     # ... marked as key references
+    scored_count: int = 0            # ... with an AI score
+    average_ai_score: Optional[float] = None
+    score_distribution: Dict[int, int] = {}  # AI score -> number of references
+    feedback_count: int = 0          # ... with feedback
+    refreshed_at: Optional[datetime] = None  # None when computed live
+
 class AuthorOut(BaseModel):
     id: int
     name: str
@@ -54,6 +85,7 @@ class AuthorOut(BaseModel):
     institute: Optional[str]
     job: Optional[str]
     articles: List[ArticleSummary] = []
+    stats: Optional[AuthorStatsOut] = None  # None until the first stats refresh
 
     model_config = {
         "from_attributes": True
@@ -96,7 +128,59 @@ class ReferencePatch(BaseModel):
     feedback: Optional[str] = None
     author_comment: Optional[str] = None
 
+class ScoreBatchIn(BaseModel):
+    cited_from_id: Optional[int] = None           # score references made by one article
+    reference_ids: Optional[List[int]] = None     # or an explicit list of references
+    rescore: bool = False                         # include references that already have a score
+
+class ScoreBatchOut(BaseModel):
+    scored: int
+    failed: int
+    model_calls: int
+    references: List[ReferenceOut] = []
+
+class ScoreJobOut(BaseModel):
+    reference_id: int
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
+
+# -------------------- citation graph models --------------------
+class ArticleGraphStats(BaseModel):
+    article_id: int
+    cited_by: int        # references pointing to the article
+    references: int      # references the article makes
+    pagerank: float
+
+class CitationCount(BaseModel):
+    article_id: int
+    cited_by: int
+
+class RankedArticleOut(BaseModel):
+    article_id: int
+    title: str
+    subject: Optional[str] = None
+    cited_by: int
+    pagerank: float
+
+class AuthorImpactOut(BaseModel):
+    author_id: int
+    h_index: int
+    citations: int       # total times the author's articles are cited
+    articles: int
+
 # -------------------- login schema --------------------
 class AuthorLogin(BaseModel):
     email: EmailStr
-    password: str
\ No newline at end of file
+    password: str
+
+class LoginOut(AuthorOut):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""
+Content-addressed cache for AI reference scores.
+
+Entries are keyed on a sha256 of the normalized prompt inputs plus the
+model name, so a re-created or re-imported reference with byte-identical
+inputs never goes back to Gemini. Lookups go through a small in-process
+LRU first and then the `score_cache` table.
+
+    python -m app.score_cache --prune    # drop expired / excess rows
+"""
+import argparse
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.ai_score import ScoreResult, get_scorer, score_references_batch
+from app.models.score_cache import ScoreCacheEntry
+
+SCORE_CACHE_TTL_SECONDS = int(os.getenv("SCORE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))  # 0 = never expire
+SCORE_CACHE_LRU_SIZE = int(os.getenv("SCORE_CACHE_LRU_SIZE", "4096"))
+SCORE_CACHE_MAX_ROWS = int(os.getenv("SCORE_CACHE_MAX_ROWS", "0"))  # 0 = unbounded
+
+
+# -------------------- Keys --------------------
+def _normalize(value) -> str:
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def score_cache_key(citing_article, cited_article, reference, model: Optional[str] = None) -> str:
+    """Hash exactly the inputs that end up in the scoring prompt."""
+    parts = [
+        model or get_scorer().model_name,
+        citing_article.title,
+        citing_article.subject,
+        (citing_article.content or "")[:500],
+        cited_article.title,
+        cited_article.author_names,
+        cited_article.subject,
+        reference.citation_content,
+        reference.content,
+    ]
+    payload = "\x1f".join(_normalize(p) for p in parts)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# -------------------- Cache --------------------
+class ScoreCache:
+    """In-process LRU in front of the score_cache table."""
+
+    def __init__(self, max_entries: int = SCORE_CACHE_LRU_SIZE, ttl_seconds: int = SCORE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[ScoreResult, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _expired(self, stored_at: datetime, now: datetime) -> bool:
+        return self.ttl_seconds > 0 and stored_at < now - timedelta(seconds=self.ttl_seconds)
+
+    def _remember(self, key: str, result: ScoreResult, stored_at: datetime) -> None:
+        with self._lock:
+            self._entries[key] = (result, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_many(self, db: Session, keys: List[str]) -> Dict[str, ScoreResult]:
+        """Look keys up in memory, then in one query against the table."""
+        now = datetime.now(timezone.utc)
+        found: Dict[str, ScoreResult] = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry and not self._expired(entry[1], now):
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+                    self.memory_hits += 1
+                else:
+                    self._entries.pop(key, None)
+                    missing.append(key)
+
+        if missing:
+            rows = db.execute(
+                select(ScoreCacheEntry).where(ScoreCacheEntry.key.in_(missing))
+            ).scalars().all()
+            for row in rows:
+                created_at = _as_utc(row.created_at)
+                if self._expired(created_at, now):
+                    continue
+                result = ScoreResult(row.score, row.reasoning)
+                found[row.key] = result
+                self._remember(row.key, result, created_at)
+            if found:
+                db.execute(
+                    update(ScoreCacheEntry)
+                    .where(ScoreCacheEntry.key.in_([k for k in missing if k in found]))
+                    .values(last_used_at=now)
+                )
+
+        with self._lock:
+            self.db_hits += sum(1 for k in missing if k in found)
+            self.misses += sum(1 for k in missing if k not in found)
+        return found
+
+    def put(self, db: Session, key: str, result: ScoreResult, model: Optional[str] = None) -> None:
+        """Upsert an entry. Not committed here; it rides on the caller's transaction."""
+        model = model or get_scorer().model_name
+        now = datetime.now(timezone.utc)
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        values = dict(key=key, model=model, score=result.score, reasoning=result.reasoning,
+                      created_at=now, last_used_at=now)
+        stmt = dialect.insert(ScoreCacheEntry).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ScoreCacheEntry.key],
+            set_={k: v for k, v in values.items() if k != "key"},
+        )
+        db.execute(stmt)
+        self._remember(key, result, now)
+        with self._lock:
+            self.stores += 1
+
+    def prune(self, db: Session) -> int:
+        """Delete expired rows and, if SCORE_CACHE_MAX_ROWS is set, the least recently used excess."""
+        removed = 0
+        if self.ttl_seconds > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+            removed += db.execute(
+                delete(ScoreCacheEntry).where(ScoreCacheEntry.created_at < cutoff)
+            ).rowcount
+        if SCORE_CACHE_MAX_ROWS > 0:
+            keep = (
+                select(ScoreCacheEntry.key)
+                .order_by(ScoreCacheEntry.last_used_at.desc())
+                .limit(SCORE_CACHE_MAX_ROWS)
+            )
+            removed += db.execute(
+                delete(ScoreCacheEntry).where(ScoreCacheEntry.key.not_in(keep))
+            ).rowcount
+        db.commit()
+        return removed
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_ratio": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "memory_max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+score_cache = ScoreCache()
+
+
+def lookup_cached_scores(db: Session, references):
+    """
+    Split references into cache hits and misses.
+    Returns ({reference_id: ScoreResult} for hits, [references to score], {reference_id: key}).
+    Loads each reference's citing and cited articles, so the misses can be
+    scored without further lazy loads.
+    """
+    keys = {ref.id: score_cache_key(ref.cited_from, ref.cited_to, ref) for ref in references}
+    cached = score_cache.get_many(db, list(set(keys.values())))
+
+    hits: Dict[int, ScoreResult] = {}
+    to_score = []
+    for ref in references:
+        hit = cached.get(keys[ref.id])
+        if hit is not None:
+            hits[ref.id] = hit
+        else:
+            to_score.append(ref)
+    return hits, to_score, keys
+
+
+def store_scores(db: Session, keys: Dict[int, str], scored: Dict[int, Optional[ScoreResult]]) -> None:
+    """Write new results to the cache in the caller's transaction."""
+    for ref_id, result in scored.items():
+        if result is not None:
+            score_cache.put(db, keys[ref_id], result)
+
+
+def score_references_cached(db: Session, references) -> Tuple[Dict[int, Optional[ScoreResult]], int]:
+    """
+    Like ai_score.score_references_batch, but references whose prompt inputs
+    were scored before are answered from the cache without calling Gemini.
+    New results are written to the cache in the caller's transaction.
+    Returns ({reference_id: ScoreResult or None}, number_of_model_calls).
+    """
+    results, to_score, keys = lookup_cached_scores(db, references)
+    scored, calls = score_references_batch(to_score)
+    store_scores(db, keys, scored)
+    results.update({ref.id: scored.get(ref.id) for ref in to_score})
+    return results, calls
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain the AI score cache")
+    parser.add_argument("--prune", action="store_true", help="delete expired and excess cache rows")
+    args = parser.parse_args()
+
+    if args.prune:
+        db = SessionLocal()
+        try:
+            print(f"🧹 Removed {score_cache.prune(db)} cache rows")
+        finally:
+            db.close()
@@ -0,0 +1,99 @@
+"""
+Full-text article search.
+
+Postgres uses the `articles.search_vector` tsvector column (generated from
+title, subject and content, GIN indexed; see the Alembic migration) with
+ts_rank_cd ranking. SQLite uses an external-content FTS5 table kept in
+sync by triggers, ranked with bm25. Both support prefix matching: every
+search term matches words that start with it.
+"""
+import re
+from typing import List
+
+from sqlalchemy import Double, Float, Integer, cast, func, literal_column, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.article import Article
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, subject, content, content='articles', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, subject, content)
+        VALUES (new.id, new.title, new.subject, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, subject, content)
+        VALUES ('delete', old.id, old.title, old.subject, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, subject, content)
+        VALUES ('delete', old.id, old.title, old.subject, old.content);
+        INSERT INTO articles_fts(rowid, title, subject, content)
+        VALUES (new.id, new.title, new.subject, new.content);
+    END""",
+]
+
+
+def search_terms(q: str) -> List[str]:
+    return _TOKEN.findall(q.lower())
+
+
+def ensure_fulltext_index(engine: Engine) -> None:
+    """
+    Create the FTS5 table and triggers for SQLite databases (Postgres gets
+    its index from the Alembic migration). Safe to call on every startup.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'")
+        ).first()
+        for ddl in SQLITE_FTS_DDL:
+            conn.execute(text(ddl))
+        if not exists:
+            conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+
+
+def fulltext_matches(db: Session, q: str):
+    """
+    Subquery of (id, rank) for articles matching every term of `q`,
+    where a higher rank is a better match.
+    """
+    terms = search_terms(q)
+    dialect = db.bind.dialect.name
+
+    if dialect == "postgresql":
+        search_vector = literal_column("articles.search_vector")
+        query = func.to_tsquery("english", " & ".join(f"{t}:*" for t in terms))
+        return (
+            # ts_rank_cd is a float4; widen it so rank values round-trip exactly through page cursors
+            select(Article.id.label("id"), cast(func.ts_rank_cd(search_vector, query), Double).label("rank"))
+            .where(search_vector.op("@@")(query))
+            .subquery("fts")
+        )
+
+    if dialect == "sqlite":
+        match = " AND ".join(f'"{t}"*' for t in terms)
+        # bm25 is lower-is-better; weights favour title, then subject, then content
+        return (
+            text(
+                "SELECT rowid AS id, -bm25(articles_fts, 10.0, 4.0, 1.0) AS rank "
+                "FROM articles_fts WHERE articles_fts MATCH :match"
+            )
+            .bindparams(match=match)
+            .columns(id=Integer, rank=Float)
+            .subquery("fts")
+        )
+
+    # Unindexed fallback for other databases
+    conditions = [
+        or_(Article.title.ilike(f"%{t}%"), Article.subject.ilike(f"%{t}%"), Article.content.ilike(f"%{t}%"))
+        for t in terms
+    ]
+    return select(Article.id.label("id"), literal_column("0.0").label("rank")).where(*conditions).subquery("fts")
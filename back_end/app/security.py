@@ -1,13 +1,130 @@
 # app/utils/security.py
+"""
+Password hashing.
+
+bcrypt is deliberately slow, so request handlers hash and verify through
+`password_hasher`, a small process pool, rather than tying up threadpool
+threads the database calls need. At most PASSWORD_HASH_QUEUE operations
+may be running or waiting; beyond that calls fail fast with
+PasswordHasherBusy, which the API answers with 503 + Retry-After instead
+of letting logins queue up behind each other until clients time out.
+
+The cost factor comes from BCRYPT_ROUNDS. Stored hashes with a different
+cost are re-hashed on the next successful login.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
 from passlib.context import CryptContext
 
-# Create a password context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# hash/verify calls allowed to be running or waiting before new ones get a 503
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))  # seconds
+
+# min/max pinned to BCRYPT_ROUNDS so hashes with a higher or lower cost need an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
 
 def hash_password(password: str) -> str:
-    """Hash a plain password for storing in the DB."""
     return pwd_context.hash(password)
 
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Check if a plain password matches the hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(valid, new_hash); new_hash is set when the stored hash uses an outdated cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt. The pool starts on first use."""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_QUEUE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the API process runs threads (workers, threadpool)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy(f"{self.pending} password hashes already queued")
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # a worker died (e.g. OOM-killed); start a fresh pool
+                print("⚠️ Password hashing pool broken, restarting it")
+                self._executor = None
+                future = self._get_executor().submit(fn, *args)
+            self.pending += 1
+        future.add_done_callback(self._done)
+        return future
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(hash_password, password))
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self.submit(verify_and_update, plain_password, hashed_password))
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash in parallel, bypassing the queue limit (seeds and CLIs)."""
+        with self._lock:
+            executor = self._get_executor()
+        return list(executor.map(hash_password, passwords))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
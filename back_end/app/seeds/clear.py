@@ -1,32 +1,152 @@
-from app.database import SessionLocal
-from app.models import Author, Article, AuthorArticle, Reference
+"""
+Reset the database.
+
+    python -m app.seeds.clear                    # empty every table, restart ids at 1
+    python -m app.seeds.clear --snapshot bench   # save the current data as snapshot "bench"
+    python -m app.seeds.clear --restore bench    # replace the data with snapshot "bench"
+
+Clearing is a single TRUNCATE ... RESTART IDENTITY CASCADE on Postgres.
+On SQLite it deletes without per-row triggers, which lets SQLite drop
+whole tables instead of deleting row by row. Snapshots are template
+databases on Postgres (CREATE DATABASE ... TEMPLATE) and file copies
+(the SQLite backup API) on SQLite. Both need exclusive access, so other
+sessions on the database are closed; stop the API first or restart it
+afterwards, since its lucky and trigram indexes are held in memory.
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.database import Base, engine
+from app.search import ensure_fulltext_index
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+# AI scores are cached by prompt content, so they stay valid across resets
+KEEP_TABLES = {"score_cache"}
+
+
+def _tables():
+    return [t for t in Base.metadata.sorted_tables if t.name not in KEEP_TABLES]
+
 
 def clear_db():
-    db = SessionLocal()
+    start = time.perf_counter()
+    print("🧹 Deleting all data...")
+    tables = _tables()
+    with engine.begin() as conn:
+        preparer = conn.dialect.identifier_preparer
+        if engine.dialect.name == "postgresql":
+            names = ", ".join(preparer.format_table(t) for t in tables)
+            conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+        else:
+            # FTS triggers would run once per article (and stop SQLite from
+            # dropping the table wholesale); empty the index in one go instead
+            for trigger in ("articles_fts_ai", "articles_fts_ad", "articles_fts_au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            for table in reversed(tables):
+                conn.execute(text(f"DELETE FROM {preparer.format_table(table)}"))
+            if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")).first():
+                conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('delete-all')"))
+            if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'")).first():
+                conn.execute(text("DELETE FROM sqlite_sequence"))
+    ensure_fulltext_index(engine)
+    print(f"✅ All data deleted in {time.perf_counter() - start:.2f}s (tables remain intact)")
+
+
+# -------------------- Snapshots --------------------
+def _sqlite_path() -> str:
+    path = engine.url.database
+    if not path or path == ":memory:":
+        raise SystemExit("❌ Snapshots need a file-based SQLite database")
+    return path
+
+
+def _sqlite_snapshot_path(name: str) -> str:
+    base, ext = os.path.splitext(_sqlite_path())
+    return f"{base}.snapshot-{name}{ext or '.db'}"
+
+
+def _sqlite_copy(source_path: str, target_path: str) -> None:
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
     try:
-        print("🧹 Deleting all data...")
-
-        # Delete in order to respect foreign keys
-        ref_count = db.query(Reference).count()
-        aa_count = db.query(AuthorArticle).count()
-        article_count = db.query(Article).count()
-        author_count = db.query(Author).count()
-        
-        print(f"Before delete: {ref_count} refs, {aa_count} links, {article_count} articles, {author_count} authors")
-
-        db.query(Reference).delete()
-        db.query(AuthorArticle).delete()
-        db.query(Article).delete()
-        db.query(Author).delete()
-
-        db.commit()
-        
-        # Verify deletion
-        print(f"After delete: {db.query(Author).count()} authors remaining")
-        print("✅ All data deleted (tables remain intact)")
+        source.backup(target)
     finally:
-        db.close()
+        target.close()
+        source.close()
+
+
+def _postgres_admin():
+    # CREATE/DROP DATABASE cannot run inside a transaction or on the database itself
+    return create_engine(engine.url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+
+
+def _postgres_clone(admin, source: str, target: str) -> None:
+    """Replace database `target` with a copy of `source`."""
+    quote = admin.dialect.identifier_preparer.quote
+    with admin.connect() as conn:
+        for name in (source, target):
+            conn.execute(
+                text("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = :name AND pid <> pg_backend_pid()"),
+                {"name": name},
+            )
+        conn.execute(text(f"DROP DATABASE IF EXISTS {quote(target)}"))
+        conn.execute(text(f"CREATE DATABASE {quote(target)} TEMPLATE {quote(source)}"))
+
+
+def _postgres_snapshot_name(name: str) -> str:
+    return f"{engine.url.database}_snapshot_{name}"
+
+
+def save_snapshot(name: str) -> None:
+    start = time.perf_counter()
+    engine.dispose()
+    if engine.dialect.name == "postgresql":
+        admin = _postgres_admin()
+        try:
+            _postgres_clone(admin, engine.url.database, _postgres_snapshot_name(name))
+        finally:
+            admin.dispose()
+    else:
+        _sqlite_copy(_sqlite_path(), _sqlite_snapshot_path(name))
+    print(f"📸 Saved snapshot '{name}' in {time.perf_counter() - start:.2f}s")
+
+
+def restore_snapshot(name: str) -> None:
+    start = time.perf_counter()
+    engine.dispose()
+    if engine.dialect.name == "postgresql":
+        admin = _postgres_admin()
+        try:
+            with admin.connect() as conn:
+                found = conn.execute(
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": _postgres_snapshot_name(name)}
+                ).first()
+            if not found:
+                raise SystemExit(f"❌ No snapshot '{name}'")
+            _postgres_clone(admin, _postgres_snapshot_name(name), engine.url.database)
+        finally:
+            admin.dispose()
+    else:
+        snapshot_path = _sqlite_snapshot_path(name)
+        if not os.path.exists(snapshot_path):
+            raise SystemExit(f"❌ No snapshot '{name}' ({snapshot_path})")
+        _sqlite_copy(snapshot_path, _sqlite_path())
+    print(f"✅ Restored snapshot '{name}' in {time.perf_counter() - start:.2f}s")
 
 
 if __name__ == "__main__":
-    clear_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clear the database or save/restore a snapshot")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--snapshot", metavar="NAME", help="save the current data as a snapshot")
+    group.add_argument("--restore", metavar="NAME", help="replace the current data with a snapshot")
+    args = parser.parse_args()
+    if args.snapshot:
+        save_snapshot(args.snapshot)
+    elif args.restore:
+        restore_snapshot(args.restore)
+    else:
+        clear_db()
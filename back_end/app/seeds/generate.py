@@ -0,0 +1,345 @@
+"""
+Synthetic dataset generator for benchmarks.
+
+    python -m app.seeds.generate --authors 20000 --articles 100000 --references 1000000
+
+Adds authors, articles (with co-authors and keywords) and references to
+DATABASE_URL. Article output per author and citations per article follow
+a power law, so a few authors and articles account for most of the links,
+as in real citation graphs. Rows are loaded in batches with Postgres COPY,
+or multi-row INSERTs elsewhere. Every generated author gets the same
+password (--password, hashed once). Ids continue after the current maximum,
+so the generator can add to an existing database. The bulk load bypasses
+the ORM listeners, so article_stats is reconciled and every author is
+queued for an author_stats refresh at the end.
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Sequence
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection
+
+from app.article_stats import reconcile_article_stats
+from app.author_stats import queue_all_authors
+from app.database import SessionLocal, engine
+from app.keywords import get_or_create_keywords, normalize_keyword
+from app.models import Article, ArticleKeyword, Author, AuthorArticle, Reference
+from app.security import hash_password
+
+# ----- Vocabulary -----
+TOPICS = {
+    "Quantum Computing": ["qubit", "entanglement", "error correction", "quantum annealing", "superconducting circuits", "decoherence"],
+    "Energy Systems": ["smart grid", "load forecasting", "battery storage", "photovoltaics", "demand response", "microgrids"],
+    "Deep Learning": ["transformers", "convolutional networks", "attention", "representation learning", "fine-tuning", "diffusion models"],
+    "Optimization": ["convex optimization", "gradient descent", "integer programming", "metaheuristics", "scheduling", "stochastic optimization"],
+    "Biology": ["protein folding", "gene expression", "single-cell sequencing", "CRISPR", "metabolic pathways", "phylogenetics"],
+    "Climate": ["climate modeling", "carbon capture", "extreme weather", "ocean circulation", "aerosols", "land use"],
+    "Robotics": ["motion planning", "reinforcement learning", "SLAM", "grasping", "multi-robot systems", "control theory"],
+    "Materials Science": ["perovskites", "catalysis", "polymers", "thin films", "alloys", "graphene"],
+}
+SUBJECTS = list(TOPICS)
+TITLE_PATTERNS = [
+    "{adj} {t1} for {t2}",
+    "On the {noun} of {t1} in {t2}",
+    "{t1} and {t2}: a {adj_l} {noun}",
+    "Towards {adj_l} {t1}",
+    "A {adj_l} approach to {t1} with {t2}",
+    "Revisiting {t1} under {t2}",
+]
+ADJECTIVES = ["Scalable", "Robust", "Efficient", "Adaptive", "Probabilistic", "Distributed", "Interpretable", "Data-driven", "Low-cost", "Hybrid"]
+NOUNS = ["analysis", "framework", "benchmark", "survey", "study", "perspective", "evaluation", "limits"]
+# neutral prose so that topic terms stay selective in article content
+FILLER = (
+    "the of and in to a is we that for this with are on by as results method model data "
+    "approach show using based our which from performance proposed can than these between "
+    "study analysis system experiments compared significant also has been observed"
+).split()
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Eve", "Frank", "Grace", "Hiro", "Isabella", "John", "Kira", "Luis",
+               "Mei", "Nora", "Omar", "Priya", "Quentin", "Rosa", "Sven", "Tariq", "Uma", "Victor", "Wen", "Yara", "Zoe"]
+LAST_NAMES = ["Johnson", "Smith", "Lee", "Wong", "Chen", "Müller", "Kim", "Tanaka", "Rossi", "Miller", "Garcia", "Novak",
+              "Patel", "Okafor", "Silva", "Ivanova", "Dubois", "Nakamura", "Haddad", "Larsen"]
+INSTITUTES = ["MIT", "Stanford", "Harvard", "EDAM", "Berkeley", "ETH Zurich", "Seoul National Univ.", "Tokyo Univ.",
+              "EPFL", "Oxford", "Cambridge", "TU Delft", "Tsinghua", "Toronto"]
+JOBS = ["Professor", "Associate Professor", "Lecturer", "Researcher", "Postdoc", "PhD Student", "Engineer", "Data Scientist"]
+JOURNALS = ["Nature", "Science", "Physical Review Letters", "IEEE Transactions", "Journal of Machine Learning Research",
+            "Energy Reports", "Cell", "Advanced Materials", "PLOS ONE", "ACM Computing Surveys"]
+CITATION_PHRASES = ["builds on", "extends", "compares against", "uses the dataset of", "contradicts", "follows the method of"]
+
+FIRST_DATE = date(1995, 1, 1)
+DATE_SPAN_DAYS = (date(2025, 12, 31) - FIRST_DATE).days
+
+
+# ----- Helpers -----
+def power_law_cum_weights(n: int, exponent: float) -> List[float]:
+    """
+    Cumulative weights for random.choices: item i (0-based) gets 1 / (i + 1) ** exponent.
+    A rank exponent a gives counts with a degree tail of about k ** -(1 + 1/a).
+    """
+    return list(accumulate(1.0 / (i + 1) ** exponent for i in range(n)))
+
+
+def batched(rows: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def next_id(conn: Connection, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def copy_rows(conn: Connection, table, columns: Sequence[str], rows: List[tuple]) -> None:
+    """Postgres COPY ... FROM STDIN (CSV) on the connection's transaction."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    buffer.seek(0)
+    preparer = conn.dialect.identifier_preparer
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        preparer.format_table(table), ", ".join(preparer.quote(c) for c in columns)
+    )
+    with conn.connection.dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+def bulk_load(table, columns: Sequence[str], rows: Iterable[tuple], batch_size: int) -> int:
+    """Load rows in batches of batch_size, one transaction per batch."""
+    total = 0
+    use_copy = engine.dialect.name == "postgresql"
+    for batch in batched(rows, batch_size):
+        with engine.begin() as conn:
+            if use_copy:
+                copy_rows(conn, table, columns, batch)
+            else:
+                conn.execute(insert(table), [dict(zip(columns, row)) for row in batch])
+        total += len(batch)
+    return total
+
+
+def reset_sequences(tables) -> None:
+    """After loading explicit ids, move Postgres id sequences past them."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in tables:
+            name = conn.dialect.identifier_preparer.format_table(table)
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE((SELECT MAX(id) FROM {name}), 1))"
+            ))
+
+
+# ----- Generators -----
+def generate_authors(rng: random.Random, first_id: int, count: int, password_hash: str) -> Iterator[tuple]:
+    for author_id in range(first_id, first_id + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower().replace('ü', 'ue')}.{author_id}@example.com"
+        yield author_id, f"{first} {last}", email, rng.choice(INSTITUTES), rng.choice(JOBS), password_hash
+
+
+def _title(rng: random.Random, terms: List[str]) -> str:
+    t1, t2 = rng.sample(terms, 2)
+    adjective = rng.choice(ADJECTIVES)
+    title = rng.choice(TITLE_PATTERNS).format(
+        adj=adjective, adj_l=adjective.lower(), noun=rng.choice(NOUNS), t1=t1, t2=t2
+    )
+    return title[0].upper() + title[1:]
+
+
+def _content(rng: random.Random, terms: List[str]) -> str:
+    # log-normal length: median ~250 words, a long tail of full papers
+    words = min(max(int(rng.lognormvariate(5.5, 0.7)), 40), 4000)
+    body = rng.choices(FILLER, k=words)
+    for _ in range(max(words // 40, 1)):
+        body[rng.randrange(words)] = rng.choice(terms)
+    body[0] = body[0].capitalize()
+    return " ".join(body) + "."
+
+
+def generate_articles(
+    rng: random.Random,
+    first_id: int,
+    count: int,
+    first_author_id: int,
+    author_count: int,
+    author_names: List[str],
+    keyword_ids: dict,
+    author_exponent: float,
+):
+    """
+    Yields (article_row, author_article_rows, article_keyword_rows) per article.
+    Corresponding authors follow a power law; co-authors are uniform.
+    """
+    author_weights = power_law_cum_weights(author_count, author_exponent)
+    author_offsets = range(author_count)
+    for article_id in range(first_id, first_id + count):
+        subject = rng.choice(SUBJECTS)
+        terms = TOPICS[subject]
+        corresponding = rng.choices(author_offsets, cum_weights=author_weights)[0]
+        coauthors = {rng.randrange(author_count) for _ in range(rng.randint(0, 4))} - {corresponding}
+        offsets = [corresponding, *coauthors]
+        article = (
+            article_id,
+            _title(rng, terms),
+            _content(rng, terms),
+            rng.choice(JOURNALS),
+            FIRST_DATE + timedelta(days=rng.randrange(DATE_SPAN_DAYS)),
+            ", ".join(author_names[o] for o in offsets),
+            first_author_id + corresponding,
+            subject,
+        )
+        links = [(first_author_id + o, article_id) for o in offsets]
+        keywords = [
+            (article_id, keyword_ids[normalize_keyword(term)], position)
+            for position, term in enumerate(rng.sample(terms, rng.randint(2, 5)))
+        ]
+        yield article, links, keywords
+
+
+def generate_references(
+    rng: random.Random, first_id: int, count: int, first_article_id: int, article_count: int, exponent: float
+) -> Iterator[tuple]:
+    """Cited articles follow a power law (lower ids, i.e. older articles, collect more citations)."""
+    cited_weights = power_law_cum_weights(article_count, exponent)
+    article_offsets = range(article_count)
+    reference_id = first_id
+    for batch in batched(range(count), 10000):
+        cited = rng.choices(article_offsets, cum_weights=cited_weights, k=len(batch))
+        for cited_offset in cited:
+            citing_offset = rng.randrange(article_count)
+            if citing_offset == cited_offset:
+                citing_offset = (citing_offset + 1) % article_count
+            is_key = rng.random() < 0.2
+            yield (
+                reference_id,
+                f"{rng.choice(CITATION_PHRASES).capitalize()} article {first_article_id + cited_offset}",
+                first_article_id + citing_offset,
+                first_article_id + cited_offset,
+                is_key,
+                not is_key and rng.random() < 0.3,
+                None,
+                rng.randint(0, 10) if rng.random() < 0.7 else None,
+            )
+            reference_id += 1
+
+
+# ----- CLI -----
+AUTHOR_COLUMNS = ["id", "name", "email", "institute", "job", "password"]
+ARTICLE_COLUMNS = ["id", "title", "content", "published_journal", "published_date", "author_names",
+                   "corresponding_author_id", "subject"]
+AUTHOR_ARTICLE_COLUMNS = ["author_id", "article_id"]
+ARTICLE_KEYWORD_COLUMNS = ["article_id", "keyword_id", "position"]
+REFERENCE_COLUMNS = ["id", "content", "cited_from_id", "cited_to_id", "if_key_reference",
+                     "if_secondary_reference", "citation_content", "ai_rated_score"]
+
+
+def generate(
+    authors: int,
+    articles: int,
+    references: int,
+    batch_size: int = 10000,
+    seed: int = 42,
+    password: str = "password123",
+    citation_exponent: float = 0.7,
+    author_exponent: float = 0.8,
+) -> None:
+    if authors < 1 or (references and articles < 2):
+        raise ValueError("need at least 1 author, and 2 articles for references")
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        keyword_ids = {
+            normalized: keyword.id
+            for normalized, keyword in get_or_create_keywords(db, [t for terms in TOPICS.values() for t in terms]).items()
+        }
+        db.commit()
+    finally:
+        db.close()
+
+    with engine.connect() as conn:
+        first_author_id = next_id(conn, Author)
+        first_article_id = next_id(conn, Article)
+        first_reference_id = next_id(conn, Reference)
+
+    # one bcrypt for every generated author
+    password_hash = hash_password(password)
+
+    step = time.perf_counter()
+    author_rows = list(generate_authors(rng, first_author_id, authors, password_hash))
+    bulk_load(Author.__table__, AUTHOR_COLUMNS, author_rows, batch_size)
+    author_names = [row[1] for row in author_rows]
+    del author_rows
+    print(f"🔹 {authors} authors in {time.perf_counter() - step:.1f}s")
+
+    step = time.perf_counter()
+    article_generator = generate_articles(
+        rng, first_article_id, articles, first_author_id, authors, author_names, keyword_ids, author_exponent
+    )
+    links = 0
+    for batch in batched(article_generator, batch_size):
+        bulk_load(Article.__table__, ARTICLE_COLUMNS, (article for article, _, _ in batch), batch_size)
+        links += bulk_load(AuthorArticle.__table__, AUTHOR_ARTICLE_COLUMNS, (l for _, ls, _ in batch for l in ls), batch_size)
+        bulk_load(ArticleKeyword.__table__, ARTICLE_KEYWORD_COLUMNS, (k for _, _, ks in batch for k in ks), batch_size)
+    print(f"🔹 {articles} articles ({links} author links) in {time.perf_counter() - step:.1f}s")
+
+    if references:
+        step = time.perf_counter()
+        bulk_load(
+            Reference.__table__,
+            REFERENCE_COLUMNS,
+            generate_references(rng, first_reference_id, references, first_article_id, articles, citation_exponent),
+            batch_size,
+        )
+        print(f"🔹 {references} references in {time.perf_counter() - step:.1f}s")
+
+    reset_sequences([Author.__table__, Article.__table__, Reference.__table__])
+
+    step = time.perf_counter()
+    db = SessionLocal()
+    try:
+        corrected = reconcile_article_stats(db)
+        queue_all_authors(db)
+    finally:
+        db.close()
+    print(f"🔹 {corrected} article_stats rows reconciled, authors queued for stats in {time.perf_counter() - step:.1f}s")
+    print(f"✅ Generated dataset in {time.perf_counter() - started:.1f}s ({engine.dialect.name})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for benchmarks")
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--references", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per COPY / INSERT")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (same seed, same dataset)")
+    parser.add_argument("--password", default="password123", help="password of every generated author")
+    parser.add_argument("--citation-exponent", type=float, default=0.7,
+                        help="power-law exponent of citations per article (higher = more skewed)")
+    parser.add_argument("--author-exponent", type=float, default=0.8,
+                        help="power-law exponent of articles per corresponding author")
+    args = parser.parse_args()
+    generate(
+        args.authors,
+        args.articles,
+        args.references,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        password=args.password,
+        citation_exponent=args.citation_exponent,
+        author_exponent=args.author_exponent,
+    )
+
+
+if __name__ == "__main__":
+    main()
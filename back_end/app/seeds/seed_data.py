@@ -2,7 +2,8 @@
 from datetime import date
 from app.database import SessionLocal
 from app.models import Author, Article, AuthorArticle, Reference
-from app.security import hash_password
+from app.security import password_hasher
+from app.keywords import set_article_keywords
 
 def seed():
     db = SessionLocal()
@@ -17,9 +18,11 @@ def seed():
         {"name": "Eve Chen", "email": "eve.chen@example.com", "institute": "MIT", "job": "Data Scientist"},
     ]
 
+    # bcrypt each author in parallel across the hashing pool
+    passwords = password_hasher.hash_many(["password123"] * len(authors_data))
     authors = [
-        Author(**data, password=hash_password("password123"))
-        for data in authors_data
+        Author(**data, password=password)
+        for data, password in zip(authors_data, passwords)
     ]
     db.add_all(authors)
     db.commit()
@@ -181,8 +184,12 @@ def seed():
         },
     ]
 
+    keyword_lists = [data.pop("keywords").split(", ") for data in articles_data]
     articles = [Article(**data) for data in articles_data]
     db.add_all(articles)
+    db.flush()
+    for art, keywords in zip(articles, keyword_lists):
+        set_article_keywords(db, art, keywords)
     db.commit()
     for art in articles:
         db.refresh(art)
@@ -0,0 +1,146 @@
+"""
+Signed, stateless access tokens.
+
+/client/login issues a compact JWT (HS256) naming the author. Verifying
+it is one HMAC over the token, so authenticated calls need neither
+bcrypt nor an `authors` lookup. Send it as `Authorization: Bearer <token>`.
+
+Editing or deleting an author and editing a reference always need a
+token (`require_token_author_id`). The remaining author-scoped routes
+still accept anonymous calls while AUTH_REQUIRED is off; a token that is
+present must be valid and belong to the author the route is scoped to.
+
+AUTH_REQUIRED defaults to false while the frontend is rolled out to send
+the token on every write; the README lists the steps for flipping it.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+AUTH_SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
+ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", "3600"))
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() == "true"
+ANONYMOUS_WARNING_INTERVAL_SECONDS = int(os.getenv("ANONYMOUS_WARNING_INTERVAL_SECONDS", "60"))
+
+if not AUTH_SECRET_KEY:
+    # a per-process key would reject tokens issued by other workers or before a restart
+    raise RuntimeError("AUTH_SECRET_KEY must be set to sign access tokens")
+_secret = AUTH_SECRET_KEY.encode("utf-8")
+
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+
+class TokenError(Exception):
+    pass
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _sign(signing_input: bytes) -> str:
+    return _b64encode(hmac.new(_secret, signing_input, hashlib.sha256).digest())
+
+
+def create_access_token(author_id: int, email: str, ttl_seconds: int = ACCESS_TOKEN_TTL_SECONDS) -> str:
+    now = int(time.time())
+    payload = {"sub": str(author_id), "email": email, "iat": now, "exp": now + ttl_seconds}
+    signing_input = ".".join(
+        _b64encode(json.dumps(part, separators=(",", ":")).encode("utf-8")) for part in (_HEADER, payload)
+    )
+    return f"{signing_input}.{_sign(signing_input.encode('ascii'))}"
+
+
+def decode_access_token(token: str) -> dict:
+    """Verify signature and expiry and return the claims; raises TokenError."""
+    try:
+        header_b64, payload_b64, signature = token.split(".")
+        signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+    except (ValueError, UnicodeError):
+        raise TokenError("Malformed token")
+    if not hmac.compare_digest(signature, _sign(signing_input)):
+        raise TokenError("Invalid token signature")
+
+    try:
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(payload_b64))
+        int(claims["sub"])
+    except (ValueError, KeyError, TypeError):
+        raise TokenError("Malformed token")
+    if header.get("alg") != "HS256":
+        raise TokenError("Unsupported token algorithm")
+    if claims.get("exp", 0) < time.time():
+        raise TokenError("Token expired")
+    return claims
+
+
+# -------------------- Dependencies --------------------
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+_anonymous_lock = threading.Lock()
+_anonymous_calls = 0
+_anonymous_warned_at: Optional[float] = None
+
+
+def _warn_anonymous_call() -> None:
+    """Count anonymous calls and print the warning at most once per interval, with the count."""
+    global _anonymous_calls, _anonymous_warned_at
+    with _anonymous_lock:
+        _anonymous_calls += 1
+        now = time.monotonic()
+        if _anonymous_warned_at is not None and now - _anonymous_warned_at < ANONYMOUS_WARNING_INTERVAL_SECONDS:
+            return
+        calls, _anonymous_calls, _anonymous_warned_at = _anonymous_calls, 0, now
+    print(f"⚠️ Anonymous call to an author-scoped route ({calls} since the last warning)")
+
+
+def get_token_author_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[int]:
+    """
+    The author id from the request's bearer token, or None for anonymous
+    calls (only allowed while AUTH_REQUIRED is off).
+    """
+    if credentials is None:
+        if AUTH_REQUIRED:
+            raise _unauthorized("Not authenticated")
+        # watched for before AUTH_REQUIRED becomes the default (see README)
+        _warn_anonymous_call()
+        return None
+    try:
+        claims = decode_access_token(credentials.credentials)
+    except TokenError as e:
+        raise _unauthorized(str(e))
+    return int(claims["sub"])
+
+
+def require_token_author_id(token_author_id: Optional[int] = Depends(get_token_author_id)) -> int:
+    """The author id from the request's bearer token; 401 without one, whatever AUTH_REQUIRED says."""
+    if token_author_id is None:
+        raise _unauthorized("Not authenticated")
+    return token_author_id
+
+
+def ensure_author(token_author_id: Optional[int], *allowed_author_ids: Optional[int]) -> None:
+    """403 unless the token's author is one of `allowed_author_ids` (anonymous calls pass when allowed)."""
+    if token_author_id is None:
+        return
+    if token_author_id not in allowed_author_ids:
+        raise HTTPException(status_code=403, detail="Not allowed for this author")
@@ -0,0 +1,187 @@
+"""
+Fuzzy (trigram similarity) matching on article title and subject.
+
+Postgres uses pg_trgm with GIN indexes on `articles.title` and
+`articles.subject` (see the Alembic migration): the `%` operator finds
+candidates through the index and `similarity()` ranks them. Other
+databases use TrigramIndex, an in-process inverted index over the same
+trigrams that pg_trgm extracts, refreshed on article writes and
+rebuilt in the background after TRIGRAM_INDEX_TTL_SECONDS to pick up
+other processes' writes; writes made while a rebuild runs are replayed
+onto it.
+"""
+import heapq
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import Double, case, cast, func, literal, select, text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.article import Article
+
+TRIGRAM_INDEX_TTL_SECONDS = int(os.getenv("TRIGRAM_INDEX_TTL_SECONDS", "300"))
+# best matches per field passed on to SQL; each costs bound parameters in an IN and a CASE
+TRIGRAM_MAX_MATCHES = int(os.getenv("TRIGRAM_MAX_MATCHES", "1000"))
+FUZZY_FIELDS = ("title", "subject")
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def trigrams(value: Optional[str]) -> Set[str]:
+    """The trigram set pg_trgm would extract: per word, lower-cased, padded '  word '."""
+    grams = set()
+    for word in _WORD.findall((value or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class TrigramIndex:
+    """In-process trigram index for databases without pg_trgm."""
+
+    def __init__(self, ttl_seconds: int = TRIGRAM_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        # one per running load(): the writes since it began, replayed onto what it loads
+        self._journals: List[List[tuple]] = []
+        self._grams: Dict[str, Dict[int, Set[str]]] = {f: {} for f in FUZZY_FIELDS}
+        self._postings: Dict[str, Dict[str, Set[int]]] = {f: defaultdict(set) for f in FUZZY_FIELDS}
+
+    def _add_locked(self, article_id: int, values: Dict[str, Optional[str]]) -> None:
+        for field in FUZZY_FIELDS:
+            grams = trigrams(values.get(field))
+            self._grams[field][article_id] = grams
+            for gram in grams:
+                self._postings[field][gram].add(article_id)
+
+    def _remove_locked(self, article_id: int) -> None:
+        for field in FUZZY_FIELDS:
+            for gram in self._grams[field].pop(article_id, ()):
+                self._postings[field][gram].discard(article_id)
+
+    def load(self, db: Session) -> None:
+        journal: List[tuple] = []
+        with self._lock:
+            self._journals.append(journal)
+        try:
+            rows = db.execute(select(Article.id, Article.title, Article.subject)).all()
+        except Exception:
+            with self._lock:
+                self._journals.remove(journal)
+            raise
+
+        with self._lock:
+            self._journals.remove(journal)
+            self._grams = {f: {} for f in FUZZY_FIELDS}
+            self._postings = {f: defaultdict(set) for f in FUZZY_FIELDS}
+            for article_id, title, subject in rows:
+                self._add_locked(article_id, {"title": title, "subject": subject})
+            # writes made after the query started; each is newer than what it read
+            for kind, article_id, values in journal:
+                self._remove_locked(article_id)
+                if kind == "add":
+                    self._add_locked(article_id, values)
+            self._loaded_at = time.monotonic()
+
+    def _refresh(self) -> None:
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception as e:
+            print(f"❌ Trigram index refresh failed: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._refreshing = False
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Load on first use. Once stale, keep serving the current index and
+        rebuild it in a background thread, one at a time.
+        """
+        if self._loaded_at is None:
+            self.load(db)
+            return
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._loaded_at <= self.ttl_seconds:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="trigram-refresh", daemon=True).start()
+
+    def add(self, article: Article) -> None:
+        """Index a new or changed article (no-op until the index is first loaded, unless a load is running)."""
+        values = {"title": article.title, "subject": article.subject}
+        with self._lock:
+            for journal in self._journals:
+                journal.append(("add", article.id, values))
+            if self._loaded_at is None:
+                return
+            self._remove_locked(article.id)
+            self._add_locked(article.id, values)
+
+    def remove(self, article_id: int) -> None:
+        with self._lock:
+            for journal in self._journals:
+                journal.append(("remove", article_id, None))
+            self._remove_locked(article_id)
+
+    def search(self, field: str, value: str, threshold: float) -> Dict[int, float]:
+        """{article_id: similarity} for articles at or above the threshold."""
+        query = trigrams(value)
+        with self._lock:
+            candidates: Dict[int, int] = defaultdict(int)
+            for gram in query:
+                for article_id in self._postings[field].get(gram, ()):
+                    candidates[article_id] += 1
+            grams = self._grams[field]
+            scores = {}
+            for article_id, shared in candidates.items():
+                score = shared / (len(query) + len(grams[article_id]) - shared)
+                if score >= threshold:
+                    scores[article_id] = score
+        return scores
+
+
+trigram_index = TrigramIndex()
+
+
+def fuzzy_filter(db: Session, field: str, value: str, threshold: float):
+    """
+    Return (condition, similarity expression) for fuzzy matching `value`
+    against Article.<field>, to be used in a filter and an ORDER BY.
+    """
+    if field not in FUZZY_FIELDS:
+        raise ValueError(f"Fuzzy matching is not supported on '{field}'")
+    column = getattr(Article, field)
+
+    if db.bind.dialect.name == "postgresql":
+        # `%` uses the GIN index and honours this threshold for the current transaction
+        db.execute(
+            text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+            {"threshold": str(threshold)},
+        )
+        # similarity() is a float4; widen it so rank values round-trip exactly through page cursors
+        return column.op("%")(value), cast(func.similarity(column, value), Double)
+
+    trigram_index.ensure_loaded(db)
+    scores = trigram_index.search(field, value, threshold)
+    if len(scores) > TRIGRAM_MAX_MATCHES:
+        # a short or common term at a low threshold matches most of the corpus
+        scores = dict(heapq.nlargest(TRIGRAM_MAX_MATCHES, scores.items(), key=lambda item: item[1]))
+    if not scores:
+        return Article.id.in_([]), literal(0.0)
+    return Article.id.in_(list(scores)), case(scores, value=Article.id, else_=0.0)
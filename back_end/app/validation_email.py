@@ -0,0 +1,122 @@
+import resend
+
+FEEDBACK_URL = "https://capstone-reference-check-67ra.vercel.app/articles/{citing_id}/reference/{reference_id}/feedback"
+
+
+def _citation_details_html(reference) -> str:
+    citing_article = reference.cited_from
+    referenced_article = reference.cited_to
+
+    # Include AI score in email if available
+    ai_score_html = f"""
+        <p><strong>AI Quality Score:</strong> {reference.ai_rated_score}/10</p>
+    """ if reference.ai_rated_score is not None else ""
+
+    return f"""
+                <div style="background-color: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                    <h3 style="margin-top: 0;">Citation Details:</h3>
+
+                    <p><strong>Citing Article:</strong><br/>
+                    "{citing_article.title}"<br/>
+                    <em>by {citing_article.author_names}</em></p>
+
+                    <p><strong>Your Work Being Cited:</strong><br/>
+                    "{referenced_article.title}"<br/>
+                    <em>by {referenced_article.author_names}</em></p>
+
+                    {f'<p><strong>Citation Context:</strong><br/>{reference.citation_content}</p>' if reference.citation_content else ''}
+
+                    <p><strong>Reference Content:</strong><br/>
+                    {reference.content}</p>
+
+                    {ai_score_html}
+
+                    <p><strong>Key Reference:</strong> {'Yes' if reference.if_key_reference else 'No'}</p>
+                    <p><strong>Secondary Reference:</strong> {'Yes' if reference.if_secondary_reference else 'No'}</p>
+                </div>
+    """
+
+
+def _validate_button_html(reference) -> str:
+    url = FEEDBACK_URL.format(citing_id=reference.cited_from_id, reference_id=reference.id)
+    return f"""
+                <div style="margin: 30px 0;">
+                    <a href="{url}"
+                        style="background-color: #4CAF50; color: white; padding: 12px 24px;
+                            text-decoration: none; border-radius: 5px; display: inline-block;">
+                        Validate Reference
+                    </a>
+                </div>
+    """
+
+
+REVIEW_CHECKLIST_HTML = """
+                <p>Please review whether this reference is:</p>
+                <ul>
+                    <li>Relevant to the claim being made</li>
+                    <li>Accurately represents your work</li>
+                    <li>Properly contextualized</li>
+                </ul>
+"""
+
+FOOTER_HTML = """
+                <p style="color: #666; font-size: 12px;">
+                    This is an automated message from the REFEX Reference Validation System.
+                </p>
+"""
+
+
+def build_validation_email(reference, recipient_email: str, recipient_name: str) -> dict:
+    """
+    Build the Resend params for a reference validation request sent to
+    the corresponding author of the cited article.
+    """
+    params: resend.Emails.SendParams = {
+        "from": "onboarding@resend.dev",
+        "to": [recipient_email],
+        "subject": f"Reference Validation Request - {reference.cited_from.title}",
+        "html": f"""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <h2 style="color: #333;">Reference Validation Request</h2>
+
+                <p>Hello {recipient_name},</p>
+
+                <p>Your work has been cited and needs validation.</p>
+                {_citation_details_html(reference)}
+                {REVIEW_CHECKLIST_HTML}
+                {_validate_button_html(reference)}
+                {FOOTER_HTML}
+            </div>
+        """
+    }
+    return params
+
+
+def build_digest_email(references, recipient_email: str, recipient_name: str) -> dict:
+    """
+    Build one validation email covering several references to the
+    recipient's work.
+    """
+    citations_html = "".join(
+        _citation_details_html(reference) + _validate_button_html(reference)
+        for reference in references
+    )
+
+    params: resend.Emails.SendParams = {
+        "from": "onboarding@resend.dev",
+        "to": [recipient_email],
+        "subject": f"Reference Validation Requests - {len(references)} new citations of your work",
+        "html": f"""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <h2 style="color: #333;">Reference Validation Requests</h2>
+
+                <p>Hello {recipient_name},</p>
+
+                <p>Your work has been cited {len(references)} times and these citations need validation.</p>
+                {REVIEW_CHECKLIST_HTML}
+                {citations_html}
+                {FOOTER_HTML}
+            </div>
+        """
+    }
+    return params
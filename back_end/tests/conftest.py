@@ -0,0 +1,98 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# configured before the app is imported: a throwaway SQLite file, the
+# offline scorer and no background threads
+_db_dir = tempfile.mkdtemp(prefix="refcheck-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["SCORER_BACKEND"] = "stub"
+os.environ["SCORE_WORKERS_IN_APP"] = "false"
+os.environ["OUTBOX_DISPATCH_IN_APP"] = "false"
+os.environ["AUTHOR_STATS_REFRESH_IN_APP"] = "false"
+os.environ.setdefault("AUTH_SECRET_KEY", "test-secret")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(engine)
+    with TestClient(app) as test_client:
+        yield test_client
+    Base.metadata.drop_all(engine)
+
+
+# -------------------- Factories --------------------
+@pytest.fixture(scope="session")
+def make_author(client):
+    """make_author(name) -> author id; the email is derived from the name, the password is "pw"."""
+    def make(name):
+        email = f"{name.lower().replace(' ', '-')}@example.com"
+        response = client.post("/authors/", json={"name": name, "email": email, "password": "pw"})
+        assert response.status_code == 200
+        return response.json()["id"]
+    return make
+
+
+@pytest.fixture(scope="session")
+def make_article(client):
+    """make_article(title, email) -> article id, with `email` as its only (and corresponding) author."""
+    def make(title, email, subject="Testing"):
+        response = client.post("/articles/", json={
+            "title": title,
+            "content": "content",
+            "published_journal": "Journal",
+            "published_date": "2024-01-01",
+            "subject": subject,
+            "keywords": [],
+            "corresponding_author_email": email,
+            "author_names": [email.split("@")[0]],
+            "author_emails": [email],
+        })
+        assert response.status_code == 200
+        return response.json()["id"]
+    return make
+
+
+@pytest.fixture(scope="session")
+def make_reference(client):
+    """make_reference(cited_from_id, cited_to_id) -> the created ReferenceOut as a dict."""
+    def make(cited_from_id, cited_to_id):
+        response = client.post("/references/", json={
+            "cited_from_id": cited_from_id,
+            "cited_to_id": cited_to_id,
+            "content": "reference",
+            "if_key_reference": False,
+            "if_secondary_reference": False,
+        })
+        assert response.status_code == 200
+        return response.json()
+    return make
+
+
+@contextmanager
+def _count_statements():
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+@pytest.fixture(scope="session")
+def count_statements():
+    """`with count_statements() as statements:` collects the SQL run inside the block."""
+    return _count_statements
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from app.ai_score import ScoreResult, _parse_batch, _parse_single
+
+
+@pytest.mark.parametrize("score", [0, 7, 10])
+def test_single_score_on_the_scale_is_kept(score):
+    assert _parse_single(json.dumps({"score": score, "reasoning": "ok"})) == ScoreResult(score, "ok")
+
+
+@pytest.mark.parametrize("score", [-1, 11, 7.5, "7", True, False, None, [7]])
+def test_single_score_off_the_scale_is_none(score):
+    assert _parse_single(json.dumps({"score": score, "reasoning": "odd"})) is None
+
+
+def test_batch_keeps_only_valid_scores_at_valid_indexes():
+    response = "```json\n" + json.dumps([
+        {"index": 0, "score": 8, "reasoning": "key"},
+        {"index": 1, "score": 12, "reasoning": "too high"},
+        {"index": 2, "score": True, "reasoning": "bool"},
+        {"index": True, "score": 5, "reasoning": "bool index"},
+        {"index": 4, "score": "3", "reasoning": "string"},
+        {"index": 3, "score": 0, "reasoning": "unrelated"},
+    ]) + "\n```"
+    assert _parse_batch(response, 5) == [
+        ScoreResult(8, "key"), None, None, ScoreResult(0, "unrelated"), None,
+    ]
@@ -0,0 +1,75 @@
+import pytest
+
+import app.routes.article_routes as article_routes
+from app.database import SessionLocal
+from app.models.article import Article
+
+EMAIL = "bulk-ingest@example.com"
+CO_AUTHOR_EMAIL = "bulk-co-author@example.com"
+
+
+@pytest.fixture(scope="module")
+def authors(make_author):
+    return make_author("Bulk Ingest"), make_author("Bulk Co Author")
+
+
+def _article(title, corresponding=EMAIL, names=("Bulk Ingest", "Bulk Co Author"), emails=(EMAIL, CO_AUTHOR_EMAIL)):
+    return {
+        "title": title,
+        "content": "content",
+        "published_journal": "Journal",
+        "published_date": "2024-01-01",
+        "subject": "Bulk",
+        "keywords": ["Bulk", "ingest"],
+        "corresponding_author_email": corresponding,
+        "author_names": list(names),
+        "author_emails": list(emails),
+    }
+
+
+def test_bulk_create_reports_each_item_in_request_order(client, authors):
+    author_id, co_author_id = authors
+    response = client.post("/articles/bulk", json=[
+        _article("Bulk first"),
+        _article("Bulk mismatch", names=("Bulk Ingest",)),
+        _article("Bulk second", emails=(EMAIL, None)),
+        _article("Bulk stranger", corresponding="nobody@example.com"),
+        _article("Bulk third"),
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (3, 2)
+
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert results[1] == {"index": 1, "id": None, "error": "author_names and author_emails length mismatch"}
+    assert results[3] == {"index": 3, "id": None, "error": "Corresponding author 'nobody@example.com' not found"}
+
+    created = [results[i] for i in (0, 2, 4)]
+    assert all(result["error"] is None for result in created)
+    first, second, third = (client.get(f"/articles/{result['id']}").json() for result in created)
+    assert [first["title"], second["title"], third["title"]] == ["Bulk first", "Bulk second", "Bulk third"]
+    assert first["corresponding_author_id"] == author_id
+    assert first["author_ids"] == [author_id, co_author_id]
+    assert second["author_ids"] == [author_id]  # the unknown co-author is not linked
+    assert first["keywords"] == ["Bulk", "ingest"]
+
+
+def test_bulk_create_resolves_author_emails_with_one_query(client, authors, count_statements):
+    with count_statements() as statements:
+        response = client.post("/articles/bulk", json=[_article(f"Bulk query {i}") for i in range(10)])
+    assert response.json()["created"] == 10
+    author_selects = [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM authors" in s]
+    assert len(author_selects) == 1
+
+
+def test_bulk_create_rejects_oversized_requests(client, authors, monkeypatch):
+    monkeypatch.setattr(article_routes, "ARTICLE_BULK_MAX_ITEMS", 2)
+    response = client.post("/articles/bulk", json=[_article(f"Bulk oversized {i}") for i in range(3)])
+    assert response.status_code == 413
+    assert response.json()["detail"] == "At most 2 articles per request"
+    db = SessionLocal()
+    try:
+        assert db.query(Article).filter(Article.title.like("Bulk oversized%")).count() == 0
+    finally:
+        db.close()
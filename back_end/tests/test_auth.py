@@ -0,0 +1,41 @@
+import app.tokens as tokens
+
+
+def _token(client, email):
+    login = client.post("/client/login", json={"email": email, "password": "pw"}).json()
+    return {"Authorization": f"Bearer {login['access_token']}"}
+
+
+def test_author_and_reference_edits_need_the_owners_token(client, make_author, make_article, make_reference):
+    owner_id = make_author("Owner")
+    make_author("Other")
+    owner, other = _token(client, "owner@example.com"), _token(client, "other@example.com")
+    reference_id = make_reference(
+        make_article("Owner citing", "owner@example.com"), make_article("Owner cited", "owner@example.com")
+    )["id"]
+
+    profile = {"password": "", "job": "Editor"}
+    assert client.patch(f"/authors/{owner_id}", json=profile).status_code == 401
+    assert client.patch(f"/authors/{owner_id}", json=profile, headers={"Authorization": "Bearer nope"}).status_code == 401
+    assert client.patch(f"/authors/{owner_id}", json=profile, headers=other).status_code == 403
+    assert client.patch(f"/authors/{owner_id}", json=profile, headers=owner).json()["job"] == "Editor"
+
+    feedback = {"feedback": "fine"}
+    assert client.patch(f"/references/{reference_id}", json=feedback).status_code == 401
+    assert client.patch(f"/references/{reference_id}", json=feedback, headers=other).status_code == 403
+    assert client.patch(f"/references/{reference_id}", json=feedback, headers=owner).json()["feedback"] == "fine"
+
+    assert client.delete(f"/authors/{owner_id}").status_code == 401
+    assert client.delete(f"/authors/{owner_id}", headers=other).status_code == 403
+
+
+def test_anonymous_call_warning_is_throttled(capsys, monkeypatch):
+    monkeypatch.setattr(tokens, "_anonymous_warned_at", None)
+    monkeypatch.setattr(tokens, "_anonymous_calls", 0)
+    for _ in range(5):
+        assert tokens.get_token_author_id(None) is None
+    assert capsys.readouterr().out.count("Anonymous call to an author-scoped route") == 1
+
+    monkeypatch.setattr(tokens, "ANONYMOUS_WARNING_INTERVAL_SECONDS", 0)
+    tokens.get_token_author_id(None)
+    assert "Anonymous call to an author-scoped route (5 since the last warning)" in capsys.readouterr().out
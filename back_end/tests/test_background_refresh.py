@@ -0,0 +1,120 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.citation_graph import CitationGraph
+from app.database import SessionLocal
+from app.lucky import LuckySampler
+from app.trigram import TrigramIndex
+
+
+class _WritesDuringLoad:
+    """A session that makes `write` happen right after load()'s first query."""
+
+    def __init__(self, db, write):
+        self._db = db
+        self._write = write
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def execute(self, *args, **kwargs):
+        result = self._db.execute(*args, **kwargs)
+        if self._write is not None:
+            self._write()
+            self._write = None
+        return result
+
+
+@pytest.fixture(scope="module")
+def cited(make_author, make_article, make_reference):
+    make_author("Refresh")
+    citing_id = make_article("Refresh citing", "refresh@example.com", subject="Refresh")
+    cited_id = make_article("Refresh cited", "refresh@example.com", subject="Refresh")
+    reference_id = make_reference(citing_id, cited_id)["id"]
+    return SimpleNamespace(citing_id=citing_id, cited_id=cited_id, reference_id=reference_id)
+
+
+def test_citation_graph_load_keeps_writes_made_while_it_queries(cited):
+    graph = CitationGraph()
+    new_id = 10**9
+
+    def write():
+        graph.add_article(new_id, "Refresh", [])
+        graph.add_reference(new_id, new_id, cited.cited_id)
+        # already committed, so the load sees it too; must not count twice
+        graph.add_reference(cited.reference_id, cited.citing_id, cited.cited_id)
+
+    db = SessionLocal()
+    try:
+        graph.load(db)
+        graph.load(_WritesDuringLoad(db, write))
+    finally:
+        db.close()
+
+    assert graph.article_stats(new_id)["references"] == 1
+    assert graph.citation_counts([cited.cited_id]) == {cited.cited_id: 2}
+
+
+def test_lucky_sampler_load_keeps_writes_made_while_it_queries(cited):
+    sampler = LuckySampler()
+    new_id = 10**9
+
+    def write():
+        sampler.add(SimpleNamespace(id=new_id, subject="Refresh later"))
+        sampler.add(SimpleNamespace(id=cited.citing_id, subject="Refresh"))
+        sampler.remove(cited.cited_id)
+
+    db = SessionLocal()
+    try:
+        sampler.load(db)
+        sampler.load(_WritesDuringLoad(db, write))
+    finally:
+        db.close()
+
+    assert sampler.pick("refresh later") == new_id
+    assert sampler._ids["refresh"].count(cited.citing_id) == 1
+    assert cited.cited_id in sampler._removed
+
+
+def test_trigram_index_load_keeps_writes_made_while_it_queries(cited):
+    index = TrigramIndex()
+    new_id = 10**9
+
+    def write():
+        index.add(SimpleNamespace(id=new_id, title="Zygomorphic blossoms", subject="Refresh"))
+        index.remove(cited.citing_id)
+
+    db = SessionLocal()
+    try:
+        index.load(db)
+        index.load(_WritesDuringLoad(db, write))
+    finally:
+        db.close()
+
+    assert new_id in index.search("title", "zygomorphic", 0.3)
+    matches = index.search("title", "Refresh citing", 0.3)
+    assert cited.cited_id in matches and cited.citing_id not in matches
+
+
+@pytest.mark.parametrize("make_index", [TrigramIndex, LuckySampler])
+def test_stale_index_starts_one_background_refresh(cited, make_index):
+    index = make_index(ttl_seconds=0)
+    refreshes = []
+    index._refresh = lambda: refreshes.append(1)  # never finishes, so the flag stays set
+
+    db = SessionLocal()
+    try:
+        index.ensure_loaded(db)
+        index.ensure_loaded(db)
+        index.ensure_loaded(db)
+    finally:
+        db.close()
+
+    assert index._loaded_at is not None
+    for _ in range(100):
+        if refreshes:
+            break
+        time.sleep(0.01)
+    assert refreshes == [1]
@@ -0,0 +1,14 @@
+import app.trigram as trigram
+
+
+def test_fuzzy_fallback_passes_only_the_best_matches_to_sql(client, make_author, make_article, monkeypatch):
+    make_author("Fuzzy")
+    ids = {
+        title: make_article(title, "fuzzy@example.com")
+        for title in ("Quokka habitat", "Quokka habitats", "Quokka diet", "Wombat habitat")
+    }
+    monkeypatch.setattr(trigram, "TRIGRAM_MAX_MATCHES", 2)
+
+    response = client.get("/articles/search", params={"title": "Quokka habitat", "fuzzy": "true", "threshold": 0})
+    assert response.status_code == 200
+    assert [a["id"] for a in response.json()] == [ids["Quokka habitat"], ids["Quokka habitats"]]
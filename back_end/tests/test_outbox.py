@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+
+import app.outbox as outbox
+from app.database import SessionLocal
+from app.models.article import Article
+from app.models.email_outbox import EmailOutbox
+from app.models.reference import Reference
+from app.outbox import MemoryMailer, dispatch_once
+
+EMAIL = "validator@example.com"
+
+
+@pytest.fixture(scope="module")
+def articles(make_author, make_article):
+    make_author("Validator")
+    return [make_article(f"Validated {i}", EMAIL) for i in range(4)]
+
+
+@pytest.fixture
+def db(articles, monkeypatch):
+    monkeypatch.setattr(outbox, "ADMIN_EMAIL", EMAIL)
+    # no scoring workers run in the tests; do not hold emails back for a score
+    monkeypatch.setattr(outbox, "OUTBOX_SCORE_WAIT_SECONDS", -1)
+    session = SessionLocal()
+    session.query(EmailOutbox).delete()
+    session.commit()
+    yield session
+    session.close()
+
+
+def _messages(db):
+    db.expire_all()
+    return db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+
+
+def _make_due(db):
+    db.query(EmailOutbox).update({"next_attempt_at": outbox._now() - timedelta(seconds=1)})
+    db.commit()
+
+
+def test_validation_email_is_written_in_the_reference_transaction(db, articles, make_reference):
+    reference = make_reference(articles[0], articles[1])
+    [message] = _messages(db)
+    assert (message.reference_id, message.recipient, message.status) == (reference["id"], EMAIL, "pending")
+
+    # enqueue does not commit: rolling the reference back drops the email too
+    reference = Reference(cited_from_id=articles[0], cited_to_id=articles[2], content="c",
+                          if_key_reference=False, if_secondary_reference=False)
+    db.add(reference)
+    outbox.enqueue_validation_email(db, reference, db.get(Article, articles[2]))
+    db.rollback()
+    assert len(_messages(db)) == 1
+
+
+def test_dispatch_sends_through_the_mail_sink(db, articles, make_reference):
+    make_reference(articles[0], articles[1])
+    mailer = MemoryMailer()
+
+    assert dispatch_once(db, mailer) == 1
+    assert [params["to"] for params in mailer.sent] == [[EMAIL]]
+    [message] = _messages(db)
+    assert message.status == "sent" and message.sent_at is not None
+    assert dispatch_once(db, mailer) == 0
+
+
+def test_failed_sends_back_off_exponentially(db, articles, make_reference, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_RETRY_BASE_SECONDS", 30)
+    make_reference(articles[0], articles[1])
+    mailer = MemoryMailer(fail_times=2)
+
+    for attempts, backoff in ((1, 30), (2, 60)):
+        before = outbox._now()
+        assert dispatch_once(db, mailer) == 0
+        [message] = _messages(db)
+        assert (message.status, message.attempts) == ("pending", attempts)
+        delay = (outbox._as_utc(message.next_attempt_at) - before).total_seconds()
+        assert backoff - 1 <= delay <= backoff + 1
+        # not due yet
+        assert dispatch_once(db, mailer) == 0
+        _make_due(db)
+
+    assert dispatch_once(db, mailer) == 1
+    [message] = _messages(db)
+    assert (message.status, message.last_error) == ("sent", None)
+
+
+def test_message_fails_after_max_attempts(db, articles, make_reference, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+    make_reference(articles[0], articles[1])
+    mailer = MemoryMailer(fail_times=10)
+
+    dispatch_once(db, mailer)
+    _make_due(db)
+    dispatch_once(db, mailer)
+    [message] = _messages(db)
+    assert (message.status, message.attempts) == ("failed", 2)
+    assert message.last_error == "simulated mail failure"
+    _make_due(db)
+    assert dispatch_once(db, mailer) == 0
+    assert mailer.sent == []
+
+
+def test_digest_sends_one_email_per_recipient(db, articles, make_reference, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_DIGEST_SECONDS", 60)
+    references = [make_reference(articles[0], cited_id)["id"] for cited_id in articles[1:]]
+    # another recipient, queued directly (ADMIN_EMAIL only lets one through the API)
+    db.add(EmailOutbox(reference_id=references[0], recipient="other@example.com", status="pending",
+                       attempts=0, next_attempt_at=outbox._now() - timedelta(seconds=1)))
+    # only the first message for EMAIL is due; the rest of its window is swept along
+    first = db.query(EmailOutbox).filter(EmailOutbox.reference_id == references[0], EmailOutbox.recipient == EMAIL).one()
+    first.next_attempt_at = outbox._now() - timedelta(seconds=1)
+    db.commit()
+    mailer = MemoryMailer()
+
+    assert dispatch_once(db, mailer) == 2
+    assert sorted(params["to"][0] for params in mailer.sent) == ["other@example.com", EMAIL]
+    digest = next(params for params in mailer.sent if params["to"] == [EMAIL])
+    assert digest["subject"].startswith("Reference Validation Requests - 3")
+    assert {m.status for m in _messages(db)} == {"sent"}
@@ -0,0 +1,34 @@
+import base64
+import json
+
+from app.pagination import PAGE_SIZE_DEFAULT
+
+
+def _cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_mistyped_cursor_is_rejected(client):
+    for values in (["abc"], [1.5], [True], [[1]], [1, 2]):
+        response = client.get("/authors/", params={"cursor": _cursor(values)})
+        assert response.status_code == 400, values
+    assert client.get("/authors/", params={"cursor": "not base64!"}).status_code == 400
+    assert client.get("/authors/", params={"cursor": _cursor([1])}).status_code == 200
+
+
+def test_reference_list_is_unpaged_without_limit_or_cursor(client, make_author, make_article, make_reference):
+    make_author("Pagination")
+    cited_from_id = make_article("Citing", "pagination@example.com")
+    for i in range(PAGE_SIZE_DEFAULT + 1):
+        make_reference(cited_from_id, make_article(f"Cited {i}", "pagination@example.com"))
+    url = f"/references/from/{cited_from_id}"
+
+    response = client.get(url)
+    assert len(response.json()) == PAGE_SIZE_DEFAULT + 1
+    assert "X-Next-Cursor" not in response.headers
+
+    first = client.get(url, params={"limit": 60})
+    assert len(first.json()) == 60
+    rest = client.get(url, params={"cursor": first.headers["X-Next-Cursor"]})
+    assert [r["id"] for r in first.json() + rest.json()] == [r["id"] for r in response.json()]
+    assert client.get(url, params={"cursor": _cursor(["x"])}).status_code == 400
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import text
+
+from app.database import engine
+
+EMAIL = "reference-cache@example.com"
+
+
+@pytest.fixture(scope="module")
+def author(make_author):
+    make_author("Reference Cache")
+
+
+def test_reference_list_sees_writes_from_other_processes(client, author, make_article, make_reference):
+    cited_from_id = make_article("Citing", EMAIL)
+    make_reference(cited_from_id, make_article("Cited", EMAIL))
+    url = f"/references/from/{cited_from_id}"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # a scoring job in another process: no session listeners, no invalidation here
+    with engine.begin() as conn:
+        conn.execute(
+            text('UPDATE "references" SET ai_rated_score = 7, version = version + 1 WHERE cited_from_id = :id'),
+            {"id": cited_from_id},
+        )
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [r["ai_rated_score"] for r in response.json()] == [7]
+    assert client.get(url, headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_not_modified_reference_skips_the_payload_query(
+    client, author, make_article, make_reference, count_statements
+):
+    reference = make_reference(make_article("Citing once", EMAIL), make_article("Cited once", EMAIL))
+    url = f"/references/{reference['id']}"
+    etag = client.get(url).headers["ETag"]
+
+    with count_statements() as statements:
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert len(statements) == 1
+    assert "JOIN" not in statements[0].upper()
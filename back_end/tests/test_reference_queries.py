@@ -0,0 +1,22 @@
+EMAIL = "query-count@example.com"
+
+
+def test_reference_list_query_count_does_not_grow_with_list_size(
+    client, make_author, make_article, make_reference, count_statements
+):
+    make_author("Query Count")
+    small = make_article("Cites three", EMAIL)
+    large = make_article("Cites thirty", EMAIL)
+    for cited_from_id, count in ((small, 3), (large, 30)):
+        for i in range(count):
+            make_reference(cited_from_id, make_article(f"Cited {cited_from_id}-{i}", EMAIL))
+
+    with count_statements() as small_statements:
+        small_body = client.get(f"/references/from/{small}").json()
+    with count_statements() as large_statements:
+        large_body = client.get(f"/references/from/{large}").json()
+
+    assert len(small_body) == 3
+    assert len(large_body) == 30
+    assert all(r["cited_to_title"] and r["cited_from_title"] for r in large_body)
+    assert len(small_statements) == len(large_statements)
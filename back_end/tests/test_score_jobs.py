@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+
+import app.jobs as jobs
+from app.database import SessionLocal
+from app.jobs import ScoreWorkerPool, claim_next_jobs, run_score_jobs
+from app.models.score_job import ScoreJob
+
+EMAIL = "score-jobs@example.com"
+
+
+@pytest.fixture(scope="module")
+def articles(make_author, make_article):
+    make_author("Score Jobs")
+    return make_article("Scored citing", EMAIL), make_article("Scored cited", EMAIL)
+
+
+@pytest.fixture
+def db(articles):
+    session = SessionLocal()
+    session.query(ScoreJob).delete()
+    session.commit()
+    yield session
+    session.close()
+
+
+def _job(db):
+    db.expire_all()
+    return db.query(ScoreJob).one()
+
+
+def test_failed_job_waits_out_a_backoff_before_the_next_attempt(db, articles, make_reference, monkeypatch):
+    def outage(db, references):
+        raise RuntimeError("429 Too Many Requests")
+
+    monkeypatch.setattr(jobs, "score_references_cached", outage)
+    monkeypatch.setattr(jobs, "SCORE_JOB_RETRY_BASE_SECONDS", 30)
+    make_reference(*articles)
+
+    for attempts, backoff in ((1, 30), (2, 60)):
+        before = jobs._now()
+        run_score_jobs(db, claim_next_jobs(db))
+        job = _job(db)
+        assert (job.status, job.attempts, job.last_error) == ("pending", attempts, "429 Too Many Requests")
+        delay = (job.next_attempt_at.replace(tzinfo=before.tzinfo) - before).total_seconds()
+        assert backoff - 1 <= delay <= backoff + 1
+        # the worker loop comes straight back; the job is not due yet
+        assert claim_next_jobs(db) == []
+        job.next_attempt_at = jobs._now() - timedelta(seconds=1)
+        db.commit()
+
+    run_score_jobs(db, claim_next_jobs(db))
+    assert (_job(db).status, _job(db).attempts) == ("failed", jobs.SCORE_JOB_MAX_ATTEMPTS)
+
+
+def test_workers_requeue_stale_jobs_periodically(db, articles, make_reference, monkeypatch):
+    make_reference(*articles)
+    [job] = claim_next_jobs(db)
+    # its worker died long ago
+    job.updated_at = jobs._now() - timedelta(seconds=jobs.SCORE_JOB_STALE_SECONDS + 60)
+    db.commit()
+
+    pool = ScoreWorkerPool(workers=0)
+
+    def requeue():
+        # the worker loop requeues in a fresh session each iteration
+        session = SessionLocal()
+        try:
+            pool._requeue_stale(session)
+        finally:
+            session.close()
+
+    requeue()
+    assert _job(db).status == "pending"
+
+    # not again until SCORE_JOB_REQUEUE_SECONDS have passed
+    [job] = claim_next_jobs(db)
+    job.updated_at = jobs._now() - timedelta(seconds=jobs.SCORE_JOB_STALE_SECONDS + 60)
+    db.commit()
+    requeue()
+    assert _job(db).status == "running"
+    monkeypatch.setattr(jobs, "SCORE_JOB_REQUEUE_SECONDS", 0)
+    requeue()
+    assert _job(db).status == "pending"
@@ -138,7 +138,10 @@ interface Reference {
             `https://capstone-reference-check.onrender.com/references/${refId}`,
             {
             method: "PATCH",
-            headers: { "Content-Type": "application/json" },
+            headers: {
+                "Content-Type": "application/json",
+                Authorization: `Bearer ${user?.access_token}`,
+            },
             body: JSON.stringify(payload),
             }
         )
@@ -180,7 +183,10 @@ interface Reference {
             `https://capstone-reference-check.onrender.com/references/${refId}`,
             {
             method: "PATCH",
-            headers: { "Content-Type": "application/json" },
+            headers: {
+                "Content-Type": "application/json",
+                Authorization: `Bearer ${user?.access_token}`,
+            },
             body: JSON.stringify(payload),
             }
         )
@@ -10,6 +10,7 @@ interface User {
     institute?: string
     job?: string
     articles?: { id: number; title: string }[]
+    access_token?: string  // from /client/login; send as a Bearer token on edits
     }
 
     interface UserStore {
@@ -39,7 +40,7 @@ interface User {
             )
             if (response.ok) {
                 const updatedUser = await response.json()
-                set({ user: updatedUser })
+                set({ user: { ...updatedUser, access_token: currentUser.access_token } })
             }
             } catch (err) {
             console.error("Failed to refresh user:", err)
@@ -105,6 +105,7 @@ export default function MyProfilePage() {
         if (!loginRes.ok) {
             throw new Error("Incorrect password. Please try again.")
         }
+        const { access_token } = await loginRes.json()
 
         // Step 2: If password is correct, proceed with update
         const payload = {
@@ -119,7 +120,10 @@ export default function MyProfilePage() {
             `https://capstone-reference-check.onrender.com/authors/${user.id}`,
             {
             method: "PATCH",
-            headers: { "Content-Type": "application/json" },
+            headers: {
+                "Content-Type": "application/json",
+                Authorization: `Bearer ${access_token}`,
+            },
             body: JSON.stringify(payload),
             }
         )
@@ -130,7 +134,7 @@ export default function MyProfilePage() {
         }
 
         const updatedUser = await res.json()
-        setUser(updatedUser)
+        setUser({ ...updatedUser, access_token })
         setSuccess("Profile updated successfully!")
         setIsEditing(false)
         setEmailStatus("idle")